@@ -1,5 +1,7 @@
 from flask import Blueprint, jsonify, request
 from utils.db import get_connection
+from utils import announcement_feed, events
+from utils.compression import not_modified
 from api.auth import login_required, admin_required
 import datetime
 
@@ -9,48 +11,30 @@ announcement_bp = Blueprint('announcement', __name__, url_prefix='/api')
 @announcement_bp.route("/announcements", methods=["GET"])
 @login_required
 def list_announcements():
-    """Aktif duyuruları listele."""
-    conn = get_connection()
-    cursor = conn.cursor()
+    """Aktif duyuruları listele.
 
-    try:
-        cursor.execute(
-            """
-            SELECT d.duyuru_id,
-                   d.baslik,
-                   d.icerik,
-                   d.yayin_tarihi,
-                   d.bitis_tarihi,
-                   d.oncelik,
-                   d.aktif_mi,
-                   k.kullanici_adi AS olusturan
-            FROM Duyuru d
-            JOIN Kullanici k ON d.olusturan_kullanici_id = k.kullanici_id
-            WHERE d.aktif_mi = 1
-            ORDER BY d.yayin_tarihi DESC
-            """
-        )
-        rows = cursor.fetchall()
-        duyurular = [
-            {
-                "duyuru_id": row["duyuru_id"],
-                "baslik": row["baslik"],
-                "icerik": row["icerik"],
-                "yayin_tarihi": row["yayin_tarihi"].strftime("%Y-%m-%d %H:%M")
-                if row["yayin_tarihi"]
-                else None,
-                "bitis_tarihi": row["bitis_tarihi"].strftime("%Y-%m-%d %H:%M")
-                if row["bitis_tarihi"]
-                else None,
-                "oncelik": row["oncelik"],
-                "aktif_mi": bool(row["aktif_mi"]),
-                "olusturan": row["olusturan"],
-            }
-            for row in rows
-        ]
-        return jsonify(duyurular)
-    finally:
-        conn.close()
+    Liste bellekteki duyuru akışından gelir (bkz. utils.announcement_feed).
+    `limit` verilirse `offset` ile sayfalanır; toplam `X-Total-Count` başlığındadır.
+    """
+    limit = request.args.get("limit", type=int)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+
+    etag, duyurular = announcement_feed.active()
+    page_etag = f"{etag}-{offset}-{limit}" if etag else None
+    if page_etag:
+        cached = not_modified(page_etag)
+        if cached is not None:
+            return cached
+
+    toplam = len(duyurular)
+    if limit is not None:
+        duyurular = duyurular[offset:offset + min(max(limit, 1), 200)]
+    response = jsonify(duyurular)
+    if limit is not None:
+        response.headers["X-Total-Count"] = str(toplam)
+    if page_etag:
+        response.set_etag(page_etag, weak=True)
+    return response
 
 
 @announcement_bp.route("/announcements", methods=["POST"])
@@ -79,9 +63,12 @@ def create_announcement():
             """,
             (baslik, icerik, olusturan_kullanici_id, bitis_tarihi, oncelik),
         )
+        duyuru_id = cursor.lastrowid
         conn.commit()
+        announcement_feed.invalidate()
+        events.publish("duyuru", {"islem": "olusturuldu", "duyuru_id": duyuru_id})
         return jsonify(
-            {"message": "Duyuru oluşturuldu", "duyuru_id": cursor.lastrowid}
+            {"message": "Duyuru oluşturuldu", "duyuru_id": duyuru_id}
         ), 201
     except Exception as e:
         conn.rollback()
@@ -102,6 +89,8 @@ def delete_announcement(duyuru_id: int):
             "UPDATE Duyuru SET aktif_mi = 0 WHERE duyuru_id = %s", (duyuru_id,)
         )
         conn.commit()
+        announcement_feed.invalidate()
+        events.publish("duyuru", {"islem": "silindi", "duyuru_id": duyuru_id})
         return jsonify({"message": "Duyuru silindi"})
     except Exception as e:
         conn.rollback()
@@ -1,6 +1,11 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, send_file
 from utils.db import get_connection
 from api.auth import login_required, admin_required
+from api.leave import leave_changed
+from utils.payroll import mark_payroll_dirty
+from utils import employee_profile, events, leave_balance, leave_index
+from utils.archive import include_archive_requested, table_source
+from decimal import Decimal
 import datetime
 
 attendance_bp = Blueprint('attendance', __name__, url_prefix='/api')
@@ -16,14 +21,14 @@ def attendance():
     if not secilen_tarih:
         secilen_tarih = datetime.date.today().strftime("%Y-%m-%d")
 
-    sql = """
+    sql = f"""
         SELECT 
             p.personel_id, p.tc_kimlik_no, p.ad, p.soyad, 
             d.departman_adi,
             dv.durum as bugunku_durum
         FROM Personel p
         LEFT JOIN Departman d ON p.departman_id = d.departman_id
-        LEFT JOIN Devam dv ON p.personel_id = dv.personel_id AND dv.tarih = %s
+        LEFT JOIN {table_source('Devam', include_archive_requested())} dv ON p.personel_id = dv.personel_id AND dv.tarih = %s
         WHERE p.aktif_mi = %s
         ORDER BY p.ad, p.soyad
     """
@@ -61,15 +66,16 @@ def attendance_pdf():
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute("""
+        cursor.execute(f"""
             SELECT d.tarih, p.ad, p.soyad, dep.departman_adi, d.durum
-            FROM Devam d
+            FROM {table_source('Devam', include_archive_requested())} d
             JOIN Personel p ON d.personel_id = p.personel_id
             LEFT JOIN Departman dep ON p.departman_id = dep.departman_id
             WHERE d.tarih BETWEEN %s AND %s AND p.aktif_mi = %s
             ORDER BY d.tarih, p.ad
         """, (start, end, aktif_flag))
         rows = cursor.fetchall()
+        from utils.pdf_generator import PDFGenerator
         gen = PDFGenerator()
         buffer = gen.devam_raporu_pdf(rows, start, end)
         fname = f"devam_raporu_{start}_to_{end}.pdf"
@@ -96,6 +102,12 @@ def attendance_save():
     cursor = conn.cursor()
 
     try:
+        cursor.execute("SELECT personel_id, ek_mesai_saat FROM Devam WHERE tarih = %s", (secilen_tarih,))
+        onceki_mesai = {r['personel_id']: Decimal(str(r['ek_mesai_saat'] or 0)) for r in cursor.fetchall()}
+        bordro_etkilenen = set()
+        yeni_izinli = set()
+        leave_index.ensure(cursor, [k.get('personel_id') for k in kayitlar if k.get('durum') == 'Izinli'])
+
         for kayit in kayitlar:
             personel_id = kayit.get('personel_id')
             durum = kayit.get('durum')
@@ -104,6 +116,9 @@ def attendance_save():
             if not personel_id or not durum:
                 continue
 
+            if onceki_mesai.get(int(personel_id), Decimal('0')) != Decimal(str(ek_mesai)):
+                bordro_etkilenen.add(int(personel_id))
+
             cursor.execute("DELETE FROM Devam WHERE personel_id = %s AND tarih = %s", (personel_id, secilen_tarih))
             cursor.execute("INSERT INTO Devam (personel_id, tarih, durum, ek_mesai_saat) VALUES (%s, %s, %s, %s)", 
                           (personel_id, secilen_tarih, durum, ek_mesai))
@@ -111,19 +126,30 @@ def attendance_save():
                 cursor.execute("SELECT izin_turu_id, izin_adi, ucretli_mi, yillik_hak_gun FROM Izin_Turu WHERE izin_adi = %s LIMIT 1", ('Mazeret İzni',))
                 tur = cursor.fetchone()
                 if not tur:
-                    cursor.execute("SELECT izin_turu_id FROM Izin_Turu WHERE izin_adi = %s LIMIT 1", ('Ücretsiz İzin',))
+                    cursor.execute("SELECT izin_turu_id, ucretli_mi FROM Izin_Turu WHERE izin_adi = %s LIMIT 1", ('Ücretsiz İzin',))
                     tur = cursor.fetchone()
                 if not tur:
-                    cursor.execute("SELECT izin_turu_id FROM Izin_Turu LIMIT 1")
+                    cursor.execute("SELECT izin_turu_id, ucretli_mi FROM Izin_Turu LIMIT 1")
                     tur = cursor.fetchone()
 
                 izin_turu_id = tur['izin_turu_id'] if tur else None
                 if izin_turu_id:
-                    cursor.execute("SELECT COUNT(*) AS cnt FROM Izin_Kayit WHERE personel_id = %s AND baslangic_tarihi <= %s AND bitis_tarihi >= %s", (personel_id, secilen_tarih, secilen_tarih))
-                    if cursor.fetchone().get('cnt', 0) == 0:
+                    if not leave_index.covers(cursor, personel_id, secilen_tarih) and int(personel_id) not in yeni_izinli:
                         cursor.execute("INSERT INTO Izin_Kayit (personel_id, izin_turu_id, baslangic_tarihi, bitis_tarihi, gun_sayisi, onay_durumu) VALUES (%s, %s, %s, %s, %s, 'Onaylandi')", (personel_id, izin_turu_id, secilen_tarih, secilen_tarih, 1))
-
+                        yeni_izinli.add(int(personel_id))
+                        leave_balance.apply_transition(cursor, {
+                            'personel_id': personel_id, 'izin_turu_id': izin_turu_id,
+                            'baslangic_tarihi': secilen_tarih, 'gun_sayisi': 1,
+                        }, None, 'Onaylandi')
+                        if not tur.get('ucretli_mi'):
+                            bordro_etkilenen.add(int(personel_id))
+
+        mark_payroll_dirty(cursor, bordro_etkilenen, secilen_tarih, sebep='devam')
         conn.commit()
+        employee_profile.invalidate([k.get('personel_id') for k in kayitlar])
+        events.publish('devam', {'tarih': str(secilen_tarih)}, roller=('admin',))
+        if yeni_izinli:
+            leave_changed(yeni_izinli)
         return jsonify({'message': f'{secilen_tarih} tarihi için yoklama kaydedildi'})
 
     except Exception as e:
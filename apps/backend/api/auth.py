@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, session, request
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 from utils.db import get_connection
+from utils.json_provider import json_list_response
 from datetime import datetime, timedelta
 import jwt
 from flask import current_app
@@ -19,6 +20,22 @@ def decode_token(token):
         return None
 
 
+def stream_token_payload():
+    """SSE uçları için token çözümü.
+
+    Tarayıcıdaki EventSource özel başlık gönderemediğinden token,
+    Authorization başlığı yoksa `token` query parametresinden okunur.
+    """
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split(' ')[1]
+    else:
+        token = request.args.get('token')
+    if not token:
+        return None
+    return decode_token(token)
+
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -272,7 +289,7 @@ def get_users():
             'ilk_giris': row.get('ilk_giris'),
         } for row in rows]
         
-        return jsonify(users)
+        return json_list_response(users)
     finally:
         conn.close()
 
@@ -1,24 +1,121 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from utils.db import get_connection
+from utils import candidate_counts, candidate_intake, events
+from utils.cache import VersionedCache
+from utils.compression import not_modified
+from utils.passwords import hash_passwords
+from utils.json_provider import json_list_response
 from api.auth import login_required, admin_required
+from api.employee import employees_changed
 from werkzeug.security import generate_password_hash
 import datetime
+import hashlib
+import os
 import random
+import re
 import string
 
 candidate_bp = Blueprint('candidate', __name__, url_prefix='/api')
 
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+PHONE_PATTERN = re.compile(r"^\+?[0-9 ()-]{7,19}$")
+
+# Herkese açık pozisyon listesi; CDN/tarayıcı bu süre boyunca yeniden sormaz
+POSITIONS_MAX_AGE = int(os.getenv("POSITIONS_MAX_AGE", 3600))
+POSITIONS_STALE_SECONDS = int(os.getenv("POSITIONS_STALE_SECONDS", 86400))
+# Sunucu içi kopya başvuru doğrulamasında da kullanılır; positions_changed() yalnızca
+# kendi sürecini temizlediğinden diğer süreçler yeni pozisyonu en geç bu sürede görür
+POSITIONS_CACHE_TTL = int(os.getenv("POSITIONS_CACHE_TTL", 60))
+
+_positions = VersionedCache('pozisyonlar', ttl=POSITIONS_CACHE_TTL, maxsize=4)
+
+MAX_BULK_APPROVE = 500
+MAX_PAGE_SIZE = 200
+MAX_SEARCH_TERMS = 3
+
+
+def _parse_cursor(value):
+    """'YYYY-MM-DD_<aday_id>' biçimindeki sayfa imlecini çözer."""
+    tarih, _, aday_id = value.partition("_")
+    return datetime.datetime.strptime(tarih, "%Y-%m-%d").date(), int(aday_id)
+
+
+def _candidate_filters(args):
+    """Sorgu parametrelerinden (koşullar, parametreler) üretir; hatalı tarihte ValueError."""
+    conditions, params = [], []
+    if args.get("durum"):
+        conditions.append("a.durum = %s")
+        params.append(args["durum"])
+    if args.get("pozisyon_id", type=int):
+        conditions.append("a.pozisyon_id = %s")
+        params.append(args.get("pozisyon_id", type=int))
+    if args.get("baslangic"):
+        conditions.append("a.basvuru_tarihi >= %s")
+        params.append(datetime.datetime.strptime(args["baslangic"], "%Y-%m-%d").date())
+    if args.get("bitis"):
+        conditions.append("a.basvuru_tarihi <= %s")
+        params.append(datetime.datetime.strptime(args["bitis"], "%Y-%m-%d").date())
+    # Her kelime ad, soyad ya da e-postanın başıyla eşleşmeli; önek araması indeksleri kullanır
+    for token in (args.get("q") or "").split()[:MAX_SEARCH_TERMS]:
+        prefix = _like_prefix(token)
+        conditions.append("(a.ad LIKE %s OR a.soyad LIKE %s OR a.email LIKE %s)")
+        params.extend([prefix, prefix, prefix])
+    return conditions, params
+
 
 @candidate_bp.route("/candidates", methods=["GET"])
 @login_required
 def list_candidates():
-    """Adayları listele."""
+    """Adayları listele.
+
+    Filtreler: durum, pozisyon_id, baslangic/bitis (başvuru tarihi), q (ad,
+    soyad ya da e-posta öneki). `limit` ya da `imlec` verilirse sayfalı döner:
+    sonraki sayfa imleci X-Next-Cursor, toplam X-Total-Count başlığındadır.
+    """
+    limit = request.args.get("limit", type=int)
+    imlec = request.args.get("imlec")
+    paginated = limit is not None or bool(imlec)
+    if paginated:
+        limit = min(max(limit or 50, 1), MAX_PAGE_SIZE)
+    try:
+        conditions, params = _candidate_filters(request.args)
+        cursor_tarih, cursor_id = _parse_cursor(imlec) if imlec else (None, None)
+    except ValueError:
+        return jsonify({"error": "Tarih ya da imleç biçimi hatalı"}), 400
+
+    where_clause = ("WHERE " + " AND ".join(conditions)) if conditions else ""
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
+        total = None
+        if paginated:
+            filters = {k for k in ("durum", "pozisyon_id", "baslangic", "bitis", "q") if request.args.get(k)}
+            if filters <= {"durum"}:
+                # Yalnızca durum filtresi varsa toplam sayaçlardan okunur
+                sayilar = candidate_counts.counts(cursor)
+                total = sayilar.get(request.args["durum"], 0) if filters else sum(sayilar.values())
+            else:
+                def count():
+                    cursor.execute(f"SELECT COUNT(*) AS toplam FROM Adaylar a {where_clause}", tuple(params))
+                    return cursor.fetchone()["toplam"]
+
+                total = candidate_counts.totals.get_or_set((where_clause, tuple(str(v) for v in params)), count)
+
+        page_clause = ""
+        page_params = []
+        if cursor_tarih is not None:
+            page_clause = (" AND " if conditions else "WHERE ") + (
+                "(a.basvuru_tarihi < %s OR (a.basvuru_tarihi = %s AND a.aday_id < %s))"
+            )
+            page_params = [cursor_tarih, cursor_tarih, cursor_id]
+        limit_clause = ""
+        if paginated:
+            limit_clause = "LIMIT %s"
+            page_params.append(limit + 1)
+
         cursor.execute(
-            """
+            f"""
             SELECT a.aday_id,
                    a.ad,
                    a.soyad,
@@ -32,10 +129,19 @@ def list_candidates():
                    p.pozisyon_adi
             FROM Adaylar a
             JOIN Pozisyon p ON a.pozisyon_id = p.pozisyon_id
+            {where_clause} {page_clause}
             ORDER BY a.basvuru_tarihi DESC, a.aday_id DESC
-            """
+            {limit_clause}
+            """,
+            tuple(params + page_params),
         )
         rows = cursor.fetchall()
+        next_cursor = None
+        if paginated and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = f"{last['basvuru_tarihi']:%Y-%m-%d}_{last['aday_id']}"
+
         adaylar = [
             {
                 "aday_id": row["aday_id"],
@@ -56,7 +162,25 @@ def list_candidates():
             }
             for row in rows
         ]
-        return jsonify(adaylar)
+        response = json_list_response(adaylar)
+        if paginated:
+            response.headers["X-Total-Count"] = str(total)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+        return response
+    finally:
+        conn.close()
+
+
+@candidate_bp.route("/candidates/summary", methods=["GET"])
+@login_required
+def candidate_summary():
+    """Durum bazında aday sayıları; Aday_Durum_Sayac'tan okunur."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        sayilar = candidate_counts.counts(cursor)
+        return jsonify({"durumlar": sayilar, "toplam": sum(sayilar.values())})
     finally:
         conn.close()
 
@@ -74,6 +198,7 @@ def create_candidate():
 
     if not ad or not soyad or not pozisyon_id or not basvuru_tarihi:
         return jsonify({"error": "Ad, soyad, pozisyon ve başvuru tarihi zorunludur"}), 400
+    durum = data.get("durum") or "Basvuru Alindi"
 
     conn = get_connection()
     cursor = conn.cursor()
@@ -92,13 +217,17 @@ def create_candidate():
                 pozisyon_id,
                 basvuru_tarihi,
                 data.get("gorusme_tarihi"),
-                data.get("durum", "Basvuru Alindi"),
+                durum,
                 data.get("aciklama"),
             ),
         )
+        aday_id = cursor.lastrowid
+        candidate_counts.apply_transitions(cursor, [(None, durum)])
         conn.commit()
+        candidate_counts.changed()
+        events.publish("aday", {"aday_id": aday_id}, roller=("admin",))
         return jsonify(
-            {"message": "Aday kaydı oluşturuldu", "aday_id": cursor.lastrowid}
+            {"message": "Aday kaydı oluşturuldu", "aday_id": aday_id}
         ), 201
     except Exception as e:
         conn.rollback()
@@ -107,57 +236,113 @@ def create_candidate():
         conn.close()
 
 
+def _public_positions():
+    """Pozisyon listesini bir kez serileştirip içerik özetli ETag ile saklar.
+
+    ETag içerikten türetildiği için tüm süreçlerde aynıdır; CDN ve tarayıcı
+    önbellekleri süreçten bağımsız doğrulama yapabilir.
+    """
+    def load():
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT pozisyon_id, pozisyon_adi FROM Pozisyon ORDER BY pozisyon_adi")
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+        body = current_app.json.dumps(rows)
+        return {
+            "body": body,
+            "etag": "poz-" + hashlib.sha1(body.encode("utf-8")).hexdigest()[:16],
+            "ids": frozenset(row["pozisyon_id"] for row in rows),
+        }
+
+    return _positions.get_or_set("liste", load)
+
+
+def positions_changed():
+    """Pozisyon ekleme/düzenleme/silme commit'inden sonra çağrılır."""
+    _positions.bump()
+
+
+def _position_ids():
+    return _public_positions()["ids"]
+
+
 @candidate_bp.route("/candidates/positions", methods=["GET"])
 def public_positions():
     """Aday başvuru formu için pozisyon listesini herkese açık verir."""
-    conn = get_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute("SELECT pozisyon_id, pozisyon_adi FROM Pozisyon ORDER BY pozisyon_adi")
-        rows = cursor.fetchall()
-        return jsonify(rows)
-    finally:
-        conn.close()
+        positions = _public_positions()
+    except Exception as e:
+        print(f"Pozisyon listesi hatası: {e}")
+        return jsonify({"error": "Pozisyonlar yüklenemedi"}), 500
+
+    response = not_modified(positions["etag"])
+    if response is None:
+        response = current_app.response_class(positions["body"], mimetype="application/json")
+        response.set_etag(positions["etag"], weak=True)
+    response.headers["Cache-Control"] = (
+        f"public, max-age={POSITIONS_MAX_AGE}, stale-while-revalidate={POSITIONS_STALE_SECONDS}"
+    )
+    return response
+
+
+def _validate_application(data):
+    """(başvuru, hata) döner; başvuru alanları kırpılmış ve normalize edilmiştir."""
+    ad = (data.get("ad") or "").strip()
+    soyad = (data.get("soyad") or "").strip()
+    telefon = (data.get("telefon") or "").strip() or None
+    email = (data.get("email") or "").strip().lower() or None
+
+    if not ad or not soyad or not data.get("pozisyon_id"):
+        return None, "Ad, soyad ve pozisyon zorunlu"
+    if len(ad) > 100 or len(soyad) > 100:
+        return None, "Ad ve soyad en fazla 100 karakter olabilir"
+    if email and (len(email) > 255 or not EMAIL_PATTERN.match(email)):
+        return None, "Geçersiz e-posta adresi"
+    if telefon and not PHONE_PATTERN.match(telefon):
+        return None, "Geçersiz telefon numarası"
+    try:
+        pozisyon_id = int(data.get("pozisyon_id"))
+    except (TypeError, ValueError):
+        return None, "Geçersiz pozisyon"
+    if pozisyon_id not in _position_ids():
+        return None, "Geçersiz pozisyon"
+
+    return {
+        "ad": ad,
+        "soyad": soyad,
+        "telefon": telefon,
+        "email": email,
+        "pozisyon_id": pozisyon_id,
+        "basvuru_tarihi": datetime.date.today().strftime("%Y-%m-%d"),
+    }, None
 
 
 @candidate_bp.route("/candidates/apply", methods=["POST"])
 def public_apply():
-    """Login gerektirmeyen aday başvurusu."""
-    data = request.get_json() or {}
-    ad = data.get("ad")
-    soyad = data.get("soyad")
-    pozisyon_id = data.get("pozisyon_id")
-    telefon = data.get("telefon")
-    email = data.get("email")
+    """Login gerektirmeyen aday başvurusu.
 
-    if not ad or not soyad or not pozisyon_id:
-        return jsonify({"error": "Ad, soyad ve pozisyon zorunlu"}), 400
+    Başvuru kuyruğa alınır ve toplu olarak yazılır (bkz. utils/candidate_intake.py).
+    """
+    application, error = _validate_application(request.get_json(silent=True) or {})
+    if error:
+        return jsonify({"error": error}), 400
 
-    conn = get_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute(
-            """
-            INSERT INTO Adaylar (ad, soyad, telefon, email, pozisyon_id, basvuru_tarihi, durum)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """,
-            (
-                ad,
-                soyad,
-                telefon,
-                email,
-                pozisyon_id,
-                datetime.date.today().strftime("%Y-%m-%d"),
-                "Basvuru Alindi",
-            ),
-        )
-        conn.commit()
-        return jsonify({"message": "Başvurunuz alındı", "aday_id": cursor.lastrowid}), 201
-    except Exception as e:
-        conn.rollback()
-        return jsonify({"error": str(e)}), 500
-    finally:
-        conn.close()
+        candidate_intake.submit(application, request.remote_addr or "-")
+    except candidate_intake.RateLimited:
+        response = jsonify({"error": "Çok fazla başvuru gönderildi, lütfen daha sonra tekrar deneyin"})
+        response.headers["Retry-After"] = str(int(candidate_intake.INTAKE_RATE_WINDOW))
+        return response, 429
+    except candidate_intake.QueueFull:
+        response = jsonify({"error": "Başvuru sistemi şu an yoğun, lütfen biraz sonra tekrar deneyin"})
+        response.headers["Retry-After"] = "30"
+        return response, 429
+    except candidate_intake.Duplicate:
+        return jsonify({"error": "Bu pozisyona bu e-posta ile zaten başvuru yapılmış"}), 409
+    return jsonify({"message": "Başvurunuz alındı"}), 202
 
 
 def _generate_username(ad: str, soyad: str, suffix: str = ""):
@@ -182,19 +367,14 @@ def approve_candidate(aday_id: int):
     conn = get_connection()
     cursor = conn.cursor()
     try:
-        data = request.get_json() or {}
-        try:
-            kidem_seviyesi = int(data.get("kidem_seviyesi", 3))
-        except Exception:
-            kidem_seviyesi = 3
-        if kidem_seviyesi not in (1, 2, 3):
-            kidem_seviyesi = 3
+        kidem_seviyesi = _parse_kidem(request.get_json() or {})
 
         cursor.execute(
             """
             SELECT ad, soyad, email, telefon, pozisyon_id, durum
             FROM Adaylar
             WHERE aday_id = %s
+            FOR UPDATE
             """,
             (aday_id,),
         )
@@ -220,6 +400,7 @@ def approve_candidate(aday_id: int):
         cursor.execute(
             "UPDATE Adaylar SET durum = %s WHERE aday_id = %s", ("Kabul", aday_id)
         )
+        candidate_counts.apply_transitions(cursor, [(aday.get("durum"), "Kabul")])
 
         # Personel oluştur (basit varsayılan alanlar ile)
         tc_kimlik_no = "".join(random.choices(string.digits, k=11))
@@ -280,6 +461,9 @@ def approve_candidate(aday_id: int):
         )
 
         conn.commit()
+        candidate_counts.changed()
+        events.publish("aday", {"aday_id": aday_id}, roller=("admin",))
+        employees_changed([personel_id])
         return jsonify(
             {
                 "message": "Aday onaylandı ve kullanıcı oluşturuldu",
@@ -295,6 +479,201 @@ def approve_candidate(aday_id: int):
         conn.close()
 
 
+def _like_prefix(value):
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def _allocate_usernames(cursor, names):
+    """[(ad, soyad)] için çakışmayan kullanıcı adları üretir.
+
+    Aynı kökle başlayan mevcut kullanıcı adları tek sorguda okunur; ekler
+    (ali.veli1, ali.veli2, ...) bellekte, parti içi çakışmalar da gözetilerek atanır.
+    """
+    bases = [_generate_username(ad, soyad) for ad, soyad in names]
+    unique = sorted(set(bases))
+    conditions = " OR ".join(["kullanici_adi LIKE %s"] * len(unique))
+    cursor.execute(
+        f"SELECT kullanici_adi FROM Kullanici WHERE {conditions}",
+        [_like_prefix(base) for base in unique],
+    )
+    taken = {row["kullanici_adi"].lower() for row in cursor.fetchall()}
+    usernames = []
+    for base in bases:
+        username, tries = base, 0
+        while username in taken:
+            tries += 1
+            username = f"{base}{tries}"
+        taken.add(username)
+        usernames.append(username)
+    return usernames
+
+
+def _unique_tc_numbers(cursor, count):
+    """Personel tablosunda ve kendi aralarında tekrar etmeyen geçici TC numaraları."""
+    numbers = set()
+    while len(numbers) < count:
+        candidates = {"".join(random.choices(string.digits, k=11)) for _ in range(count - len(numbers))} - numbers
+        placeholders = ", ".join(["%s"] * len(candidates))
+        cursor.execute(
+            f"SELECT tc_kimlik_no FROM Personel WHERE tc_kimlik_no IN ({placeholders})",
+            list(candidates),
+        )
+        numbers |= candidates - {row["tc_kimlik_no"] for row in cursor.fetchall()}
+    return list(numbers)
+
+
+def _parse_kidem(data):
+    try:
+        kidem_seviyesi = int(data.get("kidem_seviyesi", 3))
+    except Exception:
+        kidem_seviyesi = 3
+    return kidem_seviyesi if kidem_seviyesi in (1, 2, 3) else 3
+
+
+@candidate_bp.route("/candidates/approve", methods=["POST"])
+@admin_required
+def approve_candidates():
+    """Toplu işe alım: {"aday_ids": [id, ...], "kidem_seviyesi": 3}.
+
+    Adaylar, pozisyon departmanları ve mevcut kullanıcı adları birer sorguda
+    okunur; parolalar worker havuzunda hash'lenir, kayıtlar çok satırlı
+    INSERT'lerle tek transaction'da yazılır. Yanıt her aday için sonucu içerir.
+    """
+    data = request.get_json() or {}
+    raw_ids = data.get("aday_ids")
+    if not isinstance(raw_ids, list) or not raw_ids:
+        return jsonify({"error": "aday_ids bir id listesi olmalıdır"}), 400
+    if len(raw_ids) > MAX_BULK_APPROVE:
+        return jsonify({"error": f"Tek seferde en fazla {MAX_BULK_APPROVE} aday onaylanabilir"}), 400
+    kidem_seviyesi = _parse_kidem(data)
+
+    outcomes = {}
+    aday_ids = []
+    for raw in raw_ids:
+        try:
+            aday_id = int(raw)
+        except (TypeError, ValueError):
+            outcomes[str(raw)] = {"sonuc": "gecersiz_id"}
+            continue
+        if aday_id not in aday_ids:
+            aday_ids.append(aday_id)
+
+    # Hash'ler satır kilitleri alınmadan önce üretilir
+    passwords = [_generate_password(12) for _ in aday_ids]
+    password_hashes = dict(zip(aday_ids, hash_passwords(passwords)))
+    passwords = dict(zip(aday_ids, passwords))
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        found = {}
+        if aday_ids:
+            placeholders = ", ".join(["%s"] * len(aday_ids))
+            cursor.execute(
+                f"""
+                SELECT a.aday_id, a.ad, a.soyad, a.email, a.telefon, a.pozisyon_id, a.durum,
+                       p.departman_id
+                FROM Adaylar a
+                LEFT JOIN Pozisyon p ON a.pozisyon_id = p.pozisyon_id
+                WHERE a.aday_id IN ({placeholders})
+                FOR UPDATE
+                """,
+                aday_ids,
+            )
+            found = {row["aday_id"]: row for row in cursor.fetchall()}
+
+        adaylar = []
+        for aday_id in aday_ids:
+            aday = found.get(aday_id)
+            if aday is None:
+                outcomes[aday_id] = {"sonuc": "bulunamadi"}
+            elif aday["durum"] == "Kabul":
+                outcomes[aday_id] = {"sonuc": "zaten_onayli"}
+            else:
+                adaylar.append(aday)
+
+        if adaylar:
+            ise_giris_tarihi = datetime.date.today().strftime("%Y-%m-%d")
+            tc_numbers = _unique_tc_numbers(cursor, len(adaylar))
+            usernames = _allocate_usernames(cursor, [(a["ad"], a["soyad"]) for a in adaylar])
+            onaylanan = [a["aday_id"] for a in adaylar]
+            placeholders = ", ".join(["%s"] * len(onaylanan))
+
+            cursor.execute(
+                f"UPDATE Adaylar SET durum = 'Kabul' WHERE aday_id IN ({placeholders})",
+                onaylanan,
+            )
+            candidate_counts.apply_transitions(cursor, [(a["durum"], "Kabul") for a in adaylar])
+            # VALUES yalnızca yer tutucu içerir; PyMySQL böylece tek çok satırlı INSERT gönderir
+            cursor.executemany(
+                """
+                INSERT INTO Personel (tc_kimlik_no, ad, soyad, dogum_tarihi, telefon, email, adres, ise_giris_tarihi, departman_id, aktif_mi)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                [
+                    (tc, a["ad"], a["soyad"], "1990-01-01", a.get("telefon"), a.get("email"),
+                     None, ise_giris_tarihi, a.get("departman_id"), 1)
+                    for tc, a in zip(tc_numbers, adaylar)
+                ],
+            )
+            cursor.execute(
+                f"SELECT personel_id, tc_kimlik_no FROM Personel WHERE tc_kimlik_no IN ({placeholders})",
+                tc_numbers,
+            )
+            personel_by_tc = {row["tc_kimlik_no"]: row["personel_id"] for row in cursor.fetchall()}
+            personel_ids = [personel_by_tc[tc] for tc in tc_numbers]
+
+            pozisyon_rows = [
+                (personel_id, a["pozisyon_id"], ise_giris_tarihi, 1, kidem_seviyesi)
+                for personel_id, a in zip(personel_ids, adaylar)
+                if a.get("pozisyon_id")
+            ]
+            if pozisyon_rows:
+                cursor.executemany(
+                    """
+                    INSERT INTO Personel_Pozisyon (personel_id, pozisyon_id, baslangic_tarihi, guncel_mi, kidem_seviyesi)
+                    VALUES (%s, %s, %s, %s, %s)
+                    """,
+                    pozisyon_rows,
+                )
+            cursor.executemany(
+                """
+                INSERT INTO Kullanici (kullanici_adi, sifre_hash, email, rol, personel_id, ilk_giris, aktif_mi)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                [
+                    (username, password_hashes[a["aday_id"]], a.get("email"), "employee", personel_id, 1, 1)
+                    for username, personel_id, a in zip(usernames, personel_ids, adaylar)
+                ],
+            )
+            for username, personel_id, a in zip(usernames, personel_ids, adaylar):
+                outcomes[a["aday_id"]] = {
+                    "sonuc": "onaylandi",
+                    "username": username,
+                    "password": passwords[a["aday_id"]],
+                    "personel_id": personel_id,
+                }
+
+        conn.commit()
+        if adaylar:
+            candidate_counts.changed()
+            events.publish("aday", {"adet": len(adaylar)}, roller=("admin",))
+            employees_changed([o["personel_id"] for o in outcomes.values() if o.get("personel_id")])
+        ozet = {}
+        for sonuc in outcomes.values():
+            ozet[sonuc["sonuc"]] = ozet.get(sonuc["sonuc"], 0) + 1
+        return jsonify({
+            "sonuclar": [{"aday_id": aday_id, **sonuc} for aday_id, sonuc in outcomes.items()],
+            "ozet": ozet,
+        })
+    except Exception as e:
+        conn.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        conn.close()
+
+
 @candidate_bp.route("/candidates/<int:aday_id>/reject", methods=["POST"])
 @admin_required
 def reject_candidate(aday_id: int):
@@ -302,12 +681,17 @@ def reject_candidate(aday_id: int):
     conn = get_connection()
     cursor = conn.cursor()
     try:
+        cursor.execute("SELECT durum FROM Adaylar WHERE aday_id = %s FOR UPDATE", (aday_id,))
+        aday = cursor.fetchone()
+        if not aday:
+            return jsonify({"error": "Aday bulunamadı"}), 404
         cursor.execute(
             "UPDATE Adaylar SET durum = %s WHERE aday_id = %s", ("Red", aday_id)
         )
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Aday bulunamadı"}), 404
+        candidate_counts.apply_transitions(cursor, [(aday["durum"], "Red")])
         conn.commit()
+        candidate_counts.changed()
+        events.publish("aday", {"aday_id": aday_id}, roller=("admin",))
         return jsonify({"message": "Aday reddedildi"})
     except Exception as e:
         conn.rollback()
@@ -1,15 +1,34 @@
 from flask import Blueprint, jsonify, request, send_file
 from utils.db import get_connection
+from utils.json_provider import json_list_response
 from api.auth import login_required, admin_required
 import datetime
 from api.auth import decode_token
 from flask import request, jsonify
 from werkzeug.security import generate_password_hash
-from utils.pdf_generator import PDFGenerator
+from utils.payroll import mark_payroll_dirty
+from utils import employee_profile, events
+from utils.compression import not_modified, version_etag
+from utils.employee_import import decode_lines, run_import as employee_import_csv
+from api.leave import calendar_changed, leave_changed
 
 employee_bp = Blueprint('employee', __name__, url_prefix='/api')
 
 
+def employees_changed(personel_ids=None):
+    """Personel yazan uç noktalar commit'ten sonra çağırır.
+
+    `personel_ids` verilmezse (departman/pozisyon değişiklikleri) tüm profiller
+    geçersiz sayılır. İzin takvimi önbelleği de temizlenir (aktiflik ve
+    departman değişiklikleri takvimi etkiler). Adminlere `personel` bildirimi
+    yayınlanır; liste ve dashboard ETag'leri bu kanalın sürümünden üretilir.
+    """
+    employee_profile.invalidate(personel_ids)
+    calendar_changed()
+    ids = sorted({int(pid) for pid in personel_ids or () if pid})
+    events.publish('personel', {'personel_ids': ids}, roller=('admin',), personel_ids=ids)
+
+
 @employee_bp.route("/employees/form-data", methods=["GET"])
 @login_required
 def employee_form_data():
@@ -108,6 +127,7 @@ def employee_list_report():
             'ozel_taban_maas': row.get('ozel_taban_maas'),
         } for row in rows]
 
+        from utils.pdf_generator import PDFGenerator
         gen = PDFGenerator()
         buffer = gen.personel_listesi_pdf(personeller)
         return send_file(buffer, mimetype='application/pdf', as_attachment=True, download_name='personel_listesi.pdf')
@@ -121,104 +141,31 @@ def employee_list_report():
 @employee_bp.route("/employees/<int:personel_id>/report", methods=["GET"])
 @login_required
 def employee_detail_report(personel_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-
     try:
-        cursor.execute("""
-            SELECT 
-                p.personel_id, p.tc_kimlik_no, p.ad, p.soyad, p.telefon, p.email,
-                p.ise_giris_tarihi, p.dogum_tarihi, p.adres, p.aktif_mi,
-                d.departman_id, d.departman_adi,
-                poz.pozisyon_id, poz.pozisyon_adi,
-                COALESCE(pp.ozel_taban_maas, poz.taban_maas + (COALESCE(pp.kidem_seviyesi, 3) - 1) * 15000) AS taban_maas,
-                COALESCE(pp.kidem_seviyesi, 3) AS kidem_seviyesi,
-                pp.ozel_taban_maas
-            FROM Personel p
-            LEFT JOIN Departman d ON p.departman_id = d.departman_id
-            LEFT JOIN Personel_Pozisyon pp ON p.personel_id = pp.personel_id AND pp.guncel_mi = 1
-            LEFT JOIN Pozisyon poz ON pp.pozisyon_id = poz.pozisyon_id
-            WHERE p.personel_id = %s
-        """, (personel_id,))
-        row = cursor.fetchone()
-
-        if not row:
+        profil = employee_profile.load(personel_id, ('personel', 'izinler', 'devam_ozet', 'maaslar'))
+        if not profil['personel']:
             return jsonify({'error': 'Personel bulunamadı'}), 404
 
-        personel = {
-            'personel_id': row['personel_id'],
-            'tc_kimlik_no': row['tc_kimlik_no'],
-            'ad': row['ad'],
-            'soyad': row['soyad'],
-            'telefon': row['telefon'],
-            'email': row['email'],
-            'ise_giris_tarihi': row['ise_giris_tarihi'],
-            'dogum_tarihi': row['dogum_tarihi'],
-            'adres': row['adres'],
-            'aktif_mi': bool(row['aktif_mi']),
-            'departman_id': row['departman_id'],
-            'departman_adi': row['departman_adi'],
-            'pozisyon_id': row['pozisyon_id'],
-            'pozisyon_adi': row['pozisyon_adi'],
-            'taban_maas': row['taban_maas'],
-            'kidem_seviyesi': row.get('kidem_seviyesi'),
-            'ozel_taban_maas': row.get('ozel_taban_maas'),
-        }
-
-        cursor.execute("""
-            SELECT ik.baslangic_tarihi, ik.bitis_tarihi, ik.gun_sayisi, 
-                   ik.onay_durumu, it.izin_adi
-            FROM Izin_Kayit ik
-            JOIN Izin_Turu it ON ik.izin_turu_id = it.izin_turu_id
-            WHERE ik.personel_id = %s
-            ORDER BY ik.baslangic_tarihi DESC
-            LIMIT 50
-        """, (personel_id,))
-        izinler = [{
-            'baslangic_tarihi': row['baslangic_tarihi'],
-            'bitis_tarihi': row['bitis_tarihi'],
-            'gun_sayisi': row['gun_sayisi'],
-            'onay_durumu': row['onay_durumu'],
-            'izin_adi': row['izin_adi']
-        } for row in cursor.fetchall()]
-
-        cursor.execute("""
-            SELECT durum, COUNT(*) as adet FROM Devam
-            WHERE personel_id = %s AND tarih BETWEEN DATE_SUB(CURDATE(), INTERVAL 30 DAY) AND CURDATE()
-            GROUP BY durum
-        """, (personel_id,))
-        devam_rows = cursor.fetchall()
-        devam_ozet = [{'durum': r['durum'], 'adet': r['adet']} for r in devam_rows]
-
-        cursor.execute("""
-            SELECT donem_yil, donem_ay, brut_maas, toplam_ekleme, toplam_kesinti, net_maas, odendi_mi
-            FROM Maas_Hesap
-            WHERE personel_id = %s
-            ORDER BY donem_yil DESC, donem_ay DESC
-            LIMIT 6
-        """, (personel_id,))
-        maaslar = [{
-            'donem_yil': r['donem_yil'], 'donem_ay': r['donem_ay'],
-            'brut_maas': r['brut_maas'], 'toplam_ekleme': r['toplam_ekleme'],
-            'toplam_kesinti': r['toplam_kesinti'], 'net_maas': r['net_maas'],
-            'odendi_mi': r['odendi_mi']
-        } for r in cursor.fetchall()]
-
+        from utils.pdf_generator import PDFGenerator
         gen = PDFGenerator()
-        buffer = gen.personel_detay_pdf(personel, izinler, devam_ozet, maaslar)
+        buffer = gen.personel_detay_pdf(profil['personel'], profil['izinler'], profil['devam_ozet'], profil['maaslar'])
         filename = f"personel_{personel_id}_detay.pdf"
         return send_file(buffer, mimetype='application/pdf', as_attachment=True, download_name=filename)
 
     except Exception as e:
         print(f"PDF Detay Hatası: {e}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        conn.close()
 
 
 @employee_bp.route("/employees", methods=["GET"])
 @login_required
 def employee_list():
+    # Sorgulardan önce denetlenir; yoklayan istemciler için veritabanına gidilmez
+    etag = version_etag('personeller', ('personel',), request.query_string)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -284,7 +231,9 @@ def employee_list():
             'ozel_taban_maas': row.get('ozel_taban_maas'),
         } for row in rows]
 
-        return jsonify(personeller)
+        response = json_list_response(personeller)
+        response.set_etag(etag, weak=True)
+        return response
     except Exception as e:
         print(f"Liste Hatası: {e}")
         return jsonify([])
@@ -295,114 +244,25 @@ def employee_list():
 @employee_bp.route("/employees/<int:personel_id>", methods=["GET"])
 @login_required
 def employee_detail(personel_id):
-    conn = get_connection()
-    cursor = conn.cursor()
+    """Personel profili.
 
+    `include=izinler,maaslar,...` ile döndürülecek bölümler seçilir (bkz.
+    utils/employee_profile.py SECTIONS); verilmezse pozisyon geçmişi, son
+    izinler, devam özeti ve son maaşlar döner. `personel` her zaman eklenir.
+    """
     try:
-        cursor.execute("""
-            SELECT 
-                p.personel_id, p.tc_kimlik_no, p.ad, p.soyad, p.telefon, p.email,
-                p.ise_giris_tarihi, p.dogum_tarihi, p.adres, p.aktif_mi,
-                d.departman_id, d.departman_adi,
-                poz.pozisyon_id, poz.pozisyon_adi,
-                COALESCE(pp.ozel_taban_maas, poz.taban_maas + (COALESCE(pp.kidem_seviyesi, 3) - 1) * 15000) AS taban_maas,
-                COALESCE(pp.kidem_seviyesi, 3) AS kidem_seviyesi,
-                pp.ozel_taban_maas
-            FROM Personel p
-            LEFT JOIN Departman d ON p.departman_id = d.departman_id
-            LEFT JOIN Personel_Pozisyon pp ON p.personel_id = pp.personel_id AND pp.guncel_mi = 1
-            LEFT JOIN Pozisyon poz ON pp.pozisyon_id = poz.pozisyon_id
-            WHERE p.personel_id = %s
-        """, (personel_id,))
-        row = cursor.fetchone()
+        bolumler = employee_profile.parse_include(request.args.get('include'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-        if not row:
+    try:
+        profil = employee_profile.load(personel_id, ['personel'] + bolumler)
+        if not profil['personel']:
             return jsonify({'error': 'Personel bulunamadı'}), 404
-
-        personel = {
-            'personel_id': row['personel_id'],
-            'tc_kimlik_no': row['tc_kimlik_no'],
-            'ad': row['ad'],
-            'soyad': row['soyad'],
-            'telefon': row['telefon'],
-            'email': row['email'],
-            'ise_giris_tarihi': row['ise_giris_tarihi'],
-            'dogum_tarihi': row['dogum_tarihi'],
-            'adres': row['adres'],
-            'aktif_mi': bool(row['aktif_mi']),
-            'departman_id': row['departman_id'],
-            'departman_adi': row['departman_adi'],
-            'pozisyon_id': row['pozisyon_id'],
-            'pozisyon_adi': row['pozisyon_adi'],
-            'taban_maas': row['taban_maas'],
-            'kidem_seviyesi': row.get('kidem_seviyesi'),
-            'ozel_taban_maas': row.get('ozel_taban_maas'),
-        }
-
-        cursor.execute("""
-            SELECT pp.baslangic_tarihi, pp.bitis_tarihi, poz.pozisyon_adi
-            FROM Personel_Pozisyon pp
-            JOIN Pozisyon poz ON pp.pozisyon_id = poz.pozisyon_id
-            WHERE pp.personel_id = %s
-            ORDER BY pp.baslangic_tarihi DESC
-        """, (personel_id,))
-        pozisyon_gecmisi = [{
-            'baslangic_tarihi': row['baslangic_tarihi'],
-            'bitis_tarihi': row['bitis_tarihi'],
-            'pozisyon_adi': row['pozisyon_adi']
-        } for row in cursor.fetchall()]
-
-        cursor.execute("""
-            SELECT ik.baslangic_tarihi, ik.bitis_tarihi, ik.gun_sayisi, 
-                   ik.onay_durumu, it.izin_adi
-            FROM Izin_Kayit ik
-            JOIN Izin_Turu it ON ik.izin_turu_id = it.izin_turu_id
-            WHERE ik.personel_id = %s
-            ORDER BY ik.baslangic_tarihi DESC
-            LIMIT 50
-        """, (personel_id,))
-        izinler = [{
-            'baslangic_tarihi': row['baslangic_tarihi'],
-            'bitis_tarihi': row['bitis_tarihi'],
-            'gun_sayisi': row['gun_sayisi'],
-            'onay_durumu': row['onay_durumu'],
-            'izin_adi': row['izin_adi']
-        } for row in cursor.fetchall()]
-
-        cursor.execute("""
-            SELECT durum, COUNT(*) as adet FROM Devam
-            WHERE personel_id = %s AND tarih BETWEEN DATE_SUB(CURDATE(), INTERVAL 30 DAY) AND CURDATE()
-            GROUP BY durum
-        """, (personel_id,))
-        devam_rows = cursor.fetchall()
-        devam_ozet = [{'durum': r['durum'], 'adet': r['adet']} for r in devam_rows]
-
-        cursor.execute("""
-            SELECT donem_yil, donem_ay, brut_maas, toplam_ekleme, toplam_kesinti, net_maas, odendi_mi
-            FROM Maas_Hesap
-            WHERE personel_id = %s
-            ORDER BY donem_yil DESC, donem_ay DESC
-            LIMIT 6
-        """, (personel_id,))
-        maaslar = [{
-            'donem_yil': r['donem_yil'], 'donem_ay': r['donem_ay'],
-            'brut_maas': r['brut_maas'], 'toplam_ekleme': r['toplam_ekleme'],
-            'toplam_kesinti': r['toplam_kesinti'], 'net_maas': r['net_maas'],
-            'odendi_mi': r['odendi_mi']
-        } for r in cursor.fetchall()]
-
-        return jsonify({
-            'personel': personel,
-            'pozisyon_gecmisi': pozisyon_gecmisi,
-            'izinler': izinler,
-            'devam_ozet': devam_ozet,
-            'maaslar': maaslar
-        })
+        return jsonify(profil)
     except Exception as e:
         print(f"Detay Hatası: {e}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        conn.close()
 
 
 @employee_bp.route("/employees", methods=["POST"])
@@ -460,6 +320,7 @@ def employee_add():
         ''', (kullanici_adi, password_hash, data.get('email'), rol, personel_id))
 
         conn.commit()
+        employees_changed([personel_id])
         return jsonify({'message': 'Personel ve kullanıcı hesabı başarıyla eklendi', 'id': personel_id}), 201
     except Exception as e:
         conn.rollback()
@@ -468,6 +329,39 @@ def employee_add():
         conn.close()
 
 
+@employee_bp.route("/employees/import", methods=["POST"])
+@admin_required
+def employee_import():
+    """CSV'den toplu personel ekler (bkz. utils/employee_import.py).
+
+    Dosya multipart `dosya` alanında ya da `text/csv` gövde olarak gönderilir.
+    Yanıt eklenen/hatalı satır sayılarını ve satır bazlı hata raporunu içerir.
+    """
+    upload = request.files.get('dosya')
+    if upload is not None:
+        stream = upload.stream
+    elif request.mimetype == 'text/csv':
+        stream = request.stream
+    else:
+        return jsonify({'error': 'CSV dosyası gerekli (dosya alanı ya da text/csv gövde)'}), 400
+
+    conn = get_connection()
+    try:
+        report = employee_import_csv(conn, decode_lines(stream))
+        if report['eklenen']:
+            employees_changed([])
+        return jsonify(report)
+    except UnicodeDecodeError:
+        return jsonify({'error': 'Dosya UTF-8 olmalıdır'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+
 @employee_bp.route("/employees/<int:personel_id>", methods=["PUT"])
 @admin_required
 def employee_edit(personel_id):
@@ -512,7 +406,12 @@ def employee_edit(personel_id):
                 (ozel_taban_maas, personel_id),
             )
 
+        if data.get('pozisyon_id') or ozel_taban_maas is not None:
+            # Pozisyon/kıdem/özel maaş değişikliği içinde bulunulan ayın bordrosunu etkiler
+            mark_payroll_dirty(cursor, [personel_id], datetime.date.today(), sebep='pozisyon')
+
         conn.commit()
+        employees_changed([personel_id])
         return jsonify({'message': 'Personel bilgileri güncellendi'})
     except Exception as e:
         conn.rollback()
@@ -559,6 +458,7 @@ def employee_update_me():
         sql = f"UPDATE Personel SET {', '.join(sql_parts)} WHERE personel_id = %s"
         cursor.execute(sql, params)
         conn.commit()
+        employees_changed([personel_id])
         return jsonify({'message': 'Kişisel bilgiler güncellendi'})
     except Exception as e:
         conn.rollback()
@@ -577,6 +477,7 @@ def employee_delete(personel_id):
         cursor.execute("UPDATE Personel SET aktif_mi = 0 WHERE personel_id = %s", (personel_id,))
         cursor.execute("DELETE FROM Kullanici WHERE personel_id = %s", (personel_id,))
         conn.commit()
+        employees_changed([personel_id])
         return jsonify({'message': 'Personel başarıyla silindi'})
     except Exception as e:
         conn.rollback()
@@ -603,6 +504,7 @@ def employee_bulk_delete():
             cursor.execute("DELETE FROM Kullanici WHERE personel_id = %s", (pid,))
         
         conn.commit()
+        employees_changed(personel_ids)
         return jsonify({'message': f'{len(personel_ids)} personel başarıyla silindi'})
     except Exception as e:
         conn.rollback()
@@ -629,6 +531,7 @@ def employee_bulk_department():
             cursor.execute("UPDATE Personel SET departman_id = %s WHERE personel_id = %s", (departman_id, pid))
         
         conn.commit()
+        employees_changed(personel_ids)
         return jsonify({'message': f'{len(personel_ids)} personelin departmanı değiştirildi'})
     except Exception as e:
         conn.rollback()
@@ -657,8 +560,10 @@ def employee_bulk_position():
                 INSERT INTO Personel_Pozisyon (personel_id, pozisyon_id, baslangic_tarihi, guncel_mi)
                 VALUES (%s, %s, CURDATE(), 1)
             """, (pid, pozisyon_id))
-        
+
+        mark_payroll_dirty(cursor, personel_ids, datetime.date.today(), sebep='pozisyon')
         conn.commit()
+        employees_changed(personel_ids)
         return jsonify({'message': f'{len(personel_ids)} personelin pozisyonu değiştirildi'})
     except Exception as e:
         conn.rollback()
@@ -669,84 +574,28 @@ def employee_bulk_position():
 @employee_bp.route("/employees/<int:personel_id>/attendance", methods=["GET"])
 @login_required
 def employee_attendance(personel_id):
-    conn = get_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            SELECT tarih, durum, ek_mesai_saat
-            FROM Devam
-            WHERE personel_id = %s
-            ORDER BY tarih DESC
-        """, (personel_id,))
-        rows = cursor.fetchall()
-        return jsonify([{
-            'tarih': str(r['tarih']),
-            'durum': r['durum'],
-            'ek_mesai_saat': r.get('ek_mesai_saat', 0)
-        } for r in rows])
+        return jsonify(employee_profile.load(personel_id, ('devam',))['devam'])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        conn.close()
 
 
 @employee_bp.route("/employees/<int:personel_id>/leaves", methods=["GET"])
 @login_required
 def employee_leaves(personel_id):
-    conn = get_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            SELECT k.izin_kayit_id, k.baslangic_tarihi, k.bitis_tarihi, 
-                   k.gun_sayisi, k.onay_durumu, t.izin_adi
-            FROM Izin_Kayit k
-            JOIN Izin_Turu t ON k.izin_turu_id = t.izin_turu_id
-            WHERE k.personel_id = %s
-            ORDER BY k.baslangic_tarihi DESC
-        """, (personel_id,))
-        rows = cursor.fetchall()
-        return jsonify([{
-            'izin_kayit_id': r['izin_kayit_id'],
-            'baslangic_tarihi': str(r['baslangic_tarihi']),
-            'bitis_tarihi': str(r['bitis_tarihi']),
-            'gun_sayisi': r['gun_sayisi'],
-            'onay_durumu': r['onay_durumu'],
-            'izin_adi': r['izin_adi']
-        } for r in rows])
+        return jsonify(employee_profile.load(personel_id, ('izin_gecmisi',))['izin_gecmisi'])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        conn.close()
 
 
 @employee_bp.route("/employees/<int:personel_id>/salary", methods=["GET"])
 @login_required
 def employee_salary(personel_id):
-    conn = get_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute("""
-            SELECT maas_hesap_id, donem_yil, donem_ay, brut_maas, 
-                   toplam_ekleme, toplam_kesinti, net_maas, odendi_mi
-            FROM Maas_Hesap
-            WHERE personel_id = %s
-            ORDER BY donem_yil DESC, donem_ay DESC
-        """, (personel_id,))
-        rows = cursor.fetchall()
-        return jsonify([{
-            'maas_hesap_id': r['maas_hesap_id'],
-            'donem_yil': r['donem_yil'],
-            'donem_ay': r['donem_ay'],
-            'brut_maas': float(r['brut_maas']) if r['brut_maas'] else 0,
-            'toplam_ekleme': float(r['toplam_ekleme']) if r['toplam_ekleme'] else 0,
-            'toplam_kesinti': float(r['toplam_kesinti']) if r['toplam_kesinti'] else 0,
-            'net_maas': float(r['net_maas']) if r['net_maas'] else 0,
-            'odendi_mi': bool(r['odendi_mi'])
-        } for r in rows])
+        return jsonify(employee_profile.load(personel_id, ('maas_gecmisi',))['maas_gecmisi'])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        conn.close()
 
 
 @employee_bp.route("/employees/<int:personel_id>/restore", methods=["POST"])
@@ -764,6 +613,7 @@ def employee_restore(personel_id):
         
         cursor.execute("UPDATE Personel SET aktif_mi = 1 WHERE personel_id = %s", (personel_id,))
         conn.commit()
+        employees_changed([personel_id])
         return jsonify({'message': 'Personel başarıyla geri yüklendi'})
     except Exception as e:
         conn.rollback()
@@ -794,6 +644,8 @@ def employee_permanent_delete(personel_id):
         cursor.execute("DELETE FROM Izin_Kayit WHERE personel_id = %s", (personel_id,))
         cursor.execute("DELETE FROM Devam WHERE personel_id = %s", (personel_id,))
         cursor.execute("DELETE FROM Personel_Pozisyon WHERE personel_id = %s", (personel_id,))
+        cursor.execute("DELETE FROM Bordro_Degisiklik WHERE personel_id = %s", (personel_id,))
+        cursor.execute("DELETE FROM Izin_Bakiye WHERE personel_id = %s", (personel_id,))
         # find any kullanıcı ids for this personel and remove related records that reference kullanici_id
         cursor.execute("SELECT kullanici_id FROM Kullanici WHERE personel_id = %s", (personel_id,))
         krows = cursor.fetchall()
@@ -806,6 +658,8 @@ def employee_permanent_delete(personel_id):
         cursor.execute("DELETE FROM Personel WHERE personel_id = %s", (personel_id,))
         
         conn.commit()
+        leave_changed([personel_id])
+        employees_changed([personel_id])
         return jsonify({'message': 'Personel ve tüm kayıtları kalıcı olarak silindi'})
     except Exception as e:
         conn.rollback()
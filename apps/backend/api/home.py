@@ -1,17 +1,20 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from utils.db import get_connection
-from api.auth import login_required, decode_token
+from utils import announcement_feed, events
+from utils.compression import not_modified, version_etag
+from api.auth import login_required, decode_token, stream_token_payload
 import datetime
 
 home_bp = Blueprint('home', __name__, url_prefix='/api')
 
 
+# Dashboard'un okuduğu tabloları yazan uç noktaların yayın kanalları
+DASHBOARD_CHANNELS = ('personel', 'devam', 'izin', 'bordro', 'duyuru', 'aday')
+
+
 @home_bp.route("/dashboard", methods=["GET"])
 @login_required
 def dashboard():
-    conn = get_connection()
-    cursor = conn.cursor()
-
     bugun = datetime.date.today().strftime('%Y-%m-%d')
 
     # Kullanıcı rolü ve personel bilgisi
@@ -25,6 +28,18 @@ def dashboard():
             user_role = payload.get('role')
             current_personel_id = payload.get('personel_id')
 
+    # Sorgulardan önce denetlenir; yoklayan istemciler için veritabanına gidilmez.
+    # Bitiş anı geçen duyurular önce düşürülür ki `duyuru` sürümü ETag'e yansısın.
+    announcement_feed.expire_due()
+    etag = version_etag('dashboard', DASHBOARD_CHANNELS, bugun, user_role, current_personel_id)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    hata = False
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
     izinli_sayisi = 0
     toplam_personel = 0
     bekleyen_isler = 0
@@ -223,24 +238,13 @@ def dashboard():
         """)
         son_aktiviteler = [{'tip': row['tip'], 'personel': row['personel'], 'aksiyon': row['aksiyon'], 'tarih': str(row['tarih'])} for row in cursor.fetchall()]
 
-        cursor.execute("""
-            SELECT d.duyuru_id,
-                   d.baslik,
-                   d.icerik,
-                   d.yayin_tarihi,
-                   d.oncelik
-            FROM Duyuru d
-            WHERE d.aktif_mi = 1
-            ORDER BY d.yayin_tarihi DESC
-            LIMIT 5
-        """)
         duyurular = [{
             'duyuru_id': row['duyuru_id'],
             'baslik': row['baslik'],
             'icerik': row['icerik'],
             'yayin_tarihi': str(row['yayin_tarihi']) if row['yayin_tarihi'] else None,
             'oncelik': row['oncelik'],
-        } for row in cursor.fetchall()]
+        } for row in announcement_feed.latest(5)]
 
         cursor.execute("""
             SELECT a.aday_id,
@@ -265,6 +269,7 @@ def dashboard():
 
     except Exception as e:
         print("Dashboard Hatası:", repr(e))
+        hata = True
         departman_data = []
         devamsizlik_data = []
         ise_alim_aylik = []
@@ -278,7 +283,7 @@ def dashboard():
     finally:
         conn.close()
 
-    return jsonify({
+    response = jsonify({
         'stats': {
             'izinli': izinli_sayisi,
             'toplam': toplam_personel,
@@ -298,3 +303,28 @@ def dashboard():
         'duyurular': duyurular,
         'adaylar': adaylar
     })
+    if not hata:
+        # Hata sonrası kısmi veri önbelleğe alınmasın diye yalnızca başarılı yanıt etiketlenir
+        response.set_etag(etag, weak=True)
+    return response
+
+
+@home_bp.route("/events", methods=["GET"])
+def event_stream():
+    """Değişiklik bildirimleri (duyuru, izin, bordro, aday, personel, devam) için SSE akışı.
+
+    İstemci olay geldiğinde ilgili veriyi yeniden çeker; `reset` olayında
+    tüm ekranı tazeler. Token `Authorization` başlığı ya da `token` parametresi ile verilir.
+    """
+    payload = stream_token_payload()
+    if not payload:
+        return jsonify({'error': 'Oturum açmanız gerekiyor'}), 401
+    if events.at_capacity():
+        return jsonify({'error': 'Bildirim kanalı dolu, daha sonra tekrar deneyin'}), 503, {'Retry-After': '30'}
+
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    return Response(
+        events.stream(payload, last_id=last_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
@@ -1,5 +1,10 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, send_file
 from utils.db import get_connection
+from utils.cache import VersionedCache
+from utils import employee_profile, events, leave_balance, leave_index
+from utils.json_provider import json_list_response
+from utils.payroll import mark_payroll_dirty, month_bounds
+from utils.archive import include_archive_requested, table_source
 from api.auth import login_required, admin_required
 from api.auth import decode_token
 from datetime import datetime
@@ -8,13 +13,38 @@ from datetime import timedelta
 leave_bp = Blueprint('leave', __name__, url_prefix='/api')
 
 
+MAX_PAGE_SIZE = 200
+STATUS_FILTERS = {'bekleyen': 'Beklemede', 'onaylanan': 'Onaylandi', 'reddedilen': 'Reddedildi'}
+
+# Filtre bazında toplam kayıt sayısı; izin yazan uç noktalar leave_changed ile geçersiz kılar
+_leave_counts = VersionedCache('leave_count', ttl=300, maxsize=2048)
+# (departman_id, yil, ay) -> aylık doluluk; leave_changed ve personel yazan uç noktalar (calendar_changed) geçersiz kılar
+_calendar_months = VersionedCache('leave_calendar', ttl=300, maxsize=512)
+MAX_CALENDAR_DAYS = 366
+
+
+def _parse_cursor(value):
+    """'YYYY-MM-DD_<izin_kayit_id>' biçimindeki sayfa imlecini çözer."""
+    tarih, _, izin_id = value.partition('_')
+    return datetime.strptime(tarih, '%Y-%m-%d').date(), int(izin_id)
+
+
 @leave_bp.route("/leaves", methods=["GET"])
 @login_required
 def leaves():
+    """İzin listesi.
+
+    `limit` ya da `imlec` verilirse (baslangic_tarihi, izin_kayit_id) üzerinden
+    keyset sayfalama yapılır: sonraki sayfanın imleci `X-Next-Cursor`, filtreye
+    uyan toplam kayıt `X-Total-Count` başlığında döner. Filtreler: filtre,
+    baslangic, bitis (tarih aralığıyla kesişim), izin_turu_id, departman_id,
+    personel_id (yalnızca admin).
+    """
     conn = get_connection()
     cursor = conn.cursor()
     filtre = request.args.get('filtre', 'tumunu')
     archived = request.args.get('archived', '0')
+    include_archive = include_archive_requested()
     try:
         aktif_flag = 0 if str(archived) in ['1', 'true', 'True'] else 1
     except Exception:
@@ -31,6 +61,12 @@ def leaves():
             user_role = payload.get('role')
             current_personel_id = payload.get('personel_id')
 
+    limit = request.args.get('limit', type=int)
+    imlec = request.args.get('imlec')
+    paginated = limit is not None or bool(imlec)
+    if paginated:
+        limit = min(max(limit or 50, 1), MAX_PAGE_SIZE)
+
     try:
         conditions = ["p.aktif_mi = %s"]
         params = [aktif_flag]
@@ -41,30 +77,75 @@ def leaves():
                 return jsonify({'error': 'Personel bilgisi bulunamadı'}), 400
             conditions.append("k.personel_id = %s")
             params.append(current_personel_id)
+        elif request.args.get('personel_id', type=int):
+            conditions.append("k.personel_id = %s")
+            params.append(request.args.get('personel_id', type=int))
 
-        if filtre == 'bekleyen':
-            conditions.append("k.onay_durumu = 'Beklemede'")
-        elif filtre == 'onaylanan':
-            conditions.append("k.onay_durumu = 'Onaylandi'")
-        elif filtre == 'reddedilen':
-            conditions.append("k.onay_durumu = 'Reddedildi'")
+        if filtre in STATUS_FILTERS:
+            conditions.append("k.onay_durumu = %s")
+            params.append(STATUS_FILTERS[filtre])
 
-        where_clause = ""
-        if conditions:
-            where_clause = "WHERE " + " AND ".join(conditions)
+        try:
+            if request.args.get('baslangic'):
+                conditions.append("k.bitis_tarihi >= %s")
+                params.append(datetime.strptime(request.args['baslangic'], '%Y-%m-%d').date())
+            if request.args.get('bitis'):
+                conditions.append("k.baslangic_tarihi <= %s")
+                params.append(datetime.strptime(request.args['bitis'], '%Y-%m-%d').date())
+            cursor_tarih, cursor_id = _parse_cursor(imlec) if imlec else (None, None)
+        except ValueError:
+            return jsonify({'error': 'Tarih ya da imleç biçimi hatalı'}), 400
+
+        if request.args.get('izin_turu_id', type=int):
+            conditions.append("k.izin_turu_id = %s")
+            params.append(request.args.get('izin_turu_id', type=int))
+        if request.args.get('departman_id', type=int):
+            conditions.append("p.departman_id = %s")
+            params.append(request.args.get('departman_id', type=int))
+
+        source = table_source('Izin_Kayit', include_archive)
+        personel_join = "JOIN Personel p ON k.personel_id = p.personel_id"
+        where_clause = "WHERE " + " AND ".join(conditions)
+
+        total = None
+        if paginated:
+            count_key = (include_archive, where_clause, tuple(str(v) for v in params))
+            count_sql = f"SELECT COUNT(*) AS toplam FROM {source} k {personel_join} {where_clause}"
+
+            def count():
+                cursor.execute(count_sql, tuple(params))
+                return cursor.fetchone()['toplam']
+
+            total = _leave_counts.get_or_set(count_key, count)
+
+        page_clause = ""
+        page_params = []
+        if cursor_tarih is not None:
+            page_clause = "AND (k.baslangic_tarihi < %s OR (k.baslangic_tarihi = %s AND k.izin_kayit_id < %s))"
+            page_params = [cursor_tarih, cursor_tarih, cursor_id]
+        limit_clause = ""
+        if paginated:
+            limit_clause = "LIMIT %s"
+            page_params.append(limit + 1)
 
         sql_list = f"""
             SELECT k.izin_kayit_id, k.personel_id, k.izin_turu_id,
                    k.baslangic_tarihi, k.bitis_tarihi, k.gun_sayisi, k.onay_durumu,
-                   p.ad, p.soyad, t.izin_adi 
-            FROM Izin_Kayit k
-            JOIN Personel p ON k.personel_id = p.personel_id
+                   p.ad, p.soyad, t.izin_adi{', k.arsiv' if include_archive else ''}
+            FROM {source} k
+            {personel_join}
             JOIN Izin_Turu t ON k.izin_turu_id = t.izin_turu_id
-            {where_clause}
-            ORDER BY k.baslangic_tarihi DESC
+            {where_clause} {page_clause}
+            ORDER BY k.baslangic_tarihi DESC, k.izin_kayit_id DESC
+            {limit_clause}
         """
-        cursor.execute(sql_list, tuple(params))
+        cursor.execute(sql_list, tuple(params + page_params))
         rows = cursor.fetchall()
+        next_cursor = None
+        if paginated and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = f"{last['baslangic_tarihi']:%Y-%m-%d}_{last['izin_kayit_id']}"
 
         izinler = [{
             'izin_kayit_id': row['izin_kayit_id'],
@@ -78,8 +159,16 @@ def leaves():
             'soyad': row['soyad'],
             'izin_adi': row['izin_adi']
         } for row in rows]
-
-        return jsonify(izinler)
+        if include_archive:
+            for izin, row in zip(izinler, rows):
+                izin['arsiv'] = bool(row['arsiv'])
+
+        response = json_list_response(izinler)
+        if paginated:
+            response.headers['X-Total-Count'] = str(total)
+            if next_cursor:
+                response.headers['X-Next-Cursor'] = next_cursor
+        return response
     except Exception as e:
         print(f"İzin listesi hatası: {e}")
         return jsonify([])
@@ -141,6 +230,7 @@ def leaves_pdf():
         """
         cursor.execute(sql, tuple(params))
         rows = cursor.fetchall()
+        from utils.pdf_generator import PDFGenerator
         gen = PDFGenerator()
         buffer = gen.izin_raporu_pdf(rows, filtre=filtre)
         fname = f"izin_raporu_{filtre}.pdf"
@@ -193,6 +283,11 @@ def create_leave():
     cursor = conn.cursor()
 
     try:
+        # Aynı personelin eşzamanlı talepleri sıraya girer; kilit transaction'ın
+        # ilk okuması olduğundan sonraki okumalar diğer talebin commit'ini görür.
+        cursor.execute("SELECT personel_id FROM Personel WHERE personel_id = %s FOR UPDATE", (personel_id,))
+        if not cursor.fetchone():
+            return jsonify({'error': 'Personel bulunamadı'}), 404
         cursor.execute("SELECT izin_adi, yillik_hak_gun, ucretli_mi FROM Izin_Turu WHERE izin_turu_id = %s", (izin_turu_id,))
         izin_turu = cursor.fetchone()
         max_gun = izin_turu.get('yillik_hak_gun') if izin_turu else None
@@ -204,23 +299,19 @@ def create_leave():
                 return row['izin_turu_id']
             cursor.execute("INSERT INTO Izin_Turu (izin_adi, yillik_hak_gun, ucretli_mi) VALUES (%s, %s, %s)", ('Ücretsiz İzin', 0, 0))
             return cursor.lastrowid
+        leave_index.ensure(cursor, [personel_id], fresh=True)
+        cakisan = leave_index.has_conflict(cursor, personel_id, baslangic, bitis)
+        if cakisan:
+            return jsonify({
+                'error': 'Bu tarihlerle çakışan bir izin kaydı var',
+                'cakisan_izin_id': cakisan.izin_kayit_id,
+            }), 409
+
+        yeni_kayitlar = []
         if ucretli and max_gun and int(max_gun) > 0:
-            try:
-                start_dt = datetime.strptime(baslangic, '%Y-%m-%d')
-            except Exception:
-                start_dt = datetime.strptime(baslangic, '%Y-%m-%d')
-            year_start = datetime(start_dt.year, 1, 1).strftime('%Y-%m-%d')
-            year_end = datetime(start_dt.year, 12, 31).strftime('%Y-%m-%d')
-            cursor.execute("""
-                SELECT COALESCE(SUM(gun_sayisi),0) AS used
-                FROM Izin_Kayit ik
-                JOIN Izin_Turu it ON ik.izin_turu_id = it.izin_turu_id
-                WHERE ik.personel_id = %s AND ik.izin_turu_id = %s
-                  AND NOT (ik.bitis_tarihi < %s OR ik.baslangic_tarihi > %s)
-                  AND ik.onay_durumu != 'Reddedildi'
-            """, (personel_id, izin_turu_id, year_start, year_end))
-            used_row = cursor.fetchone()
-            used_days = int(used_row.get('used', 0) or 0)
+            start_dt = datetime.strptime(baslangic, '%Y-%m-%d')
+            bakiye = leave_balance.lock_balance(cursor, personel_id, izin_turu_id, start_dt.year)
+            used_days = int(bakiye['kullanilan_gun']) + int(bakiye['bekleyen_gun'])
 
             remaining_paid = int(max_gun) - used_days
             if remaining_paid <= 0:
@@ -240,6 +331,7 @@ def create_leave():
                     INSERT INTO Izin_Kayit (personel_id, izin_turu_id, baslangic_tarihi, bitis_tarihi, gun_sayisi, onay_durumu)
                     VALUES (%s, %s, %s, %s, %s, 'Beklemede')
                 """, (personel_id, izin_turu_id, paid_start.strftime('%Y-%m-%d'), paid_end, paid_days))
+                yeni_kayitlar.append((izin_turu_id, paid_start, paid_days))
 
             if unpaid_days > 0:
                 unpaid_type_id = get_unpaid_type_id()
@@ -254,13 +346,21 @@ def create_leave():
                     INSERT INTO Izin_Kayit (personel_id, izin_turu_id, baslangic_tarihi, bitis_tarihi, gun_sayisi, onay_durumu)
                     VALUES (%s, %s, %s, %s, %s, 'Beklemede')
                 """, (personel_id, unpaid_type_id, unpaid_start, unpaid_end, unpaid_days))
+                yeni_kayitlar.append((unpaid_type_id, unpaid_start, unpaid_days))
         else:
             cursor.execute("""
                 INSERT INTO Izin_Kayit (personel_id, izin_turu_id, baslangic_tarihi, bitis_tarihi, gun_sayisi, onay_durumu)
                 VALUES (%s, %s, %s, %s, %s, 'Beklemede')
             """, (personel_id, izin_turu_id, baslangic, bitis, gun_sayisi))
+            yeni_kayitlar.append((izin_turu_id, baslangic, gun_sayisi))
+        izin_id = cursor.lastrowid
+        leave_balance.apply_transitions(cursor, [
+            ({'personel_id': personel_id, 'izin_turu_id': tur, 'baslangic_tarihi': bas, 'gun_sayisi': gun}, None, 'Beklemede')
+            for tur, bas, gun in yeni_kayitlar
+        ])
         conn.commit()
-        return jsonify({'message': 'İzin talebi oluşturuldu', 'id': cursor.lastrowid}), 201
+        leave_changed([personel_id])
+        return jsonify({'message': 'İzin talebi oluşturuldu', 'id': izin_id}), 201
     except Exception as e:
         conn.rollback()
         return jsonify({'error': str(e)}), 500
@@ -268,16 +368,100 @@ def create_leave():
         conn.close()
 
 
-@leave_bp.route("/leaves/<int:izin_id>/approve", methods=["POST"])
-@admin_required
-def leave_approve(izin_id):
+DECISION_CHUNK = 500
+DECISIONS = {'onayla': 'Onaylandi', 'reddet': 'Reddedildi'}
+
+
+def leave_changed(personel_ids):
+    """İzin kayıtları değişen personeller için süreç içi önbellekleri temizler.
+
+    İzin yazan tüm uç noktalar commit'ten sonra çağırır; adminlere ve ilgili
+    personellere `izin` bildirimi de buradan yayınlanır.
+    """
+    leave_index.invalidate(personel_ids)
+    employee_profile.invalidate(personel_ids)
+    _leave_counts.bump()
+    _calendar_months.bump()
+    ids = sorted({int(pid) for pid in personel_ids if pid})
+    if ids:
+        events.publish('izin', {'personel_ids': ids}, roller=('admin',), personel_ids=ids)
+
+
+def calendar_changed():
+    """Personel aktifliği ya da departmanı değişince departman takvimlerini geçersiz kılar."""
+    _calendar_months.bump()
+
+
+def _mark_leaves_payroll_dirty(cursor, rows, sebep):
+    # Yalnızca ücretsiz izinler bordroyu etkiler; aynı aralıktaki personeller tek çağrıda işaretlenir
+    groups = {}
+    for row in rows:
+        if not row.get('ucretli_mi'):
+            groups.setdefault((row['baslangic_tarihi'], row['bitis_tarihi']), set()).add(row['personel_id'])
+    for (bas, bit), personel_ids in groups.items():
+        mark_payroll_dirty(cursor, personel_ids, bas, bit, sebep=sebep)
+
+
+def _apply_leave_decisions(cursor, decisions):
+    """{izin_kayit_id: yeni_durum} kararlarını parça parça, küme tabanlı UPDATE'lerle uygular.
+
+    Çağıranın transaction'ı içinde çalışır; {izin_kayit_id: sonuç} ve durumu
+    değişen personel id'lerini döner. Sonuçlar: 'onaylandi', 'reddedildi',
+    'degisiklik_yok', 'bulunamadi'.
+    """
+    outcomes = {}
+    changed_personel = set()
+    ids = sorted(decisions)
+    for i in range(0, len(ids), DECISION_CHUNK):
+        chunk = ids[i:i + DECISION_CHUNK]
+        cursor.execute(f"""
+            SELECT ik.izin_kayit_id, ik.personel_id, ik.izin_turu_id, ik.baslangic_tarihi, ik.bitis_tarihi,
+                   ik.gun_sayisi, ik.onay_durumu, it.ucretli_mi
+            FROM Izin_Kayit ik
+            JOIN Izin_Turu it ON ik.izin_turu_id = it.izin_turu_id
+            WHERE ik.izin_kayit_id IN ({', '.join(['%s'] * len(chunk))})
+            FOR UPDATE
+        """, chunk)
+        rows = {r['izin_kayit_id']: r for r in cursor.fetchall()}
+
+        by_status = {}
+        for izin_id in chunk:
+            row = rows.get(izin_id)
+            if not row:
+                outcomes[izin_id] = 'bulunamadi'
+            elif row['onay_durumu'] == decisions[izin_id]:
+                outcomes[izin_id] = 'degisiklik_yok'
+            else:
+                by_status.setdefault(decisions[izin_id], []).append(row)
+
+        transitions = []
+        for durum, targets in by_status.items():
+            target_ids = [r['izin_kayit_id'] for r in targets]
+            cursor.execute(
+                f"UPDATE Izin_Kayit SET onay_durumu = %s WHERE izin_kayit_id IN ({', '.join(['%s'] * len(target_ids))})",
+                (durum, *target_ids),
+            )
+            if durum == 'Onaylandi':
+                _mark_leaves_payroll_dirty(cursor, targets, 'izin_onay')
+            else:
+                _mark_leaves_payroll_dirty(cursor, [r for r in targets if r['onay_durumu'] == 'Onaylandi'], 'izin_red')
+            for r in targets:
+                transitions.append((r, r['onay_durumu'], durum))
+                outcomes[r['izin_kayit_id']] = 'onaylandi' if durum == 'Onaylandi' else 'reddedildi'
+                changed_personel.add(r['personel_id'])
+        leave_balance.apply_transitions(cursor, transitions)
+    return outcomes, changed_personel
+
+
+def _decide_one(izin_id, durum, message):
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        cursor.execute("UPDATE Izin_Kayit SET onay_durumu = 'Onaylandi' WHERE izin_kayit_id = %s", (izin_id,))
+        _, changed = _apply_leave_decisions(cursor, {izin_id: durum})
         conn.commit()
-        return jsonify({'message': 'İzin talebi onaylandı'})
+        leave_changed(changed)
+        return jsonify({'message': message})
     except Exception as e:
         conn.rollback()
         return jsonify({'error': str(e)}), 500
@@ -285,18 +469,65 @@ def leave_approve(izin_id):
         conn.close()
 
 
+@leave_bp.route("/leaves/<int:izin_id>/approve", methods=["POST"])
+@admin_required
+def leave_approve(izin_id):
+    return _decide_one(izin_id, 'Onaylandi', 'İzin talebi onaylandı')
+
+
 @leave_bp.route("/leaves/<int:izin_id>/reject", methods=["POST"])
 @admin_required
 def leave_reject(izin_id):
+    return _decide_one(izin_id, 'Reddedildi', 'İzin talebi reddedildi')
+
+
+@leave_bp.route("/leaves/decisions", methods=["POST"])
+@admin_required
+def leave_decisions():
+    """Toplu onay/red: {"onayla": [id, ...], "reddet": [id, ...]}.
+
+    Tüm kararlar tek transaction'da uygulanır; yanıt her id için sonucu içerir.
+    """
+    data = request.get_json() or {}
+    decisions = {}
+    outcomes = {}
+    for key, durum in DECISIONS.items():
+        ids = data.get(key) or []
+        if not isinstance(ids, list):
+            return jsonify({'error': f'{key} bir id listesi olmalıdır'}), 400
+        for raw in ids:
+            try:
+                izin_id = int(raw)
+            except (TypeError, ValueError):
+                outcomes[str(raw)] = 'gecersiz_id'
+                continue
+            if izin_id in decisions and decisions[izin_id] != durum:
+                outcomes[izin_id] = 'cakisan_karar'
+            else:
+                decisions[izin_id] = durum
+    for izin_id in outcomes:
+        decisions.pop(izin_id, None)
+    if not decisions and not outcomes:
+        return jsonify({'error': 'Karar verilecek izin yok'}), 400
+
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        cursor.execute("UPDATE Izin_Kayit SET onay_durumu = 'Reddedildi' WHERE izin_kayit_id = %s", (izin_id,))
+        applied, changed = _apply_leave_decisions(cursor, decisions)
         conn.commit()
-        return jsonify({'message': 'İzin talebi reddedildi'})
+        leave_changed(changed)
+        outcomes.update(applied)
+        ozet = {}
+        for sonuc in outcomes.values():
+            ozet[sonuc] = ozet.get(sonuc, 0) + 1
+        return jsonify({
+            'sonuclar': [{'izin_kayit_id': izin_id, 'sonuc': sonuc} for izin_id, sonuc in outcomes.items()],
+            'ozet': ozet,
+        })
     except Exception as e:
         conn.rollback()
+        print(f"Toplu izin kararı hatası: {e}")
         return jsonify({'error': str(e)}), 500
     finally:
         conn.close()
@@ -318,7 +549,12 @@ def leave_cancel(izin_id):
         return jsonify({'error': 'Geçersiz veya süresi dolmuş token'}), 401
 
     try:
-        cursor.execute("SELECT personel_id, onay_durumu FROM Izin_Kayit WHERE izin_kayit_id = %s", (izin_id,))
+        # Eşzamanlı onay kararıyla yarışmaması için satır kilitlenir
+        cursor.execute("""
+            SELECT personel_id, izin_turu_id, baslangic_tarihi, gun_sayisi, onay_durumu
+            FROM Izin_Kayit WHERE izin_kayit_id = %s
+            FOR UPDATE
+        """, (izin_id,))
         row = cursor.fetchone()
         if not row:
             return jsonify({'error': 'İzin kaydı bulunamadı'}), 404
@@ -330,8 +566,16 @@ def leave_cancel(izin_id):
         if caller_role != 'admin' and int(caller_personel) != int(row.get('personel_id')):
             return jsonify({'error': 'Bu izni iptal etme yetkiniz yok'}), 403
 
-        cursor.execute("UPDATE Izin_Kayit SET onay_durumu = 'Iptal' WHERE izin_kayit_id = %s", (izin_id,))
+        cursor.execute(
+            "UPDATE Izin_Kayit SET onay_durumu = 'Iptal' WHERE izin_kayit_id = %s AND onay_durumu = 'Beklemede'",
+            (izin_id,),
+        )
+        if cursor.rowcount != 1:
+            conn.rollback()
+            return jsonify({'error': 'Sadece beklemedeki izinler iptal edilebilir'}), 400
+        leave_balance.apply_transition(cursor, row, 'Beklemede', 'Iptal')
         conn.commit()
+        leave_changed([row['personel_id']])
         return jsonify({'message': 'İzin talebi iptal edildi'})
     except Exception as e:
         conn.rollback()
@@ -340,6 +584,138 @@ def leave_cancel(izin_id):
         conn.close()
 
 
+def _calendar_month(cursor, departman_id, yil, ay):
+    """Bir ayın gün bazlı onaylı/bekleyen izinli sayıları.
+
+    Her izin fark dizisine başlangıçta +1, bitişin ertesinde -1 olarak yazılır;
+    tek önek toplamı ile günlük sayılar çıkar. İsimler için aralıklar saklanır.
+    """
+    month_start, month_end = month_bounds(yil, ay)
+    sql = """
+        SELECT k.personel_id, k.baslangic_tarihi, k.bitis_tarihi, k.onay_durumu, p.ad, p.soyad
+        FROM Izin_Kayit k
+        JOIN Personel p ON k.personel_id = p.personel_id
+        WHERE k.onay_durumu IN ('Onaylandi', 'Beklemede')
+          AND k.baslangic_tarihi <= %s AND k.bitis_tarihi >= %s
+          AND p.aktif_mi = 1
+    """
+    params = [month_end, month_start]
+    if departman_id:
+        sql += " AND p.departman_id = %s"
+        params.append(departman_id)
+    cursor.execute(sql, params)
+
+    days = month_end.day
+    diff = {'Onaylandi': [0] * (days + 1), 'Beklemede': [0] * (days + 1)}
+    intervals = []
+    for row in cursor.fetchall():
+        bas = max(row['baslangic_tarihi'], month_start).day - 1
+        bit = min(row['bitis_tarihi'], month_end).day - 1
+        diff[row['onay_durumu']][bas] += 1
+        diff[row['onay_durumu']][bit + 1] -= 1
+        intervals.append((bas, bit, row['personel_id'], f"{row['ad']} {row['soyad']}", row['onay_durumu']))
+
+    counts = {}
+    for durum, values in diff.items():
+        running = 0
+        counts[durum] = []
+        for delta in values[:days]:
+            running += delta
+            counts[durum].append(running)
+    return {'onayli': counts['Onaylandi'], 'bekleyen': counts['Beklemede'], 'araliklar': intervals}
+
+
+@leave_bp.route("/leaves/calendar", methods=["GET"])
+@admin_required
+def leave_calendar():
+    """Gün bazlı izinli sayısı: ?baslangic=&bitis=&departman_id=&isimler=1
+
+    Aylık sonuçlar (departman, ay) bazında önbelleklenir; izin yazan uç noktalar
+    leave_changed ile geçersiz kılar.
+    """
+    try:
+        bugun = datetime.now().date()
+        baslangic = datetime.strptime(request.args['baslangic'], '%Y-%m-%d').date() if request.args.get('baslangic') \
+            else bugun.replace(day=1)
+        bitis = datetime.strptime(request.args['bitis'], '%Y-%m-%d').date() if request.args.get('bitis') \
+            else month_bounds(baslangic.year, baslangic.month)[1]
+    except ValueError:
+        return jsonify({'error': 'Tarih formatı hatalı'}), 400
+    if bitis < baslangic:
+        return jsonify({'error': 'Bitiş tarihi başlangıçtan önce olamaz'}), 400
+    if (bitis - baslangic).days + 1 > MAX_CALENDAR_DAYS:
+        return jsonify({'error': f'En fazla {MAX_CALENDAR_DAYS} günlük aralık istenebilir'}), 400
+    departman_id = request.args.get('departman_id', type=int)
+    isimler = str(request.args.get('isimler', '0')) in ['1', 'true', 'True']
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        gunler = []
+        yil, ay = baslangic.year, baslangic.month
+        while (yil, ay) <= (bitis.year, bitis.month):
+            month = _calendar_months.get_or_set(
+                (departman_id, yil, ay), lambda: _calendar_month(cursor, departman_id, yil, ay)
+            )
+            names = None
+            if isimler:
+                names = [[] for _ in month['onayli']]
+                for bas, bit, personel_id, ad_soyad, durum in month['araliklar']:
+                    for i in range(bas, bit + 1):
+                        names[i].append({'personel_id': personel_id, 'ad_soyad': ad_soyad, 'onay_durumu': durum})
+            ay_basi = datetime(yil, ay, 1).date()
+            for i, onayli in enumerate(month['onayli']):
+                tarih = ay_basi + timedelta(days=i)
+                if baslangic <= tarih <= bitis:
+                    gun = {'tarih': tarih.isoformat(), 'onayli': onayli, 'bekleyen': month['bekleyen'][i]}
+                    if names is not None:
+                        gun['personeller'] = names[i]
+                    gunler.append(gun)
+            yil, ay = (yil + 1, 1) if ay == 12 else (yil, ay + 1)
+
+        return jsonify({
+            'baslangic': baslangic.isoformat(),
+            'bitis': bitis.isoformat(),
+            'departman_id': departman_id,
+            'gunler': gunler,
+        })
+    except Exception as e:
+        print(f"İzin takvimi hatası: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+
+@leave_bp.route("/leaves/balance", methods=["GET"])
+@login_required
+def leave_balance_view():
+    auth_header = request.headers.get('Authorization', '')
+    payload = decode_token(auth_header.split(' ')[1]) if auth_header.startswith('Bearer ') else None
+    if not payload:
+        return jsonify({'error': 'Geçersiz veya süresi dolmuş token'}), 401
+
+    personel_id = request.args.get('personel_id', type=int)
+    if payload.get('role') != 'admin' or not personel_id:
+        personel_id = payload.get('personel_id')
+    if not personel_id:
+        return jsonify({'error': 'Personel bilgisi bulunamadı'}), 400
+    yil = request.args.get('yil', type=int) or datetime.now().year
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        return jsonify({
+            'personel_id': int(personel_id),
+            'yil': yil,
+            'bakiyeler': leave_balance.balances(cursor, personel_id, yil),
+        })
+    except Exception as e:
+        print(f"İzin bakiyesi hatası: {e}")
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
+
+
 @leave_bp.route("/leave-types", methods=["GET"])
 @login_required
 def get_leave_types():
@@ -1,20 +1,11 @@
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, jsonify, request, send_file, Response
 from utils.db import get_connection
-from utils.pdf_generator import PDFGenerator
-from api.auth import login_required, admin_required, decode_token
-import datetime
-import calendar
-from decimal import Decimal, ROUND_HALF_UP
-
-SGK_EMPLOYEE_RATE = Decimal('0.14')
-SGK_EMPLOYER_RATE = Decimal('0.205') 
-INCOME_TAX_BANDS = [
-    (Decimal('32000'), Decimal('0.15')),
-    (Decimal('70000'), Decimal('0.20')),
-    (Decimal('250000'), Decimal('0.27')),
-    (Decimal('880000'), Decimal('0.35')),
-    (Decimal('9999999999'), Decimal('0.40')),
-]
+from utils.json_provider import json_list_response
+from utils import employee_profile, events, leave_index
+from utils.payroll import month_bounds, count_working_days, load_payroll_inputs, compute_payroll, generate_period
+from utils import payroll_jobs
+from utils.archive import include_archive_requested, table_source
+from api.auth import login_required, admin_required, decode_token, stream_token_payload
 
 
 def _get_request_user():
@@ -26,22 +17,6 @@ def _get_request_user():
     return decode_token(token)
 
 
-def annual_income_tax(annual_taxable: Decimal) -> Decimal:
-    tax = Decimal('0')
-    remaining = Decimal(annual_taxable)
-    lower = Decimal('0')
-    for upper, rate in INCOME_TAX_BANDS:
-        bracket = min(remaining, upper - lower)
-        if bracket <= 0:
-            lower = upper
-            continue
-        tax += bracket * rate
-        remaining -= bracket
-        lower = upper
-        if remaining <= 0:
-            break
-    return tax
-
 salary_bp = Blueprint('salary', __name__, url_prefix='/api')
 
 
@@ -64,14 +39,15 @@ def salary_list():
     user_role = user_data.get('role')
     current_personel_id = user_data.get('personel_id')
     requested_personel_id = request.args.get('personel_id')
+    include_archive = include_archive_requested()
 
     try:
-        sql = """
+        sql = f"""
             SELECT mh.maas_hesap_id, mh.personel_id, mh.donem_yil, mh.donem_ay,
                    mh.brut_maas, mh.toplam_ekleme, mh.toplam_kesinti, mh.net_maas,
                    mh.odeme_tarihi, mh.odendi_mi,
-                   p.ad, p.soyad, d.departman_adi 
-            FROM Maas_Hesap mh
+                   p.ad, p.soyad, d.departman_adi{', mh.arsiv' if include_archive else ''}
+            FROM {table_source('Maas_Hesap', include_archive)} mh
             JOIN Personel p ON mh.personel_id = p.personel_id
             LEFT JOIN Departman d ON p.departman_id = d.departman_id
             WHERE p.aktif_mi = %s
@@ -117,8 +93,11 @@ def salary_list():
             'soyad': row['soyad'],
             'departman_adi': row['departman_adi']
         } for row in rows]
-        
-        return jsonify(maaslar)
+        if include_archive:
+            for maas, row in zip(maaslar, rows):
+                maas['arsiv'] = bool(row['arsiv'])
+
+        return json_list_response(maaslar)
     except Exception as e:
         print(f"Maaş listesi hatası: {e}")
         return jsonify([])
@@ -200,8 +179,12 @@ def salary_create():
             data.get('toplam_kesinti', 0),
             data.get('net_maas')
         ))
+        maas_id = cursor.lastrowid
         conn.commit()
-        return jsonify({'message': 'Maaş kaydı oluşturuldu', 'id': cursor.lastrowid}), 201
+        employee_profile.invalidate([data.get('personel_id')])
+        events.publish('bordro', {'yil': data.get('donem_yil'), 'ay': data.get('donem_ay')},
+                       roller=('admin',), personel_ids=[data.get('personel_id')])
+        return jsonify({'message': 'Maaş kaydı oluşturuldu', 'id': maas_id}), 201
     except Exception as e:
         conn.rollback()
         return jsonify({'error': str(e)}), 500
@@ -212,6 +195,11 @@ def salary_create():
 @salary_bp.route("/salary/generate", methods=["POST"])
 @admin_required
 def salary_generate():
+    """Dönem bordrolarını üretir.
+
+    `incremental: true` verilirse yalnızca girdisi değişen personeller yeniden
+    hesaplanır (bkz. utils.payroll.generate_period).
+    """
     data = request.get_json() or {}
     try:
         yil = int(data.get('yil'))
@@ -219,175 +207,133 @@ def salary_generate():
     except Exception:
         return jsonify({'error': 'yil ve ay zorunludur'}), 400
 
-    personel_filter = data.get('personel_id')
-    month_start = datetime.date(yil, ay, 1)
-    last_day = calendar.monthrange(yil, ay)[1]
-    month_end = datetime.date(yil, ay, last_day)
-    working_days = 0
-    cur = month_start
-    while cur <= month_end:
-        if cur.weekday() < 5:
-            working_days += 1
-        cur += datetime.timedelta(days=1)
-
-    if working_days == 0:
+    incremental = str(data.get('incremental', '')).lower() in ['1', 'true']
+    month_start, month_end = month_bounds(yil, ay)
+    if count_working_days(month_start, month_end) == 0:
         return jsonify({'error': 'Geçersiz ay, çalışma günü bulunamadı'}), 400
 
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        sql = """
-            SELECT p.personel_id,
-                   poz.taban_maas,
-                   COALESCE(pp.kidem_seviyesi, 3) AS kidem_seviyesi,
-                   pp.ozel_taban_maas
-            FROM Personel p
-            LEFT JOIN Personel_Pozisyon pp ON p.personel_id = pp.personel_id AND pp.guncel_mi = 1
-            LEFT JOIN Pozisyon poz ON pp.pozisyon_id = poz.pozisyon_id
-            WHERE p.aktif_mi = 1
-        """
-        params = []
-        if personel_filter:
-            sql += " AND p.personel_id = %s"
-            params.append(personel_filter)
+        sonuc = generate_period(
+            cursor, yil, ay,
+            personel_id=data.get('personel_id'),
+            departman_id=data.get('departman_id'),
+            incremental=incremental,
+        )
+        conn.commit()
+        etkilenen = [r['personel_id'] for r in sonuc['created'] + sonuc.get('updated', [])]
+        employee_profile.invalidate(etkilenen)
+        events.publish('bordro', {'yil': yil, 'ay': ay}, roller=('admin',), personel_ids=etkilenen)
+        if not incremental:
+            return jsonify({
+                'message': f"{len(sonuc['created'])} bordro oluşturuldu",
+                'created': sonuc['created'],
+                'skipped_paid': sonuc['skipped_paid'],
+            })
+        return jsonify({
+            'message': f"{len(sonuc['created'])} bordro oluşturuldu, {len(sonuc['updated'])} bordro güncellendi",
+            **sonuc,
+        })
+    except Exception as e:
+        conn.rollback()
+        print(f'Bordro oluşturma hatası: {e}')
+        return jsonify({'error': str(e)}), 500
+    finally:
+        conn.close()
 
-        cursor.execute(sql, params)
-        employees = cursor.fetchall()
 
-        def round2(x):
-            return float(Decimal(x).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
-
-        def get_or_create_bilesen(name: str, tip: str = 'kesinti'):
-            cursor.execute("SELECT bilesen_id FROM Maas_Bileseni WHERE bilesen_adi = %s", (name,))
-            r = cursor.fetchone()
-            if r:
-                return r['bilesen_id']
-            cursor.execute("INSERT INTO Maas_Bileseni (bilesen_adi, bilesen_tipi, sabit_mi, varsayilan_tutar) VALUES (%s, %s, %s, %s)", (name, tip, 0, 0))
-            return cursor.lastrowid
-
-        def annual_income_tax(annual_taxable: Decimal) -> Decimal:
-            tax = Decimal('0')
-            remaining = annual_taxable
-            lower = Decimal('0')
-            for upper, rate in INCOME_TAX_BANDS:
-                bracket = min(remaining, upper - lower)
-                if bracket <= 0:
-                    lower = upper
-                    continue
-                tax += bracket * rate
-                remaining -= bracket
-                lower = upper
-                if remaining <= 0:
-                    break
-            return tax
-
-        created = []
-        for row in employees:
-            pid = row['personel_id']
-            base = Decimal(row.get('taban_maas') or 0)
-            kidem_level = int(row.get('kidem_seviyesi') or 3)
-            if kidem_level < 1:
-                kidem_level = 1
-            auto_taban = base + Decimal('15000') * Decimal(kidem_level - 1)
-            if row.get('ozel_taban_maas') is not None:
-                taban = Decimal(row.get('ozel_taban_maas'))
-            else:
-                taban = auto_taban
-            try:
-                cursor.execute("SELECT maas_hesap_id FROM Maas_Hesap WHERE personel_id = %s AND donem_yil = %s AND donem_ay = %s", (pid, yil, ay))
-                existing = [r['maas_hesap_id'] for r in cursor.fetchall()]
-                if existing:
-                    cursor.execute("DELETE FROM Maas_Detay WHERE maas_hesap_id IN (%s)" % (', '.join(['%s'] * len(existing))), tuple(existing))
-                    cursor.execute("DELETE FROM Maas_Hesap WHERE maas_hesap_id IN (%s)" % (', '.join(['%s'] * len(existing))), tuple(existing))
-            except Exception:
-                pass
-            cursor.execute("""
-                SELECT ik.baslangic_tarihi as bas, ik.bitis_tarihi as bit, it.ucretli_mi as ucretli
-                FROM Izin_Kayit ik
-                JOIN Izin_Turu it ON ik.izin_turu_id = it.izin_turu_id
-                WHERE ik.personel_id = %s AND ik.onay_durumu = 'Onaylandi'
-                  AND NOT (ik.bitis_tarihi < %s OR ik.baslangic_tarihi > %s)
-            """, (pid, month_start.strftime('%Y-%m-%d'), month_end.strftime('%Y-%m-%d')))
-
-            leaves = cursor.fetchall()
-            unpaid_days = 0
-            for l in leaves:
-                try:
-                    bas = l['bas'] if isinstance(l['bas'], datetime.date) else datetime.datetime.strptime(str(l['bas'])[:10], '%Y-%m-%d').date()
-                    bit = l['bit'] if isinstance(l['bit'], datetime.date) else datetime.datetime.strptime(str(l['bit'])[:10], '%Y-%m-%d').date()
-                except Exception:
-                    continue
-
-                overlap_start = max(bas, month_start)
-                overlap_end = min(bit, month_end)
-                if overlap_end < overlap_start:
-                    continue
-                d = overlap_start
-                overlap_count = 0
-                while d <= overlap_end:
-                    if d.weekday() < 5:
-                        overlap_count += 1
-                    d += datetime.timedelta(days=1)
-                if not l.get('ucretli'):
-                    unpaid_days += overlap_count
-            cursor.execute("SELECT SUM(ek_mesai_saat) as toplam_ek FROM Devam WHERE personel_id = %s AND tarih BETWEEN %s AND %s", (pid, month_start.strftime('%Y-%m-%d'), month_end.strftime('%Y-%m-%d')))
-            ek_row = cursor.fetchone()
-            overtime_hours = float(ek_row['toplam_ek'] or 0)
-            OVERTIME_MULTIPLIER = Decimal('1.5')
-            if working_days == 0:
-                continue
+@salary_bp.route("/salary/batch", methods=["POST"])
+@admin_required
+def salary_batch_create():
+    """Bir dönem aralığı için bordroları arka planda üretir.
+
+    Her ay kendi transaction'ında commit edilir; iş yarıda kalırsa
+    /salary/batch/<id>/resume ile kalan aylardan devam edilir.
+    """
+    data = request.get_json() or {}
+    try:
+        bas_yil = int(data.get('baslangic_yil'))
+        bas_ay = int(data.get('baslangic_ay'))
+        bit_yil = int(data.get('bitis_yil', bas_yil))
+        bit_ay = int(data.get('bitis_ay', bas_ay))
+    except Exception:
+        return jsonify({'error': 'baslangic_yil ve baslangic_ay zorunludur'}), 400
 
-            daily_rate = (taban / Decimal(working_days))
-            unpaid_deduction = (daily_rate * Decimal(unpaid_days)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            hourly_rate = (daily_rate / Decimal(8))
-            overtime_pay = (hourly_rate * Decimal(overtime_hours) * OVERTIME_MULTIPLIER).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            sgk_employee = (taban * SGK_EMPLOYEE_RATE).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            taxable_monthly = (taban - sgk_employee - unpaid_deduction)
-            if taxable_monthly < 0:
-                taxable_monthly = Decimal('0.00')
-
-            annual_taxable = (taxable_monthly * Decimal(12))
-            annual_income = annual_income_tax(annual_taxable)
-            monthly_income_tax = (annual_income / Decimal(12)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-            toplam_kesinti = (unpaid_deduction + sgk_employee + monthly_income_tax).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            toplam_ekleme = Decimal('0.00')
-            if overtime_pay > 0:
-                toplam_ekleme += overtime_pay
-            net_maas = (taban - toplam_kesinti + toplam_ekleme).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            cursor.execute("""
-                INSERT INTO Maas_Hesap (personel_id, donem_yil, donem_ay, brut_maas, toplam_ekleme, toplam_kesinti, net_maas, odendi_mi)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, 0)
-            """, (pid, yil, ay, float(taban), float(toplam_ekleme), float(toplam_kesinti), float(net_maas)))
-            mh_id = cursor.lastrowid
-            b_sgk_calisan = get_or_create_bilesen('SGK Çalışan', 'kesinti')
-            b_gelir_vergi = get_or_create_bilesen('Gelir Vergisi', 'kesinti')
-            b_ucretsiz = get_or_create_bilesen('Ücretsiz İzin Kesintisi', 'kesinti')
-            b_sgk_isveren = get_or_create_bilesen('SGK İşveren', 'ekleme')
-
-            if float(sgk_employee) > 0:
-                cursor.execute("INSERT INTO Maas_Detay (maas_hesap_id, bilesen_id, tutar) VALUES (%s, %s, %s)", (mh_id, b_sgk_calisan, float(sgk_employee)))
-            if float(monthly_income_tax) > 0:
-                cursor.execute("INSERT INTO Maas_Detay (maas_hesap_id, bilesen_id, tutar) VALUES (%s, %s, %s)", (mh_id, b_gelir_vergi, float(monthly_income_tax)))
-            if float(unpaid_deduction) > 0:
-                cursor.execute("INSERT INTO Maas_Detay (maas_hesap_id, bilesen_id, tutar) VALUES (%s, %s, %s)", (mh_id, b_ucretsiz, float(unpaid_deduction)))
-            if float(overtime_pay) > 0:
-                b_ekmesai = get_or_create_bilesen('Ek Mesai', 'ekleme')
-                cursor.execute("INSERT INTO Maas_Detay (maas_hesap_id, bilesen_id, tutar) VALUES (%s, %s, %s)", (mh_id, b_ekmesai, float(overtime_pay)))
-            employer_sgk = (taban * SGK_EMPLOYER_RATE).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            cursor.execute("INSERT INTO Maas_Detay (maas_hesap_id, bilesen_id, tutar) VALUES (%s, %s, %s)", (mh_id, b_sgk_isveren, float(employer_sgk)))
-            created.append({'personel_id': pid, 'net_maas': float(net_maas), 'kesinti': float(toplam_kesinti)})
+    if not (1 <= bas_ay <= 12 and 1 <= bit_ay <= 12) or (bas_yil, bas_ay) > (bit_yil, bit_ay):
+        return jsonify({'error': 'Geçersiz dönem aralığı'}), 400
 
+    incremental = str(data.get('incremental', '')).lower() in ['1', 'true']
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        is_id = payroll_jobs.create_job(
+            cursor, bas_yil, bas_ay, bit_yil, bit_ay,
+            departman_id=data.get('departman_id') or None,
+            incremental=incremental,
+        )
         conn.commit()
-        return jsonify({'message': f'{len(created)} bordro oluşturuldu', 'created': created})
     except Exception as e:
         conn.rollback()
-        print(f'Bordro oluşturma hatası: {e}')
         return jsonify({'error': str(e)}), 500
     finally:
         conn.close()
 
+    if not payroll_jobs.start_job(is_id):
+        return jsonify({'error': 'İş zaten çalışıyor', 'is_id': is_id}), 409
+    return jsonify({'message': 'Toplu bordro işi başlatıldı', 'is_id': is_id}), 202
+
+
+def _load_batch_job(is_id):
+    conn = get_connection()
+    try:
+        return payroll_jobs.get_job(conn.cursor(), is_id)
+    finally:
+        conn.close()
+
+
+@salary_bp.route("/salary/batch/<int:is_id>", methods=["GET"])
+@admin_required
+def salary_batch_detail(is_id):
+    job = _load_batch_job(is_id)
+    if not job:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    state = payroll_jobs.job_state(is_id)
+    if state:
+        job['ilerleme'] = state.snapshot()[1]
+    return jsonify(job)
+
+
+@salary_bp.route("/salary/batch/<int:is_id>/resume", methods=["POST"])
+@admin_required
+def salary_batch_resume(is_id):
+    job = _load_batch_job(is_id)
+    if not job:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    if job['durum'] == 'Tamamlandi':
+        return jsonify({'error': 'İş zaten tamamlanmış'}), 400
+    if not payroll_jobs.start_job(is_id):
+        return jsonify({'error': 'İş zaten çalışıyor'}), 409
+    return jsonify({'message': 'İş kaldığı dönemden devam ettiriliyor', 'is_id': is_id}), 202
+
+
+@salary_bp.route("/salary/batch/<int:is_id>/events", methods=["GET"])
+def salary_batch_events(is_id):
+    """İş ilerlemesini (işlenen personel, güncel ay, tahmini süre) SSE ile yayınlar."""
+    payload = stream_token_payload()
+    if not payload:
+        return jsonify({'error': 'Oturum açmanız gerekiyor'}), 401
+    if payload.get('role') != 'admin':
+        return jsonify({'error': 'Bu işlem için yetkiniz yok'}), 403
+
+    return Response(
+        payroll_jobs.stream_job_events(is_id, lambda: _load_batch_job(is_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
 
 @salary_bp.route("/salary/preview", methods=["POST"])
 @login_required
@@ -401,15 +347,8 @@ def salary_preview():
 
     personel_filter = data.get('personel_id')
 
-    month_start = datetime.date(yil, ay, 1)
-    last_day = calendar.monthrange(yil, ay)[1]
-    month_end = datetime.date(yil, ay, last_day)
-    working_days = 0
-    cur = month_start
-    while cur <= month_end:
-        if cur.weekday() < 5:
-            working_days += 1
-        cur += datetime.timedelta(days=1)
+    month_start, month_end = month_bounds(yil, ay)
+    working_days = count_working_days(month_start, month_end)
 
     conn = get_connection()
     cursor = conn.cursor()
@@ -432,86 +371,30 @@ def salary_preview():
 
         cursor.execute(sql, params)
         employees = cursor.fetchall()
+        leaves_index = leave_index.period_index(cursor, [row['personel_id'] for row in employees], month_start, month_end)
 
         previews = []
         for row in employees:
-            pid = row['personel_id']
-            base = Decimal(row.get('taban_maas') or 0)
-            kidem_level = int(row.get('kidem_seviyesi') or 3)
-            if kidem_level < 1:
-                kidem_level = 1
-            auto_taban = base + Decimal('15000') * Decimal(kidem_level - 1)
-            if row.get('ozel_taban_maas') is not None:
-                taban = Decimal(row.get('ozel_taban_maas'))
-            else:
-                taban = auto_taban
-            cursor.execute("""
-                SELECT ik.baslangic_tarihi as bas, ik.bitis_tarihi as bit, it.ucretli_mi as ucretli
-                FROM Izin_Kayit ik
-                JOIN Izin_Turu it ON ik.izin_turu_id = it.izin_turu_id
-                WHERE ik.personel_id = %s AND ik.onay_durumu = 'Onaylandi'
-                  AND NOT (ik.bitis_tarihi < %s OR ik.baslangic_tarihi > %s)
-            """, (pid, month_start.strftime('%Y-%m-%d'), month_end.strftime('%Y-%m-%d')))
-            leaves = cursor.fetchall()
-            unpaid_days = 0
-            for l in leaves:
-                try:
-                    bas = l['bas'] if isinstance(l['bas'], datetime.date) else datetime.datetime.strptime(str(l['bas'])[:10], '%Y-%m-%d').date()
-                    bit = l['bit'] if isinstance(l['bit'], datetime.date) else datetime.datetime.strptime(str(l['bit'])[:10], '%Y-%m-%d').date()
-                except Exception:
-                    continue
-                overlap_start = max(bas, month_start)
-                overlap_end = min(bit, month_end)
-                if overlap_end < overlap_start:
-                    continue
-                d = overlap_start
-                overlap_count = 0
-                while d <= overlap_end:
-                    if d.weekday() < 5:
-                        overlap_count += 1
-                    d += datetime.timedelta(days=1)
-                if not l.get('ucretli'):
-                    unpaid_days += overlap_count
-
-            cursor.execute("SELECT SUM(ek_mesai_saat) as toplam_ek FROM Devam WHERE personel_id = %s AND tarih BETWEEN %s AND %s", (pid, month_start.strftime('%Y-%m-%d'), month_end.strftime('%Y-%m-%d')))
-            ek_row = cursor.fetchone()
-            overtime_hours = float(ek_row['toplam_ek'] or 0)
-
             if working_days == 0:
                 continue
-
-            daily_rate = (taban / Decimal(working_days))
-            unpaid_deduction = (daily_rate * Decimal(unpaid_days)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            sgk_employee = (taban * SGK_EMPLOYEE_RATE).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            taxable_monthly = (taban - sgk_employee - unpaid_deduction)
-            if taxable_monthly < 0:
-                taxable_monthly = Decimal('0.00')
-            annual_taxable = (taxable_monthly * Decimal(12))
-            annual_income = annual_income_tax(annual_taxable)
-            monthly_income_tax = (annual_income / Decimal(12)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-            hourly_rate = (daily_rate / Decimal(8))
-            OVERTIME_MULTIPLIER = Decimal('1.5')
-            overtime_pay = (hourly_rate * Decimal(overtime_hours) * OVERTIME_MULTIPLIER).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-
-            toplam_kesinti = (unpaid_deduction + sgk_employee + monthly_income_tax).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-            toplam_ekleme = overtime_pay
-            net_maas = (taban - toplam_kesinti + toplam_ekleme).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            pid = row['personel_id']
+            leaves, overtime_hours = load_payroll_inputs(cursor, pid, month_start, month_end, leaves_index)
+            result = compute_payroll(row, leaves, overtime_hours, month_start, month_end, working_days)
 
             previews.append({
                 'personel_id': pid,
                 'ad': row.get('ad'),
                 'soyad': row.get('soyad'),
-                'brut_maas': float(taban),
-                'unpaid_days': unpaid_days,
-                'unpaid_deduction': float(unpaid_deduction),
-                'sgk_employee': float(sgk_employee),
-                'monthly_income_tax': float(monthly_income_tax),
-                'overtime_hours': overtime_hours,
-                'overtime_pay': float(overtime_pay),
-                'toplam_kesinti': float(toplam_kesinti),
-                'toplam_ekleme': float(toplam_ekleme),
-                'net_maas': float(net_maas),
+                'brut_maas': float(result['brut_maas']),
+                'unpaid_days': result['unpaid_days'],
+                'unpaid_deduction': float(result['unpaid_deduction']),
+                'sgk_employee': float(result['sgk_employee']),
+                'monthly_income_tax': float(result['monthly_income_tax']),
+                'overtime_hours': result['overtime_hours'],
+                'overtime_pay': float(result['overtime_pay']),
+                'toplam_kesinti': float(result['toplam_kesinti']),
+                'toplam_ekleme': float(result['toplam_ekleme']),
+                'net_maas': float(result['net_maas']),
             })
 
         return jsonify({'previews': previews})
@@ -533,7 +416,13 @@ def salary_pay(maas_id):
             UPDATE Maas_Hesap SET odendi_mi = 1, odeme_tarihi = CURDATE()
             WHERE maas_hesap_id = %s
         """, (maas_id,))
+        cursor.execute("SELECT personel_id, donem_yil, donem_ay FROM Maas_Hesap WHERE maas_hesap_id = %s", (maas_id,))
+        odenen = cursor.fetchone()
         conn.commit()
+        if odenen:
+            employee_profile.invalidate([odenen['personel_id']])
+            events.publish('bordro', {'yil': odenen['donem_yil'], 'ay': odenen['donem_ay'], 'odendi': True},
+                           roller=('admin',), personel_ids=[odenen['personel_id']])
         return jsonify({'message': 'Maaş ödendi olarak işaretlendi'})
     except Exception as e:
         conn.rollback()
@@ -600,6 +489,7 @@ def salary_pdf():
         for m in maaslar:
             cursor.execute("SELECT md.tutar, mb.bilesen_adi, mb.bilesen_tipi FROM Maas_Detay md JOIN Maas_Bileseni mb ON md.bilesen_id = mb.bilesen_id WHERE md.maas_hesap_id = %s", (m['maas_hesap_id'],))
             m['detaylar'] = [{'bilesen_adi': d['bilesen_adi'], 'tutar': d['tutar'], 'tip': d['bilesen_tipi']} for d in cursor.fetchall()]
+        from utils.pdf_generator import PDFGenerator
         gen = PDFGenerator()
         buffer = gen.payrolls_pdf(maaslar, yil=yil, ay=ay)
         fname = f"bordro_toplu_{ay}_{yil}.pdf" if yil and ay else "bordro_toplu.pdf"
@@ -1,6 +1,11 @@
 from flask import Blueprint, jsonify, request
 from utils.db import get_connection
 from api.auth import admin_required, login_required
+from api.candidate import positions_changed
+from api.employee import employees_changed
+from utils.payroll import mark_payroll_dirty
+import datetime
+from decimal import Decimal
 
 settings_bp = Blueprint('settings', __name__, url_prefix='/api/settings')
 
@@ -75,6 +80,7 @@ def department_edit(dept_id):
     try:
         cursor.execute("UPDATE Departman SET departman_adi = %s WHERE departman_id = %s", (departman_adi, dept_id))
         conn.commit()
+        employees_changed()
         return jsonify({'message': 'Departman güncellendi'})
     except Exception as e:
         conn.rollback()
@@ -98,6 +104,7 @@ def department_delete(dept_id):
 
         cursor.execute("DELETE FROM Departman WHERE departman_id = %s", (dept_id,))
         conn.commit()
+        employees_changed()
         return jsonify({'message': 'Departman silindi'})
     except Exception as e:
         conn.rollback()
@@ -161,6 +168,7 @@ def position_add():
             VALUES (%s, %s, %s)
         """, (pozisyon_adi, departman_id or None, taban_maas))
         conn.commit()
+        positions_changed()
         return jsonify({'message': 'Pozisyon eklendi', 'id': cursor.lastrowid}), 201
     except Exception as e:
         conn.rollback()
@@ -185,11 +193,27 @@ def position_edit(pos_id):
     cursor = conn.cursor()
 
     try:
+        cursor.execute("SELECT taban_maas FROM Pozisyon WHERE pozisyon_id = %s", (pos_id,))
+        onceki = cursor.fetchone()
         cursor.execute("""
             UPDATE Pozisyon SET pozisyon_adi = %s, departman_id = %s, taban_maas = %s
             WHERE pozisyon_id = %s
         """, (pozisyon_adi, departman_id or None, taban_maas, pos_id))
+        # Taban maaş değiştiyse pozisyondaki herkesin bu ayki bordrosu yeniden hesaplanmalı
+        if onceki and Decimal(str(onceki['taban_maas'] or 0)) != Decimal(str(taban_maas)):
+            cursor.execute(
+                "SELECT personel_id FROM Personel_Pozisyon WHERE pozisyon_id = %s AND guncel_mi = 1",
+                (pos_id,),
+            )
+            mark_payroll_dirty(
+                cursor,
+                [r['personel_id'] for r in cursor.fetchall()],
+                datetime.date.today(),
+                sebep='taban_maas',
+            )
         conn.commit()
+        positions_changed()
+        employees_changed()
         return jsonify({'message': 'Pozisyon güncellendi'})
     except Exception as e:
         conn.rollback()
@@ -216,6 +240,7 @@ def position_delete(pos_id):
 
         cursor.execute("DELETE FROM Pozisyon WHERE pozisyon_id = %s", (pos_id,))
         conn.commit()
+        positions_changed()
         return jsonify({'message': 'Pozisyon silindi'})
     except Exception as e:
         conn.rollback()
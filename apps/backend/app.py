@@ -2,25 +2,166 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 from api import register_blueprints
-from utils.db import init_db, seed_db
+from utils.db import init_db, seed_db, init_query_instrumentation
+from utils.metrics import init_metrics
+from utils.profiling import init_profiling
+from utils.json_provider import FastJSONProvider
+from utils.compression import init_compression
+import click
+import os
 import sys
 
-app = Flask(__name__)
-app.secret_key = Config.SECRET_KEY
 
-CORS(app, supports_credentials=True, origins=["http://localhost:5173", "http://localhost:3000"])
-
-register_blueprints(app)
-
-try:
+def bootstrap():
+    """Şemayı oluşturur ve varsayılan verileri ekler. Import sırasında çalışmaz."""
     init_db()
     seed_db()
-except KeyboardInterrupt:
-    sys.exit(0)
+
+
+def create_app():
+    """Uygulamayı oluşturur; veritabanına bağlanmaz ve DDL çalıştırmaz."""
+    app = Flask(__name__)
+    app.secret_key = Config.SECRET_KEY
+    app.json = FastJSONProvider(app)
+
+    CORS(
+        app, supports_credentials=True, origins=["http://localhost:5173", "http://localhost:3000"],
+        expose_headers=["X-Next-Cursor", "X-Total-Count"],
+    )
+
+    register_blueprints(app)
+    init_compression(app)
+    init_query_instrumentation(app)
+    init_metrics(app)
+    init_profiling(app)
+
+    @app.cli.command("bootstrap")
+    def bootstrap_command():
+        """Veritabanı şemasını oluşturur ve varsayılan verileri ekler."""
+        bootstrap()
+        print("Veritabanı hazır.")
+
+    @app.cli.command("migrate")
+    @click.option("--status", is_flag=True, help="Göçleri uygulamadan listele")
+    @click.option("--target", type=int, default=None, help="Bu sürüme kadar uygula")
+    def migrate_command(status, target):
+        """Bekleyen şema göçlerini uygular."""
+        from utils.migrations import migrate, migration_status
+
+        if status:
+            for m in migration_status():
+                print(f"{m['version']:04d}_{m['ad']:30s} {'uygulandı' if m['uygulandi'] else 'bekliyor'}")
+            return
+        applied = migrate(target=target)
+        print(f"{len(applied)} göç uygulandı." if applied else "Şema güncel.")
+
+    @app.cli.command("archive")
+    @click.option("--target", "targets", multiple=True, type=click.Choice(["devam", "maas", "izin", "personel"]))
+    @click.option("--batch", type=int, default=1000, help="Parça başına kayıt")
+    @click.option("--max-batches", type=int, default=None, help="Bu kadar parçadan sonra dur (kaldığı yerden sürdürülebilir)")
+    @click.option("--devam-years", type=int, default=2)
+    @click.option("--maas-months", type=int, default=24)
+    @click.option("--izin-years", type=int, default=2)
+    def archive_command(targets, batch, max_batches, devam_years, maas_months, izin_years):
+        """Kapanmış dönemleri arşiv tablolarına taşır."""
+        from utils.archive import run_archive
+
+        run_archive(
+            targets=list(targets) or None, batch=batch, max_batches=max_batches,
+            devam_years=devam_years, maas_months=maas_months, izin_years=izin_years,
+        )
+
+    @app.cli.group("partition")
+    def partition_group():
+        """Devam / Maas_Hesap range partition işlemleri."""
+
+    @partition_group.command("convert")
+    @click.option("--ahead-months", type=int, default=3)
+    @click.option("--ahead-years", type=int, default=1)
+    def partition_convert(ahead_months, ahead_years):
+        """Devam'ı aylık, Maas_Hesap'ı yıllık partition'a dönüştürür (FK'lar kaldırılır)."""
+        from utils.partitions import convert
+
+        convert(ahead_months=ahead_months, ahead_years=ahead_years)
+
+    @partition_group.command("maintain")
+    @click.option("--ahead-months", type=int, default=3, help="Önceden oluşturulacak Devam ayları")
+    @click.option("--ahead-years", type=int, default=1, help="Önceden oluşturulacak Maas_Hesap yılları")
+    @click.option("--retain-years", type=int, default=None, help="Bundan eski partition'ları düşür")
+    @click.option("--archive", is_flag=True, help="Düşürmeden önce arşiv tablolarına kopyala")
+    @click.option("--force", is_flag=True, help="Arşivlemeden kalıcı olarak sil")
+    def partition_maintain(ahead_months, ahead_years, retain_years, archive, force):
+        """Gelecek partition'ları ekler, eskileri arşivler/düşürür."""
+        from utils.partitions import maintain
+
+        if retain_years is not None and not (archive or force):
+            raise click.UsageError("--retain-years için --archive ya da --force gerekli")
+        maintain(
+            ahead_months=ahead_months, ahead_years=ahead_years, retain_years=retain_years,
+            archive=archive, force=force,
+        )
+
+    @app.cli.group("leave-balance")
+    def leave_balance_group():
+        """İzin bakiyesi defteri işlemleri."""
+
+    @leave_balance_group.command("rebuild")
+    @click.option("--personel-id", type=int, default=None)
+    @click.option("--yil", type=int, default=None)
+    @click.option("--check", is_flag=True, help="Yeniden oluşturmadan sapmaları listele")
+    def leave_balance_rebuild(personel_id, yil, check):
+        """Izin_Bakiye defterini izin kayıtlarından yeniden hesaplar."""
+        from utils import leave_balance
+        from utils.db import get_connection
+
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            if check:
+                farklar = leave_balance.drift(cursor, personel_id, yil)
+                for f in farklar:
+                    print(f"personel {f['personel_id']} yil {f['yil']} tur {f['izin_turu_id']}: "
+                          f"defter {f['defter']} beklenen {f['beklenen']}")
+                print(f"{len(farklar)} sapma bulundu.")
+                return
+            satir = leave_balance.rebuild(cursor, personel_id, yil)
+            conn.commit()
+            print(f"{satir} bakiye satırı yeniden oluşturuldu.")
+        finally:
+            conn.close()
+
+    @app.cli.group("candidate-counts")
+    def candidate_counts_group():
+        """Aday durum sayaçları işlemleri."""
+
+    @candidate_counts_group.command("rebuild")
+    def candidate_counts_rebuild():
+        """Aday_Durum_Sayac tablosunu Adaylar'dan yeniden hesaplar."""
+        from utils import candidate_counts
+        from utils.db import get_connection
+
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            satir = candidate_counts.rebuild(cursor)
+            conn.commit()
+            candidate_counts.changed()
+            print(f"{satir} durum sayacı yeniden oluşturuldu.")
+        finally:
+            conn.close()
+
+    return app
+
+
+app = create_app()
 
 
 if __name__ == "__main__":
     try:
+        # Geliştirme sunucusu doğrudan çalıştırıldığında şema hazırlanır; reloader'ın
+        # başlattığı alt süreçte tekrar edilmez. Üretimde `flask --app app bootstrap`.
+        if os.environ.get("WERKZEUG_RUN_MAIN") != "true" and os.environ.get("SKIP_DB_INIT") != "1":
+            bootstrap()
         app.run(debug=Config.DEBUG, port=8080, host="0.0.0.0")
     except KeyboardInterrupt:
         sys.exit(0)
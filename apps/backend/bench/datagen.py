@@ -0,0 +1,215 @@
+"""Benchmark için deterministik sentetik şirket verisi üretir.
+
+Aynı `seed` ve boyutlarla her çalıştırmada birebir aynı satırlar oluşur;
+böylece farklı commit'lerde alınan ölçümler karşılaştırılabilir.
+"""
+import datetime
+import random
+
+from utils import leave_balance
+
+FIRST_NAMES = [
+    'Ahmet', 'Mehmet', 'Ayşe', 'Fatma', 'Mustafa', 'Zeynep', 'Emre', 'Elif',
+    'Can', 'Deniz', 'Burak', 'Selin', 'Hakan', 'Merve', 'Kerem', 'Ece',
+]
+LAST_NAMES = [
+    'Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Aydın', 'Öztürk',
+    'Arslan', 'Doğan', 'Kılıç', 'Aslan', 'Çetin', 'Koç', 'Kurt', 'Özdemir',
+]
+DEPARTMENTS = [
+    'Bilgi İşlem', 'İnsan Kaynakları', 'Muhasebe', 'Satış', 'Pazarlama',
+    'Üretim', 'Lojistik', 'Satın Alma', 'Hukuk', 'Müşteri Hizmetleri',
+]
+LEAVE_STATUSES = ['Onaylandi', 'Onaylandi', 'Onaylandi', 'Beklemede', 'Reddedildi']
+
+# Tablolar FK sırasına göre değil, FOREIGN_KEY_CHECKS kapalıyken boşaltılır
+DATA_TABLES = [
+    'Maas_Detay', 'Maas_Hesap', 'Maas_Bileseni', 'Bordro_Degisiklik', 'Bordro_Is',
+    'Izin_Bakiye', 'Aday_Durum_Sayac', 'Izin_Kayit', 'Izin_Turu', 'Devam', 'Personel_Pozisyon', 'Adaylar', 'Duyuru',
+    'Kullanici', 'Pozisyon', 'Personel', 'Departman',
+]
+
+CHUNK = 5000
+
+
+def _chunks(rows, size=CHUNK):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _insert_many(cursor, sql, rows):
+    for chunk in _chunks(rows):
+        cursor.executemany(sql, chunk)
+
+
+def _working_days(start, end):
+    cur = start
+    while cur <= end:
+        if cur.weekday() < 5:
+            yield cur
+        cur += datetime.timedelta(days=1)
+
+
+def reset(conn):
+    cursor = conn.cursor()
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in DATA_TABLES:
+        cursor.execute(f"TRUNCATE TABLE {table}")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    conn.commit()
+
+
+def populate(conn, employees, devam_days=60, payslip_months=3, today=None, seed=42):
+    """`employees` kişilik bir şirket oluşturur.
+
+    - her personel için son `devam_days` iş gününün Devam kaydı (rastgele ek mesai),
+    - kişi başı yılda ~4 izin talebi (ücretli/ücretsiz karışık),
+    - geçmiş `payslip_months` ay için Maas_Hesap + Maas_Detay satırları.
+    """
+    rng = random.Random(seed)
+    today = today or datetime.date(2025, 6, 30)
+    cursor = conn.cursor()
+
+    cursor.executemany(
+        "INSERT INTO Departman (departman_adi, aciklama) VALUES (%s, %s)",
+        [(name, None) for name in DEPARTMENTS],
+    )
+    cursor.execute("SELECT departman_id FROM Departman ORDER BY departman_id")
+    dept_ids = [r['departman_id'] for r in cursor.fetchall()]
+
+    positions = []
+    for dept_id in dept_ids:
+        for level in range(3):
+            positions.append((f'Pozisyon {dept_id}-{level + 1}', 20000 + level * 7500 + rng.randint(0, 40) * 100, dept_id))
+    cursor.executemany(
+        "INSERT INTO Pozisyon (pozisyon_adi, taban_maas, departman_id) VALUES (%s, %s, %s)",
+        positions,
+    )
+    cursor.execute("SELECT pozisyon_id, departman_id FROM Pozisyon ORDER BY pozisyon_id")
+    positions_by_dept = {}
+    for r in cursor.fetchall():
+        positions_by_dept.setdefault(r['departman_id'], []).append(r['pozisyon_id'])
+
+    cursor.executemany(
+        "INSERT INTO Izin_Turu (izin_adi, yillik_hak_gun, ucretli_mi) VALUES (%s, %s, %s)",
+        [('Yıllık İzin', 14, 1), ('Hastalık İzni', 10, 1), ('Mazeret İzni', 5, 1), ('Ücretsiz İzin', 0, 0)],
+    )
+    cursor.execute("SELECT izin_turu_id FROM Izin_Turu ORDER BY izin_turu_id")
+    leave_types = [r['izin_turu_id'] for r in cursor.fetchall()]
+
+    people = []
+    for i in range(employees):
+        dept_id = rng.choice(dept_ids)
+        hired = today - datetime.timedelta(days=rng.randint(30, 3650))
+        people.append((
+            f'{10000000000 + i}',
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            datetime.date(1970 + rng.randint(0, 30), rng.randint(1, 12), rng.randint(1, 28)),
+            f'0555{i:07d}',
+            f'personel{i}@firma.com',
+            None,
+            hired,
+            dept_id,
+            1 if rng.random() > 0.03 else 0,
+        ))
+    _insert_many(cursor, """
+        INSERT INTO Personel (tc_kimlik_no, ad, soyad, dogum_tarihi, telefon, email, adres, ise_giris_tarihi, departman_id, aktif_mi)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, people)
+    conn.commit()
+
+    cursor.execute("SELECT personel_id, departman_id, ise_giris_tarihi FROM Personel ORDER BY personel_id")
+    staff = cursor.fetchall()
+
+    _insert_many(cursor, """
+        INSERT INTO Personel_Pozisyon (personel_id, pozisyon_id, baslangic_tarihi, guncel_mi, kidem_seviyesi, ozel_taban_maas)
+        VALUES (%s, %s, %s, 1, %s, NULL)
+    """, [
+        (p['personel_id'], rng.choice(positions_by_dept[p['departman_id']]), p['ise_giris_tarihi'], rng.randint(1, 3))
+        for p in staff
+    ])
+    conn.commit()
+
+    days = list(_working_days(today - datetime.timedelta(days=int(devam_days * 7 / 5) + 1), today))[-devam_days:]
+    devam_sql = "INSERT INTO Devam (personel_id, tarih, durum, ek_mesai_saat) VALUES (%s, %s, %s, %s)"
+    rows = []
+    for p in staff:
+        for day in days:
+            roll = rng.random()
+            durum = 'Normal' if roll < 0.92 else ('Izinli' if roll < 0.97 else 'Devamsiz')
+            ek = rng.choice((0, 0, 0, 0, 1, 2)) if durum == 'Normal' else 0
+            rows.append((p['personel_id'], day, durum, ek))
+        if len(rows) >= CHUNK:
+            cursor.executemany(devam_sql, rows)
+            conn.commit()
+            rows = []
+    if rows:
+        cursor.executemany(devam_sql, rows)
+    conn.commit()
+
+    year_start = datetime.date(today.year, 1, 1)
+    leaves = []
+    for p in staff:
+        for _ in range(rng.randint(2, 6)):
+            start = year_start + datetime.timedelta(days=rng.randint(0, 330))
+            length = rng.randint(1, 7)
+            leaves.append((
+                p['personel_id'],
+                rng.choice(leave_types),
+                start,
+                start + datetime.timedelta(days=length - 1),
+                length,
+                rng.choice(LEAVE_STATUSES),
+            ))
+    _insert_many(cursor, """
+        INSERT INTO Izin_Kayit (personel_id, izin_turu_id, baslangic_tarihi, bitis_tarihi, gun_sayisi, onay_durumu)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, leaves)
+    leave_balance.rebuild(cursor)
+    conn.commit()
+
+    cursor.executemany(
+        "INSERT INTO Maas_Bileseni (bilesen_adi, bilesen_tipi, sabit_mi, varsayilan_tutar) VALUES (%s, %s, 0, 0)",
+        [('SGK Çalışan', 'kesinti'), ('Gelir Vergisi', 'kesinti'), ('SGK İşveren', 'ekleme')],
+    )
+    cursor.execute("SELECT bilesen_id FROM Maas_Bileseni ORDER BY bilesen_id")
+    bilesenler = [r['bilesen_id'] for r in cursor.fetchall()]
+
+    periods = []
+    yil, ay = today.year, today.month
+    for _ in range(payslip_months):
+        ay -= 1
+        if ay == 0:
+            yil, ay = yil - 1, 12
+        periods.append((yil, ay))
+
+    for yil, ay in periods:
+        payslips = []
+        for p in staff:
+            brut = 20000 + rng.randint(0, 300) * 100
+            kesinti = round(brut * 0.3, 2)
+            payslips.append((p['personel_id'], yil, ay, brut, 0, kesinti, brut - kesinti, 1))
+        _insert_many(cursor, """
+            INSERT INTO Maas_Hesap (personel_id, donem_yil, donem_ay, brut_maas, toplam_ekleme, toplam_kesinti, net_maas, odendi_mi)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, payslips)
+        cursor.execute(
+            "SELECT maas_hesap_id, brut_maas FROM Maas_Hesap WHERE donem_yil = %s AND donem_ay = %s",
+            (yil, ay),
+        )
+        details = []
+        for r in cursor.fetchall():
+            brut = float(r['brut_maas'])
+            details.append((r['maas_hesap_id'], bilesenler[0], round(brut * 0.14, 2)))
+            details.append((r['maas_hesap_id'], bilesenler[1], round(brut * 0.16, 2)))
+            details.append((r['maas_hesap_id'], bilesenler[2], round(brut * 0.205, 2)))
+        _insert_many(cursor, "INSERT INTO Maas_Detay (maas_hesap_id, bilesen_id, tutar) VALUES (%s, %s, %s)", details)
+        conn.commit()
+
+    return {
+        'personel': len(staff),
+        'devam': len(staff) * len(days),
+        'izin': len(leaves),
+        'bordro': len(staff) * len(periods),
+    }
@@ -0,0 +1,123 @@
+"""API sorgularında tam tablo taraması kontrolü.
+
+Sentetik veriyle doldurulmuş bir benchmark veritabanında tüm GET uç noktalarını
+(ve bordro önizlemesini) çağırır, çalışan SELECT ifadelerini yakalar ve her
+birinin EXPLAIN çıktısında `type = ALL` olup satır tahmini eşiği aşan tabloları
+raporlar. Bulgu varsa çıkış kodu 1 olur; CI'da regresyon kontrolü olarak
+kullanılabilir.
+
+    python -m bench.explain_check --database hr_bench --employees 2000
+"""
+import argparse
+import re
+import sys
+
+from bench.run import LOCAL_HOSTS, _admin_token, _ensure_database
+
+# Sonsuz akış açan ya da veri değiştiren uç noktalar çağrılmaz
+SKIP_SUFFIXES = ('/events', '/stream', '/metrics')
+_CONVERTER = re.compile(r'<(?:[^:<>]+:)?[^<>]+>')
+
+
+def _get_paths(app):
+    paths = []
+    for rule in app.url_map.iter_rules():
+        if 'GET' not in rule.methods or rule.endpoint == 'static':
+            continue
+        path = _CONVERTER.sub('1', rule.rule)
+        if path.endswith(SKIP_SUFFIXES):
+            continue
+        paths.append((rule.endpoint, path))
+    return sorted(paths)
+
+
+def collect_queries(app, today):
+    from utils.db import capture_queries
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {_admin_token(app)}'}
+    found = {}
+
+    def record(endpoint, queries):
+        for query, args in queries:
+            if query.lstrip().upper().startswith('SELECT'):
+                key = ' '.join(query.split())
+                found.setdefault(key, (endpoint, query, args))
+
+    for endpoint, path in _get_paths(app):
+        with capture_queries() as queries:
+            client.get(path, headers=headers)
+        record(endpoint, queries)
+
+    with capture_queries() as queries:
+        client.post('/api/salary/preview', json={'yil': today.year, 'ay': today.month}, headers=headers)
+    record('salary.salary_preview', queries)
+    return list(found.values())
+
+
+def explain(conn, statements, min_rows):
+    cursor = conn.cursor()
+    findings = []
+    for endpoint, query, args in statements:
+        try:
+            cursor.execute('EXPLAIN ' + cursor.mogrify(query, args))
+        except Exception as e:
+            print(f'EXPLAIN çalıştırılamadı ({endpoint}): {e}', file=sys.stderr)
+            continue
+        for row in cursor.fetchall():
+            if row.get('type') == 'ALL' and (row.get('rows') or 0) >= min_rows:
+                findings.append({
+                    'endpoint': endpoint,
+                    'table': row.get('table'),
+                    'rows': row.get('rows'),
+                    'sql': ' '.join(query.split())[:200],
+                })
+    return findings
+
+
+def main(argv=None):
+    import datetime
+
+    parser = argparse.ArgumentParser(description='EXPLAIN tabanlı tam tarama kontrolü')
+    parser.add_argument('--database', required=True, help='Benchmark veritabanı adı (içeriği silinir)')
+    parser.add_argument('--employees', type=int, default=2000)
+    parser.add_argument('--min-rows', type=int, default=1000, help='Bu satır tahmininin altındaki taramalar yoksayılır')
+    parser.add_argument('--today', default='2025-06-30')
+    parser.add_argument('--allow-remote', action='store_true')
+    args = parser.parse_args(argv)
+
+    from utils import db
+
+    if db.DB_CONFIG['host'] not in LOCAL_HOSTS and not args.allow_remote:
+        parser.error(f"DB_HOST={db.DB_CONFIG['host']} yerel değil; veriler silineceği için --allow-remote gerekli")
+    db.DB_CONFIG['database'] = args.database
+    _ensure_database(db.DB_CONFIG, args.database)
+
+    from app import app, bootstrap
+    from bench import datagen
+
+    bootstrap()
+    today = datetime.date.fromisoformat(args.today)
+    conn = db.get_connection()
+    try:
+        datagen.reset(conn)
+        datagen.populate(conn, args.employees, today=today)
+        conn.cursor().execute('ANALYZE TABLE Personel, Personel_Pozisyon, Devam, Izin_Kayit, Maas_Hesap, Maas_Detay')
+    finally:
+        conn.close()
+
+    statements = collect_queries(app, today)
+    conn = db.get_connection()
+    try:
+        findings = explain(conn, statements, args.min_rows)
+    finally:
+        conn.close()
+
+    print(f'{len(statements)} farklı SELECT incelendi.')
+    for f in findings:
+        print(f"[TAM TARAMA] {f['endpoint']}: {f['table']} (~{f['rows']} satır)\n    {f['sql']}")
+    sys.exit(1 if findings else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""Bordro uç noktaları için benchmark.
+
+Her boyut için ayrı bir sentetik şirket oluşturur ve Flask test client ile
+salary_preview, salary_generate, salary_pdf ve home.dashboard sürelerini ölçer.
+Sonuçlar JSON olarak yazılır; farklı commit'lerin çıktıları karşılaştırılabilir.
+
+Kullanım (apps/backend dizininden):
+
+    python -m bench.run --database hr_bench --sizes 1000,10000 --output bench_results.json
+
+Uyarı: hedef veritabanındaki tüm veri silinir. Bu yüzden veritabanı adı açıkça
+verilmelidir ve localhost dışındaki sunucular için --allow-remote gerekir.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import jwt
+import pymysql
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def _ensure_database(db_config, name):
+    server = {k: v for k, v in db_config.items() if k != 'database'}
+    conn = pymysql.connect(**server)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{name}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _admin_token(app):
+    return jwt.encode({
+        'user_id': 1,
+        'username': 'admin',
+        'role': 'admin',
+        'personel_id': None,
+        'ilk_giris': 0,
+        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=12),
+    }, app.config['SECRET_KEY'], algorithm='HS256')
+
+
+def _timed(repeat, call, before=None):
+    samples = []
+    statuses = set()
+    size = 0
+    for _ in range(repeat):
+        if before:
+            before()
+        started = time.perf_counter()
+        response = call()
+        data = response.get_data()
+        samples.append(time.perf_counter() - started)
+        statuses.add(response.status_code)
+        size = len(data)
+    return {
+        'min_ms': round(min(samples) * 1000, 2),
+        'median_ms': round(statistics.median(samples) * 1000, 2),
+        'max_ms': round(max(samples) * 1000, 2),
+        'status': sorted(statuses),
+        'bytes': size,
+    }
+
+
+def run_size(app, get_connection, employees, args):
+    from bench import datagen
+
+    today = datetime.date.fromisoformat(args.today)
+    conn = get_connection()
+    try:
+        datagen.reset(conn)
+        started = time.perf_counter()
+        counts = datagen.populate(
+            conn, employees,
+            devam_days=args.devam_days,
+            payslip_months=args.payslip_months,
+            today=today,
+            seed=args.seed,
+        )
+        populate_s = time.perf_counter() - started
+    finally:
+        conn.close()
+
+    yil, ay = today.year, today.month
+
+    def clear_period():
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                DELETE md FROM Maas_Detay md
+                JOIN Maas_Hesap mh ON md.maas_hesap_id = mh.maas_hesap_id
+                WHERE mh.donem_yil = %s AND mh.donem_ay = %s
+            """, (yil, ay))
+            cursor.execute("DELETE FROM Maas_Hesap WHERE donem_yil = %s AND donem_ay = %s", (yil, ay))
+            conn.commit()
+        finally:
+            conn.close()
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {_admin_token(app)}'}
+    period = {'yil': yil, 'ay': ay}
+
+    results = {
+        'salary_preview': _timed(args.repeat, lambda: client.post('/api/salary/preview', json=period, headers=headers)),
+        'salary_generate': _timed(
+            args.repeat,
+            lambda: client.post('/api/salary/generate', json=period, headers=headers),
+            before=clear_period,
+        ),
+        'salary_pdf': _timed(
+            args.repeat,
+            lambda: client.get(f'/api/salary/pdf?yil={yil}&ay={ay}', headers=headers),
+        ),
+        'dashboard': _timed(args.repeat, lambda: client.get('/api/dashboard', headers=headers)),
+    }
+    return {
+        'employees': employees,
+        'rows': counts,
+        'populate_s': round(populate_s, 2),
+        'endpoints': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bordro benchmark')
+    parser.add_argument('--database', required=True, help='Benchmark veritabanı adı (içeriği silinir)')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Virgülle ayrılmış personel sayıları')
+    parser.add_argument('--devam-days', type=int, default=60, help='Personel başına Devam iş günü sayısı')
+    parser.add_argument('--payslip-months', type=int, default=3, help='Geçmiş bordro ay sayısı')
+    parser.add_argument('--repeat', type=int, default=3, help='Uç nokta başına tekrar sayısı')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--today', default='2025-06-30', help='Üretilen verinin referans tarihi')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--allow-remote', action='store_true', help='localhost dışındaki sunucuya izin ver')
+    args = parser.parse_args(argv)
+
+    from utils import db
+
+    if db.DB_CONFIG['host'] not in LOCAL_HOSTS and not args.allow_remote:
+        parser.error(f"DB_HOST={db.DB_CONFIG['host']} yerel değil; veriler silineceği için --allow-remote gerekli")
+
+    db.DB_CONFIG['database'] = args.database
+    _ensure_database(db.DB_CONFIG, args.database)
+
+    from app import app, bootstrap
+
+    bootstrap()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    report = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'params': {
+            'devam_days': args.devam_days,
+            'payslip_months': args.payslip_months,
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'today': args.today,
+        },
+        'runs': [],
+    }
+    for employees in sizes:
+        print(f'{employees} personel hazırlanıyor...', file=sys.stderr)
+        run = run_size(app, db.get_connection, employees, args)
+        report['runs'].append(run)
+        for name, r in run['endpoints'].items():
+            print(f"  {name:16s} median {r['median_ms']:>10.2f} ms  status {r['status']}", file=sys.stderr)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f'Sonuçlar yazıldı: {args.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Soğuk başlangıç ve worker fork süresi ölçümü.
+
+Her ölçüm yeni bir Python sürecinde yapılır, böylece import önbelleği sonuçları
+etkilemez. Veritabanı gerekmez: app import'u ve create_app() I/O yapmamalıdır.
+
+    python -m bench.startup --repeat 10 --output startup_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Alt süreçte çalışan ölçüm betiği; sonuçları JSON olarak stdout'a yazar
+PROBE = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+app_module.create_app()
+t2 = time.perf_counter()
+result = {
+    'import_s': t1 - t0,
+    'create_app_s': t2 - t1,
+    'reportlab_loaded': 'reportlab' in sys.modules,
+    'modules': len(sys.modules),
+}
+if hasattr(os, 'fork'):
+    r, w = os.pipe()
+    t3 = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        client = app_module.app.test_client()
+        client.get('/metrics')
+        os.write(w, b'x')
+        os._exit(0)
+    os.close(w)
+    os.read(r, 1)
+    result['fork_first_request_s'] = time.perf_counter() - t3
+    os.waitpid(pid, 0)
+print(json.dumps(result))
+"""
+
+
+def _summary(values):
+    return {
+        'min_ms': round(min(values) * 1000, 2),
+        'median_ms': round(statistics.median(values) * 1000, 2),
+        'max_ms': round(max(values) * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Başlangıç süresi benchmark')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', default='startup_results.json')
+    args = parser.parse_args(argv)
+
+    samples = []
+    for _ in range(args.repeat):
+        out = subprocess.check_output([sys.executable, '-c', PROBE], cwd=BACKEND_DIR, text=True)
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+
+    report = {
+        'python': platform.python_version(),
+        'repeat': args.repeat,
+        'import': _summary([s['import_s'] for s in samples]),
+        'create_app': _summary([s['create_app_s'] for s in samples]),
+        'reportlab_loaded_at_import': any(s['reportlab_loaded'] for s in samples),
+        'modules': samples[-1]['modules'],
+    }
+    if 'fork_first_request_s' in samples[0]:
+        report['fork_first_request'] = _summary([s['fork_first_request_s'] for s in samples])
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
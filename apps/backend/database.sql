@@ -3,12 +3,17 @@
 	-- =========================
 	SET FOREIGN_KEY_CHECKS = 0;
 	
+	DROP TABLE IF EXISTS Arsiv_Durum;
 	DROP TABLE IF EXISTS Maas_Detay_Archive;
 	DROP TABLE IF EXISTS Maas_Hesap_Archive;
 	DROP TABLE IF EXISTS Devam_Archive;
 	DROP TABLE IF EXISTS Izin_Kayit_Archive;
 	DROP TABLE IF EXISTS Personel_Archive;
 	
+	DROP TABLE IF EXISTS Izin_Bakiye;
+	DROP TABLE IF EXISTS Aday_Durum_Sayac;
+	DROP TABLE IF EXISTS Bordro_Is;
+	DROP TABLE IF EXISTS Bordro_Degisiklik;
 	DROP TABLE IF EXISTS Maas_Detay;
 	DROP TABLE IF EXISTS Maas_Hesap;
 	DROP TABLE IF EXISTS Maas_Bileseni;
@@ -50,6 +55,7 @@
 	  ise_giris_tarihi DATE NOT NULL,
 	  departman_id INT,
 	  aktif_mi TINYINT DEFAULT 1,
+	  KEY idx_personel_aktif_departman (aktif_mi, departman_id),
 	  FOREIGN KEY (departman_id) REFERENCES Departman(departman_id)
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 	
@@ -76,6 +82,8 @@
 	  bitis_tarihi DATETIME NULL,
 	  oncelik VARCHAR(20) DEFAULT 'Normal',
 	  aktif_mi TINYINT DEFAULT 1,
+	  KEY idx_duyuru_aktif_yayin (aktif_mi, yayin_tarihi),
+	  KEY idx_duyuru_aktif_bitis (aktif_mi, bitis_tarihi),
 	  FOREIGN KEY (olusturan_kullanici_id) REFERENCES Kullanici(kullanici_id)
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 	
@@ -98,6 +106,12 @@
 	  gorusme_tarihi DATE NULL,
 	  durum VARCHAR(50) DEFAULT 'Basvuru Alindi',
 	  aciklama TEXT,
+	  KEY idx_aday_basvuru (basvuru_tarihi),
+	  KEY idx_aday_email_pozisyon (email, pozisyon_id),
+	  KEY idx_aday_durum_basvuru (durum, basvuru_tarihi),
+	  KEY idx_aday_pozisyon_basvuru (pozisyon_id, basvuru_tarihi),
+	  KEY idx_aday_ad (ad),
+	  KEY idx_aday_soyad (soyad),
 	  FOREIGN KEY (pozisyon_id) REFERENCES Pozisyon(pozisyon_id)
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 	
@@ -110,6 +124,7 @@
  	  guncel_mi TINYINT DEFAULT 1,
 	  kidem_seviyesi TINYINT DEFAULT 3,
 	  ozel_taban_maas DECIMAL(12,2) DEFAULT NULL,
+	  KEY idx_pp_personel_guncel (personel_id, guncel_mi),
 	  FOREIGN KEY (personel_id) REFERENCES Personel(personel_id),
 	  FOREIGN KEY (pozisyon_id) REFERENCES Pozisyon(pozisyon_id)
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -142,6 +157,10 @@ CREATE TABLE Devam (
 	  bitis_tarihi DATE NOT NULL,
 	  gun_sayisi INT NOT NULL,
 	  onay_durumu VARCHAR(50) DEFAULT 'Beklemede',
+	  KEY idx_izin_personel_durum_tarih (personel_id, onay_durumu, baslangic_tarihi),
+	  KEY idx_izin_tarih (baslangic_tarihi),
+	  KEY idx_izin_durum_tarih (onay_durumu, baslangic_tarihi),
+	  KEY idx_izin_personel_tarih (personel_id, baslangic_tarihi),
 	  FOREIGN KEY (personel_id) REFERENCES Personel(personel_id),
 	  FOREIGN KEY (izin_turu_id) REFERENCES Izin_Turu(izin_turu_id)
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -178,6 +197,49 @@ CREATE TABLE Devam (
 	  FOREIGN KEY (bilesen_id) REFERENCES Maas_Bileseni(bilesen_id)
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 	
+	CREATE TABLE Izin_Bakiye (
+	  personel_id INT NOT NULL,
+	  yil INT NOT NULL,
+	  izin_turu_id INT NOT NULL,
+	  kullanilan_gun INT NOT NULL DEFAULT 0,
+	  bekleyen_gun INT NOT NULL DEFAULT 0,
+	  guncelleme_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+	  PRIMARY KEY (personel_id, yil, izin_turu_id),
+	  FOREIGN KEY (personel_id) REFERENCES Personel(personel_id)
+	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+	CREATE TABLE Aday_Durum_Sayac (
+	  durum VARCHAR(50) NOT NULL PRIMARY KEY,
+	  adet INT NOT NULL DEFAULT 0
+	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+	
+	CREATE TABLE Bordro_Degisiklik (
+	  personel_id INT NOT NULL,
+	  donem_yil INT NOT NULL,
+	  donem_ay INT NOT NULL,
+	  sebep VARCHAR(100),
+	  degisiklik_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+	  PRIMARY KEY (personel_id, donem_yil, donem_ay),
+	  FOREIGN KEY (personel_id) REFERENCES Personel(personel_id)
+	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+	
+	CREATE TABLE Bordro_Is (
+	  is_id INT AUTO_INCREMENT PRIMARY KEY,
+	  baslangic_yil INT NOT NULL,
+	  baslangic_ay INT NOT NULL,
+	  bitis_yil INT NOT NULL,
+	  bitis_ay INT NOT NULL,
+	  departman_id INT NULL,
+	  incremental TINYINT DEFAULT 0,
+	  durum VARCHAR(20) DEFAULT 'Beklemede',
+	  son_yil INT NULL,
+	  son_ay INT NULL,
+	  islenen_personel INT DEFAULT 0,
+	  hata TEXT,
+	  olusturma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+	  FOREIGN KEY (departman_id) REFERENCES Departman(departman_id)
+	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+	
 	-- =========================
 	-- ARŞİV TABLOLARI
 	-- =========================
@@ -197,8 +259,7 @@ CREATE TABLE Devam (
 	  departman_id INT,
 	  aktif_mi TINYINT,
 	  arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
-	  arsiv_sebebi VARCHAR(255),
-	  FOREIGN KEY (personel_id) REFERENCES Personel(personel_id)
+	  arsiv_sebebi VARCHAR(255)
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 	
 	CREATE TABLE Maas_Hesap_Archive (
@@ -214,8 +275,7 @@ CREATE TABLE Devam (
 	  odeme_tarihi DATE,
 	  odendi_mi TINYINT,
 	  arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
-	  arsiv_sebebi VARCHAR(255),
-	  FOREIGN KEY (maas_hesap_id) REFERENCES Maas_Hesap(maas_hesap_id)
+	  arsiv_sebebi VARCHAR(255)
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 	
 	CREATE TABLE Maas_Detay_Archive (
@@ -224,8 +284,7 @@ CREATE TABLE Devam (
 	  maas_hesap_id INT NOT NULL,
 	  bilesen_id INT NOT NULL,
 	  tutar DECIMAL(12,2) NOT NULL,
-	  arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
-	  FOREIGN KEY (maas_detay_id) REFERENCES Maas_Detay(maas_detay_id)
+	  arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 	
 	CREATE TABLE Izin_Kayit_Archive (
@@ -238,8 +297,7 @@ CREATE TABLE Devam (
 	  gun_sayisi INT NOT NULL,
 	  onay_durumu VARCHAR(50),
 	  arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
-	  arsiv_sebebi VARCHAR(255),
-	  FOREIGN KEY (izin_kayit_id) REFERENCES Izin_Kayit(izin_kayit_id)
+	  arsiv_sebebi VARCHAR(255)
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 	
 	CREATE TABLE Devam_Archive (
@@ -250,10 +308,21 @@ CREATE TABLE Devam (
 	  giris_saati TIME,
 	  cikis_saati TIME,
 	  durum VARCHAR(50),
+	  ek_mesai_saat DECIMAL(8,2) DEFAULT 0,
 	  aciklama TEXT,
 	  arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
 	  arsiv_sebebi VARCHAR(255),
-	  FOREIGN KEY (devam_id) REFERENCES Devam(devam_id)
+	  KEY idx_devam_arsiv_personel_tarih (personel_id, tarih),
+	  KEY idx_devam_arsiv_tarih (tarih)
+	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+	
+	CREATE TABLE Arsiv_Durum (
+	  hedef VARCHAR(50) PRIMARY KEY,
+	  kesim_degeri VARCHAR(20) NOT NULL,
+	  son_id INT DEFAULT 0,
+	  tasinan INT DEFAULT 0,
+	  durum VARCHAR(20) DEFAULT 'Calisiyor',
+	  guncelleme_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 	) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 	
 	-- =========================
@@ -0,0 +1,38 @@
+import datetime
+import decimal
+import json
+
+from flask import Flask
+
+from utils.json_provider import STREAM_THRESHOLD, FastJSONProvider, json_list_response
+
+
+def _app(count):
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    @app.get('/liste')
+    def liste():
+        return json_list_response([
+            {'id': i, 'tarih': datetime.date(2024, 1, 1), 'tutar': decimal.Decimal('10.50')}
+            for i in range(count)
+        ])
+
+    return app
+
+
+def test_large_list_is_streamed_outside_app_context():
+    response = _app(STREAM_THRESHOLD + 1000).test_client().get('/liste')
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    body = json.loads(response.get_data())
+    assert len(body) == STREAM_THRESHOLD + 1000
+    assert body[-1] == {'id': STREAM_THRESHOLD + 999, 'tarih': 'Mon, 01 Jan 2024 00:00:00 GMT', 'tutar': '10.50'}
+
+
+def test_small_list_matches_streamed_format():
+    small = json.loads(_app(3).test_client().get('/liste').get_data())
+    large = json.loads(_app(STREAM_THRESHOLD).test_client().get('/liste').get_data())
+
+    assert small == large[:3]
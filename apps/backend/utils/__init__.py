@@ -1,4 +1,11 @@
-from utils.pdf_generator import PDFGenerator
 from utils.db import get_connection
 
 __all__ = ['PDFGenerator', 'get_connection']
+
+
+def __getattr__(name):
+    # reportlab ağır bir bağımlılık; yalnızca PDFGenerator kullanıldığında yüklenir
+    if name == 'PDFGenerator':
+        from utils.pdf_generator import PDFGenerator
+        return PDFGenerator
+    raise AttributeError(name)
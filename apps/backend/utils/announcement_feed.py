@@ -0,0 +1,174 @@
+"""Aktif duyuru akışı önbelleği.
+
+Aktif duyurular bir kez okunup biçimlendirilir ve bellekte tutulur. Bitiş
+tarihi olan duyurular bir min-heap'e (bitis_tarihi, duyuru_id) olarak
+yazılır; her erişimde heap'in tepesindeki süresi dolmuş kayıtlar akıştan
+çıkarılır, böylece duyuru tam bitiş anında listeden düşer. Düşen duyurular
+`duyuru` kanalına yayınlanır; kanal sürümünden ETag üreten yanıtlar (dashboard)
+eskimez. Akışı okumadan ETag denetleyen uç noktalar önce `expire_due()` çağırır.
+
+Veritabanındaki süresi dolmuş satırlar arka plandaki süpürücü tarafından
+toplu olarak pasifleştirilir. Duyuru yazan uç noktalar `invalidate()`
+çağırır; diğer süreçler akışı en geç ANNOUNCEMENT_FEED_TTL saniyede tazeler.
+"""
+import datetime
+import heapq
+import os
+import threading
+import time
+import uuid
+
+from utils import events, metrics
+from utils.db import get_connection
+
+ANNOUNCEMENT_FEED_TTL = float(os.getenv('ANNOUNCEMENT_FEED_TTL', 60))
+ANNOUNCEMENT_SWEEP_SECONDS = float(os.getenv('ANNOUNCEMENT_SWEEP_SECONDS', 300))
+
+_lock = threading.Lock()
+_feed = {'entries': None, 'heap': [], 'loaded_at': 0.0, 'generation': 0}
+_sweeper = {'thread': None}
+# Sürüm numaraları süreç içidir; ETag'lerin süreçler arasında çakışmaması için eklenir
+_PROCESS_TOKEN = uuid.uuid4().hex[:8]
+
+
+def _format(row):
+    return {
+        "duyuru_id": row["duyuru_id"],
+        "baslik": row["baslik"],
+        "icerik": row["icerik"],
+        "yayin_tarihi": row["yayin_tarihi"].strftime("%Y-%m-%d %H:%M") if row["yayin_tarihi"] else None,
+        "bitis_tarihi": row["bitis_tarihi"].strftime("%Y-%m-%d %H:%M") if row["bitis_tarihi"] else None,
+        "oncelik": row["oncelik"],
+        "aktif_mi": bool(row["aktif_mi"]),
+        "olusturan": row["olusturan"],
+    }
+
+
+def _load():
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT d.duyuru_id, d.baslik, d.icerik, d.yayin_tarihi, d.bitis_tarihi, d.oncelik, d.aktif_mi,
+                   k.kullanici_adi AS olusturan
+            FROM Duyuru d
+            JOIN Kullanici k ON d.olusturan_kullanici_id = k.kullanici_id
+            WHERE d.aktif_mi = 1 AND (d.bitis_tarihi IS NULL OR d.bitis_tarihi > NOW())
+            ORDER BY d.yayin_tarihi DESC
+        """)
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+    heap = [(row['bitis_tarihi'], row['duyuru_id']) for row in rows if row['bitis_tarihi']]
+    heapq.heapify(heap)
+    return [(row, _format(row)) for row in rows], heap
+
+
+def _expire(now):
+    """Süresi dolan girdileri akıştan çıkarır; kilit altında çağrılır, çıkarılan sayıyı döner."""
+    heap = _feed['heap']
+    expired = set()
+    while heap and heap[0][0] <= now:
+        expired.add(heapq.heappop(heap)[1])
+    if expired:
+        _feed['entries'] = [e for e in _feed['entries'] if e[0]['duyuru_id'] not in expired]
+        _feed['generation'] += 1
+    return len(expired)
+
+
+def _expired(count):
+    # Kilit dışında çağrılır; dashboard ETag'i `duyuru` kanal sürümüne bağlıdır
+    if count:
+        events.publish('duyuru', {'islem': 'suresi_doldu', 'adet': count})
+
+
+def expire_due():
+    """Bellekteki akışta bitiş anı geçen duyuruları düşürür; akışı yüklemez."""
+    with _lock:
+        count = _expire(datetime.datetime.now()) if _feed['entries'] is not None else 0
+    _expired(count)
+
+
+def _entries():
+    """(sürüm, [(ham satır, biçimlendirilmiş)]) döner; sürüm önbelleğe alınamayan yüklemede None'dır."""
+    _ensure_sweeper()
+    with _lock:
+        if _feed['entries'] is not None and time.monotonic() - _feed['loaded_at'] < ANNOUNCEMENT_FEED_TTL:
+            count = _expire(datetime.datetime.now())
+            metrics.record_cache('announcement_feed', True)
+            result = _feed['generation'], _feed['entries']
+        else:
+            result = None
+            generation = _feed['generation']
+    if result is not None:
+        _expired(count)
+        return result
+    metrics.record_cache('announcement_feed', False)
+
+    entries, heap = _load()
+    with _lock:
+        # Yükleme sırasında invalidate() çağrıldıysa eski sonuç saklanmaz
+        if _feed['generation'] == generation:
+            _feed.update(entries=entries, heap=heap, loaded_at=time.monotonic(), generation=generation + 1)
+            count = _expire(datetime.datetime.now())
+            result = _feed['generation'], _feed['entries']
+    if result is not None:
+        _expired(count)
+        return result
+    return None, entries
+
+
+def active():
+    """(etag, [biçimlendirilmiş duyuru]) — en yeni yayın önce; önbelleğe alınamadıysa etag None'dır."""
+    generation, entries = _entries()
+    etag = f"duyuru-{_PROCESS_TOKEN}-{generation}" if generation is not None else None
+    return etag, [formatted for _, formatted in entries]
+
+
+def latest(n=5):
+    """Dashboard için en yeni `n` aktif duyurunun ham satırları."""
+    return [row for row, _ in _entries()[1][:n]]
+
+
+def invalidate():
+    with _lock:
+        _feed['entries'] = None
+        _feed['generation'] += 1
+
+
+def sweep():
+    """Süresi dolmuş aktif duyuruları tek UPDATE ile pasifleştirir; etkilenen satır sayısını döner."""
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            UPDATE Duyuru SET aktif_mi = 0
+            WHERE aktif_mi = 1 AND bitis_tarihi IS NOT NULL AND bitis_tarihi <= NOW()
+        """)
+        count = cursor.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+    if count:
+        invalidate()
+        events.publish('duyuru', {'islem': 'suresi_doldu', 'adet': count})
+    return count
+
+
+def _sweep_loop():
+    while True:
+        time.sleep(ANNOUNCEMENT_SWEEP_SECONDS)
+        try:
+            sweep()
+        except Exception as e:
+            print(f"Duyuru süpürme hatası: {e}")
+
+
+def _ensure_sweeper():
+    # İlk erişimde başlatılır; import sırasında thread ya da bağlantı açılmaz
+    if _sweeper['thread'] is not None or ANNOUNCEMENT_SWEEP_SECONDS <= 0:
+        return
+    with _lock:
+        if _sweeper['thread'] is None:
+            _sweeper['thread'] = threading.Thread(target=_sweep_loop, name='duyuru-supurucu', daemon=True)
+            _sweeper['thread'].start()
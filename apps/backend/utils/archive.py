@@ -0,0 +1,204 @@
+"""Kapanmış dönemlerin *_Archive tablolarına taşınması.
+
+Her hedef sınırlı boyutlu parçalar halinde işlenir: bir parçanın arşive
+kopyalanması, ana tablodan silinmesi ve kontrol noktasının (Arsiv_Durum)
+güncellenmesi tek transaction'dır. İş yarıda kesilirse bir sonraki çalıştırma
+aynı kesim değeriyle kaldığı id'den devam eder.
+
+    flask --app app archive                    # tüm hedefler
+    flask --app app archive --target devam --batch 2000 --max-batches 50
+"""
+import datetime
+
+from flask import request
+
+from utils.db import get_connection
+
+DEFAULT_BATCH = 1000
+
+_DEVAM_COLUMNS = 'devam_id, personel_id, tarih, giris_saati, cikis_saati, durum, ek_mesai_saat, aciklama'
+_MAAS_COLUMNS = ('maas_hesap_id, personel_id, donem_yil, donem_ay, brut_maas, toplam_ekleme, '
+                 'toplam_kesinti, net_maas, odeme_tarihi, odendi_mi')
+_IZIN_COLUMNS = 'izin_kayit_id, personel_id, izin_turu_id, baslangic_tarihi, bitis_tarihi, gun_sayisi, onay_durumu'
+_PERSONEL_COLUMNS = ('personel_id, tc_kimlik_no, ad, soyad, dogum_tarihi, telefon, email, adres, '
+                     'ise_giris_tarihi, departman_id, aktif_mi')
+
+# Okuma uç noktalarında `include_archive=1` verildiğinde ana tablo yerine
+# kullanılan birleşik kaynaklar; `arsiv` kolonu satırın nereden geldiğini belirtir.
+ARCHIVE_SOURCES = {
+    'Devam': f"""(
+        SELECT {_DEVAM_COLUMNS}, 0 AS arsiv FROM Devam
+        UNION ALL
+        SELECT {_DEVAM_COLUMNS}, 1 AS arsiv FROM Devam_Archive
+    )""",
+    'Maas_Hesap': f"""(
+        SELECT {_MAAS_COLUMNS}, 0 AS arsiv FROM Maas_Hesap
+        UNION ALL
+        SELECT {_MAAS_COLUMNS}, 1 AS arsiv FROM Maas_Hesap_Archive
+    )""",
+    'Izin_Kayit': f"""(
+        SELECT {_IZIN_COLUMNS}, 0 AS arsiv FROM Izin_Kayit
+        UNION ALL
+        SELECT {_IZIN_COLUMNS}, 1 AS arsiv FROM Izin_Kayit_Archive
+    )""",
+}
+
+
+def include_archive_requested():
+    return str(request.args.get('include_archive', '0')) in ['1', 'true', 'True']
+
+
+def table_source(table, include_archive):
+    """FROM ifadesinde kullanılacak kaynak: ana tablo ya da arşivle birleşimi."""
+    if include_archive:
+        return ARCHIVE_SOURCES[table]
+    return table
+
+
+def _placeholders(ids):
+    return ', '.join(['%s'] * len(ids))
+
+
+def _archive_devam(cursor, ids, sebep):
+    cursor.execute(f"""
+        INSERT INTO Devam_Archive ({_DEVAM_COLUMNS}, arsiv_sebebi)
+        SELECT {_DEVAM_COLUMNS}, %s FROM Devam WHERE devam_id IN ({_placeholders(ids)})
+    """, (sebep, *ids))
+    cursor.execute(f"DELETE FROM Devam WHERE devam_id IN ({_placeholders(ids)})", ids)
+
+
+def _archive_maas(cursor, ids, sebep):
+    cursor.execute(f"""
+        INSERT INTO Maas_Detay_Archive (maas_detay_id, maas_hesap_id, bilesen_id, tutar)
+        SELECT maas_detay_id, maas_hesap_id, bilesen_id, tutar
+        FROM Maas_Detay WHERE maas_hesap_id IN ({_placeholders(ids)})
+    """, ids)
+    cursor.execute(f"""
+        INSERT INTO Maas_Hesap_Archive ({_MAAS_COLUMNS}, arsiv_sebebi)
+        SELECT {_MAAS_COLUMNS}, %s FROM Maas_Hesap WHERE maas_hesap_id IN ({_placeholders(ids)})
+    """, (sebep, *ids))
+    cursor.execute(f"DELETE FROM Maas_Detay WHERE maas_hesap_id IN ({_placeholders(ids)})", ids)
+    cursor.execute(f"DELETE FROM Maas_Hesap WHERE maas_hesap_id IN ({_placeholders(ids)})", ids)
+
+
+def _archive_izin(cursor, ids, sebep):
+    cursor.execute(f"""
+        INSERT INTO Izin_Kayit_Archive ({_IZIN_COLUMNS}, arsiv_sebebi)
+        SELECT {_IZIN_COLUMNS}, %s FROM Izin_Kayit WHERE izin_kayit_id IN ({_placeholders(ids)})
+    """, (sebep, *ids))
+    cursor.execute(f"DELETE FROM Izin_Kayit WHERE izin_kayit_id IN ({_placeholders(ids)})", ids)
+
+
+def _archive_personel(cursor, ids, sebep):
+    # Personel satırına Kullanici, Devam vb. bağlı olduğundan silinmez; pasif
+    # personelin son hali arşive kopyalanır.
+    cursor.execute(f"""
+        INSERT INTO Personel_Archive ({_PERSONEL_COLUMNS}, cikis_tarihi, arsiv_sebebi)
+        SELECT p.personel_id, p.tc_kimlik_no, p.ad, p.soyad, p.dogum_tarihi, p.telefon, p.email, p.adres,
+               p.ise_giris_tarihi, p.departman_id, p.aktif_mi,
+               (SELECT MAX(pp.bitis_tarihi) FROM Personel_Pozisyon pp WHERE pp.personel_id = p.personel_id),
+               %s
+        FROM Personel p WHERE p.personel_id IN ({_placeholders(ids)})
+    """, (sebep, *ids))
+
+
+def _cutoff_date(years, today):
+    try:
+        return today.replace(year=today.year - years)
+    except ValueError:  # 29 Şubat
+        return today.replace(year=today.year - years, day=28)
+
+
+# hedef -> (kesim değerini hesaplayan fonksiyon, aday id sorgusu, taşıma fonksiyonu, arşiv sebebi)
+TARGETS = {
+    'devam': (
+        lambda opts, today: _cutoff_date(opts['devam_years'], today).isoformat(),
+        "SELECT devam_id AS id FROM Devam WHERE tarih < %(kesim)s AND devam_id > %(son_id)s ORDER BY devam_id LIMIT %(limit)s",
+        _archive_devam,
+        'eski devam kaydi',
+    ),
+    'maas': (
+        lambda opts, today: str(today.year * 12 + today.month - 1 - opts['maas_months']),
+        """SELECT maas_hesap_id AS id FROM Maas_Hesap
+           WHERE odendi_mi = 1 AND donem_yil * 12 + donem_ay - 1 < %(kesim)s AND maas_hesap_id > %(son_id)s
+           ORDER BY maas_hesap_id LIMIT %(limit)s""",
+        _archive_maas,
+        'odenmis eski bordro',
+    ),
+    'izin': (
+        lambda opts, today: _cutoff_date(opts['izin_years'], today).isoformat(),
+        """SELECT izin_kayit_id AS id FROM Izin_Kayit
+           WHERE bitis_tarihi < %(kesim)s AND onay_durumu <> 'Beklemede' AND izin_kayit_id > %(son_id)s
+           ORDER BY izin_kayit_id LIMIT %(limit)s""",
+        _archive_izin,
+        'kapanmis izin',
+    ),
+    'personel': (
+        lambda opts, today: today.isoformat(),
+        """SELECT p.personel_id AS id FROM Personel p
+           WHERE p.aktif_mi = 0 AND p.personel_id > %(son_id)s
+             AND NOT EXISTS (SELECT 1 FROM Personel_Archive a WHERE a.personel_id = p.personel_id)
+           ORDER BY p.personel_id LIMIT %(limit)s""",
+        _archive_personel,
+        'pasif personel',
+    ),
+}
+
+
+def _load_checkpoint(cursor, hedef, kesim):
+    """Tamamlanmamış bir çalışma varsa onun kesim değeri ve son id'siyle devam edilir."""
+    cursor.execute("SELECT kesim_degeri, son_id, tasinan, durum FROM Arsiv_Durum WHERE hedef = %s", (hedef,))
+    row = cursor.fetchone()
+    if row and row['durum'] != 'Tamamlandi':
+        return row['kesim_degeri'], int(row['son_id'] or 0), int(row['tasinan'] or 0)
+    cursor.execute("""
+        INSERT INTO Arsiv_Durum (hedef, kesim_degeri, son_id, tasinan, durum)
+        VALUES (%s, %s, 0, 0, 'Calisiyor')
+        ON DUPLICATE KEY UPDATE kesim_degeri = VALUES(kesim_degeri), son_id = 0, tasinan = 0, durum = 'Calisiyor'
+    """, (hedef, kesim))
+    return kesim, 0, 0
+
+
+def archive_target(conn, hedef, batch=DEFAULT_BATCH, max_batches=None, today=None, log=print, **opts):
+    """Tek bir hedefi arşivler; {'hedef', 'kesim', 'tasinan', 'tamamlandi'} döner."""
+    opts = {'devam_years': 2, 'maas_months': 24, 'izin_years': 2, **opts}
+    compute_cutoff, candidate_sql, move, sebep = TARGETS[hedef]
+    today = today or datetime.date.today()
+    cursor = conn.cursor()
+
+    kesim, son_id, tasinan = _load_checkpoint(cursor, hedef, compute_cutoff(opts, today))
+    conn.commit()
+
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        cursor.execute(candidate_sql, {'kesim': kesim, 'son_id': son_id, 'limit': batch})
+        ids = [r['id'] for r in cursor.fetchall()]
+        if not ids:
+            cursor.execute("UPDATE Arsiv_Durum SET durum = 'Tamamlandi' WHERE hedef = %s", (hedef,))
+            conn.commit()
+            log(f'{hedef}: tamamlandı, toplam {tasinan} kayıt')
+            return {'hedef': hedef, 'kesim': kesim, 'tasinan': tasinan, 'tamamlandi': True}
+        try:
+            move(cursor, ids, sebep)
+            son_id = ids[-1]
+            tasinan += len(ids)
+            cursor.execute(
+                "UPDATE Arsiv_Durum SET son_id = %s, tasinan = %s WHERE hedef = %s",
+                (son_id, tasinan, hedef),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        batches += 1
+        log(f'{hedef}: {tasinan} kayıt taşındı (son id {son_id})')
+
+    return {'hedef': hedef, 'kesim': kesim, 'tasinan': tasinan, 'tamamlandi': False}
+
+
+def run_archive(targets=None, log=print, **kwargs):
+    conn = get_connection()
+    try:
+        return [archive_target(conn, hedef, log=log, **kwargs) for hedef in (targets or list(TARGETS))]
+    finally:
+        conn.close()
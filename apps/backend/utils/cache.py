@@ -0,0 +1,62 @@
+"""Süreç içi, sürümlü TTL önbelleği.
+
+Her önbellek bir sürüm numarası tutar; `bump()` sürümü artırarak tüm girdileri
+tek adımda geçersiz kılar (yazma uç noktaları commit'ten sonra çağırır).
+Diğer süreçlerdeki kopyalar en geç `ttl` saniye sonra tazelenir. İsabet ve
+ıska sayıları `hr_cache_requests_total{cache=...}` metriğine yazılır.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from utils import metrics
+
+_MISSING = object()
+
+
+class VersionedCache:
+    def __init__(self, name, ttl=60, maxsize=1024):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.version = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] == self.version and item[1] > now:
+                self._data.move_to_end(key)
+                metrics.record_cache(self.name, True)
+                return item[2]
+        metrics.record_cache(self.name, False)
+        return default
+
+    def set(self, key, value, version=None):
+        """`version` verilirse ve bu arada `bump()` çağrıldıysa değer saklanmaz."""
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._data[key] = (self.version, time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            version = self.version
+            value = compute()
+            self.set(key, value, version=version)
+        return value
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+            self._data.clear()
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
@@ -0,0 +1,56 @@
+"""Aday durum sayaçları (Aday_Durum_Sayac).
+
+Her durum için aday sayısı tutulur; aday ekleyen ve durumunu değiştiren
+uç noktalar aynı transaction içinde sayaçları günceller. Böylece işe alım
+özeti Adaylar tablosunu taramadan okunur.
+
+Sayaçlar ile tablo arasında sapma şüphesi olduğunda:
+
+    flask --app app candidate-counts rebuild
+"""
+from utils.cache import VersionedCache
+
+# Filtreli aday listelerinin toplamları; aday yazan kod commit'ten sonra changed() çağırır
+totals = VersionedCache('aday_sayim', ttl=300, maxsize=1024)
+
+
+def apply_transitions(cursor, transitions):
+    """[(eski_durum, yeni_durum)] değişikliklerini sayaçlara tek seferde yazar.
+
+    Yeni adaylar için eski durum None verilir.
+    """
+    totals = {}
+    for old_status, new_status in transitions:
+        if old_status == new_status:
+            continue
+        if old_status is not None:
+            totals[old_status] = totals.get(old_status, 0) - 1
+        if new_status is not None:
+            totals[new_status] = totals.get(new_status, 0) + 1
+    rows = [(durum, delta, delta) for durum, delta in sorted(totals.items()) if delta]
+    if not rows:
+        return 0
+    cursor.executemany("""
+        INSERT INTO Aday_Durum_Sayac (durum, adet) VALUES (%s, GREATEST(%s, 0))
+        ON DUPLICATE KEY UPDATE adet = GREATEST(adet + %s, 0)
+    """, rows)
+    return len(rows)
+
+
+def changed():
+    totals.bump()
+
+
+def counts(cursor):
+    cursor.execute("SELECT durum, adet FROM Aday_Durum_Sayac WHERE adet > 0 ORDER BY durum")
+    return {row['durum']: int(row['adet']) for row in cursor.fetchall()}
+
+
+def rebuild(cursor):
+    """Sayaçları Adaylar tablosundan yeniden hesaplar; yazılan satır sayısını döner."""
+    cursor.execute("DELETE FROM Aday_Durum_Sayac")
+    cursor.execute("""
+        INSERT INTO Aday_Durum_Sayac (durum, adet)
+        SELECT COALESCE(durum, 'Basvuru Alindi'), COUNT(*) FROM Adaylar GROUP BY COALESCE(durum, 'Basvuru Alindi')
+    """)
+    return cursor.rowcount
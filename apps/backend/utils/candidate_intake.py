@@ -0,0 +1,371 @@
+"""Herkese açık aday başvuruları için yazma tamponu.
+
+`/candidates/apply` başvuruyu doğrulayıp bellek içi kuyruğa yazar ve hemen
+202 döner; arka plandaki yazıcı kuyruğu INTAKE_BATCH_SIZE'lık gruplar halinde
+tek çok satırlı INSERT ve tek commit ile Adaylar tablosuna aktarır. Böylece
+viral bir ilan bordro ile aynı veritabanında commit fırtınasına dönüşmez.
+
+- Aynı e-posta + pozisyon için tekrar başvurular önce süreç içi kümeyle,
+  yazıcıda ise (email, pozisyon_id) indeksi üzerinden toplu sorguyla elenir.
+- IP başına INTAKE_RATE_LIMIT / INTAKE_RATE_WINDOW saniye sınırı uygulanır.
+- Kuyruk doluysa `submit()` QueueFull döner; uç nokta 429 ile yanıtlar.
+
+Yazılamayan gruplar önce satır satır denenir; hatalı bir satır tüm grubu
+batırmaz. Yine de yazılamayan başvurular INTAKE_SPILL_PATH dosyasına
+(JSON satırları) aktarılır ve yazıcı bunları INTAKE_REPLAY_SECONDS aralıkla
+yeniden dener. Bu başvuruların tekrar anahtarları süreç içi kümeden
+çıkarılır; başvuru sahibi tekrar denerse 409 almaz, kesin tekrar kontrolü
+yazıcıdaki sorgudur. Dosyada okunamayan satırlar `.bozuk` dosyasına ayrılır;
+çöken bir sürecin yarım kalan `.replay` dosyaları sonraki yeniden
+denemede devralınır. Beklenmeyen bir hatada yazıcı durmaz, durmuşsa sonraki
+başvuruda yeniden başlatılır.
+
+Kuyruk bellektedir: süreç düzgün kapanırken kalanlar yazılır, çökme anında
+henüz yazılmamış başvurular kaybolabilir.
+"""
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+from utils import candidate_counts, events, metrics
+from utils.db import get_connection
+
+INTAKE_QUEUE_SIZE = int(os.getenv('INTAKE_QUEUE_SIZE', 5000))
+INTAKE_BATCH_SIZE = int(os.getenv('INTAKE_BATCH_SIZE', 200))
+INTAKE_FLUSH_SECONDS = float(os.getenv('INTAKE_FLUSH_SECONDS', 1))
+INTAKE_RATE_LIMIT = int(os.getenv('INTAKE_RATE_LIMIT', 5))
+INTAKE_RATE_WINDOW = float(os.getenv('INTAKE_RATE_WINDOW', 600))
+INTAKE_DEDUPE_MAX = int(os.getenv('INTAKE_DEDUPE_MAX', 200000))
+INTAKE_MAX_RETRIES = 3
+INTAKE_SPILL_PATH = os.getenv(
+    'INTAKE_SPILL_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'spool', 'basvurular.jsonl'),
+)
+INTAKE_REPLAY_SECONDS = float(os.getenv('INTAKE_REPLAY_SECONDS', 60))
+# Bu kadar yeniden denemeden sonra hâlâ yazılamayan (ör. bozuk) başvuru bırakılır
+INTAKE_MAX_REPLAYS = int(os.getenv('INTAKE_MAX_REPLAYS', 1440))
+
+_queue = queue.Queue(maxsize=INTAKE_QUEUE_SIZE)
+_lock = threading.Lock()
+_seen = set()
+_rates = {}  # ip -> (pencere başlangıcı, istek sayısı)
+_spill_lock = threading.Lock()
+_writer = {'thread': None, 'replayed_at': 0.0, 'atexit': False}
+
+metrics.register_gauge('hr_intake_queue_depth', 'Yazılmayı bekleyen başvurular', lambda: _queue.qsize())
+
+
+class QueueFull(Exception):
+    pass
+
+
+class RateLimited(Exception):
+    pass
+
+
+class Duplicate(Exception):
+    pass
+
+
+def _dedupe_key(application):
+    if not application.get('email'):
+        return None
+    return application['email'], application['pozisyon_id']
+
+
+def _check_rate(ip, now):
+    with _lock:
+        if len(_rates) > 10000:
+            # Süresi geçmiş pencereler atılır; sözlük ziyaretçi sayısıyla büyümez
+            for key in [k for k, (start, _) in _rates.items() if now - start >= INTAKE_RATE_WINDOW]:
+                del _rates[key]
+        start, count = _rates.get(ip, (now, 0))
+        if now - start >= INTAKE_RATE_WINDOW:
+            start, count = now, 0
+        if count >= INTAKE_RATE_LIMIT:
+            return False
+        _rates[ip] = (start, count + 1)
+        return True
+
+
+def submit(application, ip):
+    """Doğrulanmış başvuruyu kuyruğa ekler.
+
+    RateLimited, Duplicate ya da QueueFull fırlatabilir.
+    """
+    if not _check_rate(ip, time.monotonic()):
+        metrics.inc('hr_intake_rejected_total', help_text='Reddedilen başvurular', neden='rate')
+        raise RateLimited()
+    key = _dedupe_key(application)
+    with _lock:
+        if key is not None and key in _seen:
+            metrics.inc('hr_intake_rejected_total', help_text='Reddedilen başvurular', neden='tekrar')
+            raise Duplicate()
+        try:
+            _queue.put_nowait(application)
+        except queue.Full:
+            metrics.inc('hr_intake_rejected_total', help_text='Reddedilen başvurular', neden='kuyruk')
+            raise QueueFull()
+        if key is not None:
+            if len(_seen) >= INTAKE_DEDUPE_MAX:
+                # Küme yalnızca hızlı yoldur; kesin kontrol yazıcıdaki sorgudur
+                _seen.clear()
+            _seen.add(key)
+    _ensure_writer()
+
+
+def _existing(cursor, batch):
+    pairs = {key for key in map(_dedupe_key, batch) if key is not None}
+    if not pairs:
+        return set()
+    emails = sorted({email for email, _ in pairs})
+    placeholders = ', '.join(['%s'] * len(emails))
+    cursor.execute(
+        f"SELECT LOWER(email) AS email, pozisyon_id FROM Adaylar WHERE email IN ({placeholders})",
+        emails,
+    )
+    return {(row['email'], row['pozisyon_id']) for row in cursor.fetchall()} & pairs
+
+
+def _write_batch(batch):
+    """Grubu tek transaction'da yazar; yazılan başvuru sayısını döner."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        existing = _existing(cursor, batch)
+        rows, batch_keys = [], set()
+        for application in batch:
+            key = _dedupe_key(application)
+            if key is not None:
+                if key in existing or key in batch_keys:
+                    continue
+                batch_keys.add(key)
+            rows.append((
+                application['ad'], application['soyad'], application.get('telefon'),
+                application.get('email'), application['pozisyon_id'],
+                application['basvuru_tarihi'], 'Basvuru Alindi',
+            ))
+        if rows:
+            # PyMySQL INSERT ... VALUES için executemany'yi tek çok satırlı ifadeye çevirir
+            cursor.executemany("""
+                INSERT INTO Adaylar (ad, soyad, telefon, email, pozisyon_id, basvuru_tarihi, durum)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, rows)
+            candidate_counts.apply_transitions(cursor, [(None, 'Basvuru Alindi')] * len(rows))
+        conn.commit()
+        return len(rows)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _forget(batch):
+    with _lock:
+        for key in map(_dedupe_key, batch):
+            _seen.discard(key)
+
+
+def _ends_mid_line(path):
+    """Dosya çökme sonrası yarım bir satırla bitiyorsa True döner."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b'\n'
+    except OSError:
+        return False
+
+
+def _spill(batch):
+    """Yazılamayan başvuruları diskteki dosyaya ekler; yazıcı sonra yeniden dener."""
+    batch = [dict(application, _deneme=application.get('_deneme', 0) + 1) for application in batch]
+    expired = [application for application in batch if application['_deneme'] > INTAKE_MAX_REPLAYS]
+    if expired:
+        print(f"{len(expired)} başvuru {INTAKE_MAX_REPLAYS} denemede yazılamadı, bırakıldı")
+        metrics.inc('hr_intake_dropped_total', len(expired), 'Yazılamayan başvurular')
+        batch = [application for application in batch if application['_deneme'] <= INTAKE_MAX_REPLAYS]
+        if not batch:
+            return
+    try:
+        os.makedirs(os.path.dirname(INTAKE_SPILL_PATH), exist_ok=True)
+        with _spill_lock:
+            # Yarım satıra eklenen kayıt da bozulmasın diye yeni satırdan başlanır
+            prefix = '\n' if _ends_mid_line(INTAKE_SPILL_PATH) else ''
+            with open(INTAKE_SPILL_PATH, 'a', encoding='utf-8') as f:
+                f.write(prefix)
+                for application in batch:
+                    f.write(json.dumps(application, ensure_ascii=False) + '\n')
+    except OSError as e:
+        print(f"Başvurular diske yazılamadı: {e}")
+        metrics.inc('hr_intake_dropped_total', len(batch), 'Yazılamayan başvurular')
+        return
+    metrics.inc('hr_intake_spilled_total', len(batch), 'Diske aktarılan başvurular')
+
+
+def _replay_file(path):
+    """Dosyadaki başvuruları gruplar halinde yeniden yazar ve dosyayı siler."""
+    pending, broken = [], []
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                pending.append(json.loads(line))
+            except ValueError:
+                # Ör. çökme anında yarım kalmış satır; tüm dosyayı durdurmaz
+                broken.append(line if line.endswith('\n') else line + '\n')
+    if broken:
+        print(f"{len(broken)} okunamayan başvuru satırı {INTAKE_SPILL_PATH}.bozuk dosyasına ayrıldı")
+        metrics.inc('hr_intake_dropped_total', len(broken), 'Yazılamayan başvurular')
+        with _spill_lock, open(f'{INTAKE_SPILL_PATH}.bozuk', 'a', encoding='utf-8') as f:
+            f.writelines(broken)
+    for start in range(0, len(pending), INTAKE_BATCH_SIZE):
+        # Yine yazılamayanlar _flush tarafından yeni dosyaya aktarılır
+        _flush(pending[start:start + INTAKE_BATCH_SIZE])
+    os.remove(path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _orphaned_replays():
+    """Sahibi artık çalışmayan süreçlerden kalan `.replay` dosyaları."""
+    orphans = []
+    for path in glob.glob(glob.escape(INTAKE_SPILL_PATH) + '.*.replay'):
+        pid = path[len(INTAKE_SPILL_PATH) + 1:-len('.replay')]
+        if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+            orphans.append(path)
+    return orphans
+
+
+def _replay_spill():
+    """Diskteki başvuruları gruplar halinde yeniden yazar."""
+    now = time.monotonic()
+    if now - _writer['replayed_at'] < INTAKE_REPLAY_SECONDS:
+        return
+    _writer['replayed_at'] = now
+    # Dosya süreç kimliğiyle yeniden adlandırılır; aynı dosyayı iki süreç birden oynatmaz
+    replaying = f'{INTAKE_SPILL_PATH}.{os.getpid()}.replay'
+    # Önce bu sürecin yarım kalan dosyası, sonra ölü süreçlerinkiler, en son yeni dökülenler
+    replayed = False
+    for source in [replaying] + _orphaned_replays() + [INTAKE_SPILL_PATH]:
+        if replayed and source == INTAKE_SPILL_PATH:
+            # Bu turda yeniden dökülenler hemen tekrar denenmez
+            break
+        with _spill_lock:
+            try:
+                if source != replaying:
+                    os.replace(source, replaying)
+                elif not os.path.exists(replaying):
+                    continue
+            except FileNotFoundError:
+                # Başka bir süreç devraldı ya da dökülen başvuru yok
+                continue
+        _replay_file(replaying)
+        replayed = True
+
+
+def _write_rows(batch):
+    """Hatalı bir satırın grubu batırmaması için satırları tek tek yazar; (yazılan, kalan) döner."""
+    written, failed = 0, []
+    for application in batch:
+        try:
+            written += _write_batch([application])
+        except Exception as e:
+            print(f"Başvuru yazma hatası (tek satır): {e}")
+            failed.append(application)
+    return written, failed
+
+
+def _flush(batch):
+    written = None
+    for attempt in range(1, INTAKE_MAX_RETRIES + 1):
+        try:
+            written = _write_batch(batch)
+            break
+        except Exception as e:
+            print(f"Başvuru yazma hatası (deneme {attempt}): {e}")
+            if attempt < INTAKE_MAX_RETRIES:
+                time.sleep(attempt)
+    if written is None:
+        written, failed = _write_rows(batch)
+        if failed:
+            _forget(failed)
+            _spill(failed)
+    metrics.inc('hr_intake_written_total', written, 'Yazılan başvurular')
+    if written:
+        candidate_counts.changed()
+        events.publish('aday', {'adet': written}, roller=('admin',))
+
+
+def _next_batch(timeout=None):
+    try:
+        batch = [_queue.get(timeout=timeout)]
+    except queue.Empty:
+        return []
+    deadline = time.monotonic() + INTAKE_FLUSH_SECONDS
+    while len(batch) < INTAKE_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _writer_loop():
+    while True:
+        try:
+            batch = _next_batch(timeout=INTAKE_REPLAY_SECONDS)
+            if batch:
+                _flush(batch)
+            _replay_spill()
+        except Exception as e:
+            # Yazıcı thread'i ölürse kuyruk dolar ve tüm başvurular 429 alır
+            print(f"Başvuru yazıcısı hatası: {e}")
+            time.sleep(1)
+
+
+def drain():
+    """Kuyrukta kalanları çağıran thread'de yazar; süreç kapanırken çağrılır."""
+    batch = []
+    while True:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+        if len(batch) >= INTAKE_BATCH_SIZE:
+            _flush(batch)
+            batch = []
+    if batch:
+        _flush(batch)
+
+
+def _ensure_writer():
+    thread = _writer['thread']
+    if thread is not None and thread.is_alive():
+        return
+    with _lock:
+        thread = _writer['thread']
+        if thread is None or not thread.is_alive():
+            if thread is not None:
+                print("Başvuru yazıcısı durmuş, yeniden başlatılıyor")
+            _writer['thread'] = threading.Thread(target=_writer_loop, name='aday-yazici', daemon=True)
+            _writer['thread'].start()
+            if not _writer['atexit']:
+                _writer['atexit'] = True
+                atexit.register(drain)
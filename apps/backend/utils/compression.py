@@ -0,0 +1,136 @@
+"""Yanıt sıkıştırma ve koşullu GET.
+
+- GET yanıtlarına içerikten hesaplanan zayıf ETag eklenir; `If-None-Match`
+  eşleşirse gövde gönderilmeden 304 döner. Önbellek sürümü bilinen uç noktalar
+  `not_modified(etag)` ile sorgu çalıştırmadan önce 304 dönebilir; sık yoklanan
+  uç noktalar etiketi `version_etag()` ile olay kanallarının sürümünden üretir.
+- Eşik üzerindeki metin/JSON yanıtları istemci destekliyorsa brotli (kuruluysa)
+  ya da gzip ile sıkıştırılır. Akıtılan yanıtlar parça parça sıkıştırılır.
+"""
+import gzip
+import hashlib
+import os
+import time
+import zlib
+
+from flask import current_app, request
+
+from utils import events
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli opsiyonel
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+# Sürüm tabanlı ETag'lerin geçerlilik penceresi; başka süreçlerdeki yazmalar en geç bu sürede yansır
+ETAG_MAX_AGE = float(os.getenv('ETAG_MAX_AGE', 30))
+
+
+def _compressible(response):
+    mimetype = response.mimetype or ''
+    if mimetype == 'text/event-stream':
+        # SSE olayları tamponlanmadan anında gitmelidir
+        return False
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def not_modified(etag, weak=True):
+    """İstemcinin elindeki sürüm güncelse hazır 304 yanıtı döner, değilse None.
+
+    Dönen yanıt yoksa view normal yanıtını üretip `response.set_etag(etag, weak)`
+    ile aynı etiketi eklemelidir.
+    """
+    if request.method in ('GET', 'HEAD') and request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=weak)
+        response.headers.setdefault('Cache-Control', 'private, no-cache')
+        return response
+    return None
+
+
+def version_etag(name, kanallar, *parts):
+    """`kanallar` olay sürümlerinden ve istek parçalarından zayıf ETag üretir.
+
+    Sürümler yayın yapıldığı süreçte hemen artar; etiket ayrıca ETAG_MAX_AGE
+    saniyelik pencereye bağlı olduğundan diğer süreçlerin yazmaları da en geç
+    bu sürede yeni etiket üretir. `parts` kullanıcıya ya da parametrelere göre
+    değişen yanıtları ayırır.
+    """
+    window = int(time.time() // ETAG_MAX_AGE)
+    key = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:12]
+    return f"{name}-{events.version(*kanallar)}-{window}-{key}"
+
+
+def _compress_stream(chunks, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        data = compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def init_compression(app):
+    """after_request kancalarından en son çalışması için diğerlerinden önce çağrılmalıdır."""
+
+    @app.after_request
+    def _conditional_and_compress(response):
+        if response.status_code != 200 or response.direct_passthrough:
+            return response
+
+        if request.method in ('GET', 'HEAD'):
+            response.headers.setdefault('Cache-Control', 'private, no-cache')
+            if not response.is_streamed:
+                if 'ETag' not in response.headers:
+                    response.add_etag(weak=True)
+                response.make_conditional(request)
+                if response.status_code == 304:
+                    return response
+
+        if 'Content-Encoding' in response.headers or not _compressible(response):
+            return response
+        if response.is_streamed:
+            # Gövde bilinmediğinden boyut eşiği uygulanmaz; akıtılan yanıtlar zaten büyüktür
+            response.vary.add('Accept-Encoding')
+            encoding = _choose_encoding()
+            if encoding is None:
+                return response
+            response.response = _compress_stream(response.response, encoding)
+            response.headers['Content-Encoding'] = encoding
+            response.headers.pop('Content-Length', None)
+            return response
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = _choose_encoding()
+        if encoding is None:
+            return response
+
+        if encoding == 'br':
+            body = brotli.compress(data, quality=BROTLI_QUALITY)
+        else:
+            body = gzip.compress(data, compresslevel=GZIP_LEVEL)
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
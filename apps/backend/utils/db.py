@@ -1,10 +1,125 @@
-import pymysql
+import logging
 import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import pymysql
+import pymysql.cursors
+from pymysql.constants import CLIENT
 from dotenv import load_dotenv
+from flask import g, has_request_context, request
+
+from utils import metrics
 
 # Load environment variables from .env file
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
 
+logger = logging.getLogger(__name__)
+
+# Bu süreyi aşan sorgular uç nokta bilgisiyle loglanır (ms)
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+# Tek istekte aynı parametreli sorgu bundan fazla çalışırsa N+1 uyarısı verilir
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 20))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize_sql(query):
+    return _WHITESPACE.sub(" ", query).strip()
+
+
+class QueryStats:
+    """Bir isteğin veritabanı kullanımı: sorgu sayısı, toplam süre, satır sayısı."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.rows = 0
+        self.slowest_ms = 0.0
+        self.slowest_sql = None
+        self.statements = {}
+
+    def record(self, sql, elapsed_ms, rows):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.rows += rows
+        self.statements[sql] = self.statements.get(sql, 0) + 1
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_sql = sql
+
+    def repeated(self, threshold):
+        return [(sql, n) for sql, n in self.statements.items() if n > threshold]
+
+
+def current_query_stats():
+    """Aktif isteğin QueryStats nesnesi; istek dışında (arka plan işleri) None."""
+    if not has_request_context():
+        return None
+    stats = g.get('_query_stats')
+    if stats is None:
+        stats = g._query_stats = QueryStats()
+    return stats
+
+
+def _endpoint_label():
+    if has_request_context():
+        return request.endpoint or request.path
+    return threading.current_thread().name
+
+
+_capture = threading.local()
+
+
+@contextmanager
+def capture_queries():
+    """Blok içinde bu thread'de çalışan (sorgu, parametre) çiftlerini toplar."""
+    previous = getattr(_capture, 'queries', None)
+    _capture.queries = []
+    try:
+        yield _capture.queries
+    finally:
+        _capture.queries = previous
+
+
+class InstrumentedCursor(pymysql.cursors.DictCursor):
+    """Her sorgunun süresini ve döndürdüğü satır sayısını isteğe işleyen cursor."""
+
+    _in_statement = False
+
+    def execute(self, query, args=None):
+        # executemany içeriden execute çağırır; ikinci kez sayılmasın
+        if self._in_statement:
+            return super().execute(query, args)
+        return self._instrumented(super().execute, query, args)
+
+    def executemany(self, query, args):
+        return self._instrumented(super().executemany, query, args)
+
+    def _instrumented(self, run, query, args):
+        self._in_statement = True
+        started = time.perf_counter()
+        try:
+            return run(query, args)
+        finally:
+            self._in_statement = False
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            rows = self.rowcount if self.description and self.rowcount > 0 else 0
+            sql = _normalize_sql(query)
+            captured = getattr(_capture, 'queries', None)
+            if captured is not None:
+                captured.append((query, args))
+            metrics.inc('hr_db_queries_total', help_text='Çalıştırılan SQL ifadeleri')
+            metrics.inc('hr_db_query_seconds_total', elapsed_ms / 1000, 'SQL ifadelerinde geçen toplam süre')
+            stats = current_query_stats()
+            if stats is not None:
+                stats.record(sql, elapsed_ms, rows)
+            if elapsed_ms >= SLOW_QUERY_MS:
+                logger.warning("Yavaş sorgu (%.1f ms, %s, %d satır): %s", elapsed_ms, _endpoint_label(), rows, sql[:500])
+
+
 DB_CONFIG = {
     "host": os.getenv("DB_HOST", "localhost"),
     "user": os.getenv("DB_USER", "root"),
@@ -12,15 +127,66 @@ DB_CONFIG = {
     "database": os.getenv("DB_NAME", "railway"),
     "port": int(os.getenv("DB_PORT", 3306)),
     "charset": "utf8mb4",
-    "cursorclass": pymysql.cursors.DictCursor
+    "cursorclass": InstrumentedCursor
 }
 
 
-def get_connection():
-    connection = pymysql.connect(**DB_CONFIG)
+class TrackedConnection(pymysql.connections.Connection):
+    """Açık bağlantı sayısını metriklere yansıtan bağlantı."""
+
+    _tracked = False
+
+    def connect(self, sock=None):
+        super().connect(sock)
+        if not self._tracked:
+            self._tracked = True
+            metrics.inc('hr_db_connections_opened_total', help_text='Açılan veritabanı bağlantıları')
+            metrics.gauge_add('hr_db_connections_open', 1, 'Açık veritabanı bağlantıları')
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            if self._tracked:
+                self._tracked = False
+                metrics.gauge_add('hr_db_connections_open', -1, 'Açık veritabanı bağlantıları')
+
+
+def get_connection(multi_statements=False):
+    """`multi_statements` yalnızca parametreleri istemcide kaçışlanmış birleşik sorgular için açılır."""
+    if multi_statements:
+        return TrackedConnection(**DB_CONFIG, client_flag=CLIENT.MULTI_STATEMENTS)
+    connection = TrackedConnection(**DB_CONFIG)
     return connection
 
 
+def init_query_instrumentation(app):
+    """İstek sonunda Server-Timing başlığını ekler ve N+1 şüphelerini loglar."""
+
+    @app.before_request
+    def _start_request_timer():
+        g._request_started = time.perf_counter()
+
+    @app.after_request
+    def _emit_query_stats(response):
+        stats = g.get('_query_stats')
+        timings = []
+        if stats is not None:
+            timings.append(f'db;dur={stats.total_ms:.1f};desc="{stats.count} sorgu, {stats.rows} satir"')
+            if stats.slowest_sql:
+                timings.append(f'db-slowest;dur={stats.slowest_ms:.1f}')
+            for sql, n in stats.repeated(N_PLUS_ONE_THRESHOLD):
+                logger.warning("Olası N+1: %s isteğinde aynı sorgu %d kez çalıştı: %s", _endpoint_label(), n, sql[:300])
+        started = g.get('_request_started')
+        if started is not None:
+            timings.append(f'app;dur={(time.perf_counter() - started) * 1000:.1f}')
+        if timings:
+            response.headers.add('Server-Timing', ', '.join(timings))
+        return response
+
+    return app
+
+
 def dict_from_row(row):
     # With DictCursor, rows are already dicts
     if row is None:
@@ -29,192 +195,10 @@ def dict_from_row(row):
 
 
 def init_db():
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    # Create tables (MySQL syntax)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Departman (
-            departman_id INT AUTO_INCREMENT PRIMARY KEY,
-            departman_adi VARCHAR(255) NOT NULL,
-            aciklama TEXT,
-            olusturma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Personel (
-            personel_id INT AUTO_INCREMENT PRIMARY KEY,
-            tc_kimlik_no VARCHAR(20) UNIQUE NOT NULL,
-            ad VARCHAR(100) NOT NULL,
-            soyad VARCHAR(100) NOT NULL,
-            dogum_tarihi DATE NOT NULL,
-            telefon VARCHAR(20),
-            email VARCHAR(255),
-            adres TEXT,
-            ise_giris_tarihi DATE NOT NULL,
-            departman_id INT,
-            aktif_mi TINYINT DEFAULT 1,
-            FOREIGN KEY (departman_id) REFERENCES Departman(departman_id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Kullanici (
-            kullanici_id INT AUTO_INCREMENT PRIMARY KEY,
-            kullanici_adi VARCHAR(100) UNIQUE NOT NULL,
-            sifre_hash VARCHAR(255) NOT NULL,
-            email VARCHAR(255),
-            rol VARCHAR(50) NOT NULL DEFAULT 'employee',
-            personel_id INT,
-            ilk_giris TINYINT DEFAULT 1,
-            aktif_mi TINYINT DEFAULT 1,
-            olusturma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            son_giris DATETIME,
-            FOREIGN KEY (personel_id) REFERENCES Personel(personel_id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Pozisyon (
-            pozisyon_id INT AUTO_INCREMENT PRIMARY KEY,
-            pozisyon_adi VARCHAR(255) NOT NULL,
-            taban_maas DECIMAL(12, 2) NOT NULL,
-            departman_id INT,
-            FOREIGN KEY (departman_id) REFERENCES Departman(departman_id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Personel_Pozisyon (
-            personel_pozisyon_id INT AUTO_INCREMENT PRIMARY KEY,
-            personel_id INT NOT NULL,
-            pozisyon_id INT NOT NULL,
-            baslangic_tarihi DATE NOT NULL,
-            bitis_tarihi DATE,
-            guncel_mi TINYINT DEFAULT 1,
-            FOREIGN KEY (personel_id) REFERENCES Personel(personel_id),
-            FOREIGN KEY (pozisyon_id) REFERENCES Pozisyon(pozisyon_id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Devam (
-            devam_id INT AUTO_INCREMENT PRIMARY KEY,
-            personel_id INT NOT NULL,
-            tarih DATE NOT NULL,
-            giris_saati TIME,
-            cikis_saati TIME,
-            durum VARCHAR(50) DEFAULT 'Normal',
-            ek_mesai_saat DECIMAL(8, 2) DEFAULT 0,
-            aciklama TEXT,
-            FOREIGN KEY (personel_id) REFERENCES Personel(personel_id),
-            UNIQUE KEY unique_personel_tarih (personel_id, tarih)
-        )
-    ''')
-
-    # Eski kurulu veritabanlarında ek_mesai_saat kolonu olmayabilir; eklemeyi dene.
-    try:
-        cursor.execute(
-            "ALTER TABLE Devam ADD COLUMN ek_mesai_saat DECIMAL(8, 2) DEFAULT 0"
-        )
-    except Exception:
-        # Kolon zaten varsa hata alırız, bunu sessizce yoksay.
-        pass
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Izin_Turu (
-            izin_turu_id INT AUTO_INCREMENT PRIMARY KEY,
-            izin_adi VARCHAR(255) NOT NULL,
-            yillik_hak_gun INT DEFAULT 0,
-            ucretli_mi TINYINT DEFAULT 1
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Izin_Kayit (
-            izin_kayit_id INT AUTO_INCREMENT PRIMARY KEY,
-            personel_id INT NOT NULL,
-            izin_turu_id INT NOT NULL,
-            baslangic_tarihi DATE NOT NULL,
-            bitis_tarihi DATE NOT NULL,
-            gun_sayisi INT NOT NULL,
-            onay_durumu VARCHAR(50) DEFAULT 'Beklemede',
-            FOREIGN KEY (personel_id) REFERENCES Personel(personel_id),
-            FOREIGN KEY (izin_turu_id) REFERENCES Izin_Turu(izin_turu_id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Maas_Bileseni (
-            bilesen_id INT AUTO_INCREMENT PRIMARY KEY,
-            bilesen_adi VARCHAR(255) NOT NULL,
-            bilesen_tipi VARCHAR(100) NOT NULL,
-            sabit_mi TINYINT DEFAULT 0,
-            varsayilan_tutar DECIMAL(12, 2) DEFAULT 0
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Maas_Hesap (
-            maas_hesap_id INT AUTO_INCREMENT PRIMARY KEY,
-            personel_id INT NOT NULL,
-            donem_yil INT NOT NULL,
-            donem_ay INT NOT NULL,
-            brut_maas DECIMAL(12, 2) NOT NULL,
-            toplam_ekleme DECIMAL(12, 2) DEFAULT 0,
-            toplam_kesinti DECIMAL(12, 2) DEFAULT 0,
-            net_maas DECIMAL(12, 2) NOT NULL,
-            odeme_tarihi DATE,
-            odendi_mi TINYINT DEFAULT 0,
-            FOREIGN KEY (personel_id) REFERENCES Personel(personel_id),
-            UNIQUE KEY unique_personel_donem (personel_id, donem_yil, donem_ay)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Maas_Detay (
-            maas_detay_id INT AUTO_INCREMENT PRIMARY KEY,
-            maas_hesap_id INT NOT NULL,
-            bilesen_id INT NOT NULL,
-            tutar DECIMAL(12, 2) NOT NULL,
-            FOREIGN KEY (maas_hesap_id) REFERENCES Maas_Hesap(maas_hesap_id),
-            FOREIGN KEY (bilesen_id) REFERENCES Maas_Bileseni(bilesen_id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Duyuru (
-            duyuru_id INT AUTO_INCREMENT PRIMARY KEY,
-            baslik VARCHAR(255) NOT NULL,
-            icerik TEXT NOT NULL,
-            olusturan_kullanici_id INT NOT NULL,
-            yayin_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
-            bitis_tarihi DATETIME NULL,
-            oncelik VARCHAR(20) DEFAULT 'Normal',
-            aktif_mi TINYINT DEFAULT 1,
-            FOREIGN KEY (olusturan_kullanici_id) REFERENCES Kullanici(kullanici_id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Adaylar (
-            aday_id INT AUTO_INCREMENT PRIMARY KEY,
-            ad VARCHAR(100) NOT NULL,
-            soyad VARCHAR(100) NOT NULL,
-            telefon VARCHAR(20),
-            email VARCHAR(255),
-            pozisyon_id INT NOT NULL,
-            basvuru_tarihi DATE NOT NULL,
-            gorusme_tarihi DATE NULL,
-            durum VARCHAR(50) DEFAULT 'Basvuru Alindi',
-            aciklama TEXT,
-            FOREIGN KEY (pozisyon_id) REFERENCES Pozisyon(pozisyon_id)
-        )
-    ''')
+    """Şemayı güncel sürüme getirir (bkz. utils/migrations.py)."""
+    from utils.migrations import migrate
 
-    conn.commit()
-    conn.close()
+    migrate(log=lambda msg: None)
 
 
 def seed_db():
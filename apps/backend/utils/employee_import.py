@@ -0,0 +1,239 @@
+"""CSV'den toplu personel içe aktarma.
+
+Dosya satır satır okunur ve IMPORT_CHUNK'lık parçalar halinde işlenir:
+
+1. Mevcut TC numaraları, kullanıcı adları, departman ve pozisyon id'leri
+   içe aktarma başında birer sorguyla kümelere yüklenir; her satır bu
+   kümelere karşı doğrulanır (dosya içi tekrarlar da yakalanır).
+2. Geçerli satırların parolaları süreç havuzunda hash'lenir.
+3. Personel, Personel_Pozisyon ve Kullanici satırları çok satırlı INSERT'lerle
+   yazılır; her parça kendi transaction'ında commit edilir.
+
+Hatalı satırlar dosyayı durdurmaz; rapor satır numarasıyla hataları listeler.
+Dosya yarıda okunamaz hale gelirse (UTF-8 dışı bayt, bozuk CSV) okuma durur,
+o ana kadar okunan satırlar yazılır ve rapor `kesildi` / `kesildi_satir` ile döner.
+Bir parçanın yazımı veritabanında başarısız olursa o parçanın satırları
+hatalı sayılır, önceki parçalar kalıcıdır.
+"""
+import csv
+import datetime
+import os
+import re
+from decimal import Decimal, InvalidOperation
+
+from utils.passwords import hash_passwords
+
+IMPORT_CHUNK = int(os.getenv('IMPORT_CHUNK', 1000))
+IMPORT_MAX_ROWS = int(os.getenv('IMPORT_MAX_ROWS', 50000))
+IMPORT_MAX_ERRORS = 1000
+
+REQUIRED_COLUMNS = ('tc_kimlik_no', 'ad', 'soyad', 'kullanici_adi', 'sifre')
+OPTIONAL_COLUMNS = (
+    'dogum_tarihi', 'telefon', 'email', 'adres', 'ise_giris_tarihi', 'departman_id',
+    'pozisyon_id', 'kidem_seviyesi', 'ozel_taban_maas', 'rol',
+)
+ROLES = ('employee', 'admin')
+
+_TC_PATTERN = re.compile(r'^[0-9]{11}$')
+
+
+def _lookup_sets(cursor):
+    cursor.execute("SELECT tc_kimlik_no FROM Personel")
+    tc_numbers = {row['tc_kimlik_no'] for row in cursor.fetchall()}
+    cursor.execute("SELECT kullanici_adi FROM Kullanici")
+    usernames = {row['kullanici_adi'].lower() for row in cursor.fetchall()}
+    cursor.execute("SELECT departman_id FROM Departman")
+    departments = {row['departman_id'] for row in cursor.fetchall()}
+    cursor.execute("SELECT pozisyon_id FROM Pozisyon")
+    positions = {row['pozisyon_id'] for row in cursor.fetchall()}
+    return tc_numbers, usernames, departments, positions
+
+
+def _date(value, field, errors):
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        errors.append(f'{field} YYYY-AA-GG biçiminde olmalı')
+        return None
+
+
+def _int(value, field, errors, allowed=None):
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        errors.append(f'{field} sayı olmalı')
+        return None
+    if allowed is not None and number not in allowed:
+        errors.append(f'{field} bulunamadı' if isinstance(allowed, set) else f'{field} geçersiz')
+        return None
+    return number
+
+
+def _validate(raw, tc_numbers, usernames, departments, positions):
+    """(kayıt, hatalar) döner; geçerli kaydın TC ve kullanıcı adı kümelere eklenir."""
+    row = {key: (raw.get(key) or '').strip() for key in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+    errors = [f'{field} zorunlu' for field in REQUIRED_COLUMNS if not row[field]]
+
+    tc = row['tc_kimlik_no']
+    if tc and not _TC_PATTERN.match(tc):
+        errors.append('tc_kimlik_no 11 haneli olmalı')
+    elif tc in tc_numbers:
+        errors.append('Bu TC kimlik numarası zaten kayıtlı')
+    username = row['kullanici_adi'].lower()
+    if username and username in usernames:
+        errors.append('Bu kullanıcı adı zaten alınmış')
+    if len(row['ad']) > 100 or len(row['soyad']) > 100:
+        errors.append('Ad ve soyad en fazla 100 karakter olabilir')
+
+    rol = row['rol'] or 'employee'
+    if rol not in ROLES:
+        errors.append('rol geçersiz')
+    ozel_taban_maas = None
+    if row['ozel_taban_maas']:
+        try:
+            ozel_taban_maas = Decimal(row['ozel_taban_maas'])
+        except InvalidOperation:
+            errors.append('ozel_taban_maas sayı olmalı')
+
+    record = {
+        'tc_kimlik_no': tc,
+        'ad': row['ad'],
+        'soyad': row['soyad'],
+        'dogum_tarihi': _date(row['dogum_tarihi'], 'dogum_tarihi', errors),
+        'telefon': row['telefon'] or None,
+        'email': row['email'] or None,
+        'adres': row['adres'] or None,
+        'ise_giris_tarihi': _date(row['ise_giris_tarihi'], 'ise_giris_tarihi', errors) or datetime.date.today(),
+        'departman_id': _int(row['departman_id'], 'departman_id', errors, departments),
+        'pozisyon_id': _int(row['pozisyon_id'], 'pozisyon_id', errors, positions),
+        'kidem_seviyesi': _int(row['kidem_seviyesi'], 'kidem_seviyesi', errors, (1, 2, 3)) or 3,
+        'ozel_taban_maas': ozel_taban_maas,
+        'kullanici_adi': row['kullanici_adi'],
+        'sifre': row['sifre'],
+        'rol': rol,
+    }
+    if errors:
+        return None, errors
+    tc_numbers.add(tc)
+    usernames.add(username)
+    return record, []
+
+
+def _write_chunk(cursor, records, password_hashes):
+    """Parçayı çok satırlı INSERT'lerle yazar; commit çağırana aittir."""
+    # VALUES yalnızca yer tutucu içerir; PyMySQL böylece tek çok satırlı INSERT gönderir
+    cursor.executemany("""
+        INSERT INTO Personel (tc_kimlik_no, ad, soyad, dogum_tarihi, telefon, email, adres, ise_giris_tarihi, departman_id, aktif_mi)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, [
+        (r['tc_kimlik_no'], r['ad'], r['soyad'], r['dogum_tarihi'], r['telefon'], r['email'],
+         r['adres'], r['ise_giris_tarihi'], r['departman_id'], 1)
+        for r in records
+    ])
+    placeholders = ', '.join(['%s'] * len(records))
+    cursor.execute(
+        f"SELECT personel_id, tc_kimlik_no FROM Personel WHERE tc_kimlik_no IN ({placeholders})",
+        [r['tc_kimlik_no'] for r in records],
+    )
+    personel_by_tc = {row['tc_kimlik_no']: row['personel_id'] for row in cursor.fetchall()}
+
+    pozisyon_rows = [
+        (personel_by_tc[r['tc_kimlik_no']], r['pozisyon_id'], r['ise_giris_tarihi'], 1,
+         r['kidem_seviyesi'], r['ozel_taban_maas'])
+        for r in records if r['pozisyon_id']
+    ]
+    if pozisyon_rows:
+        cursor.executemany("""
+            INSERT INTO Personel_Pozisyon (personel_id, pozisyon_id, baslangic_tarihi, guncel_mi, kidem_seviyesi, ozel_taban_maas)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, pozisyon_rows)
+    cursor.executemany("""
+        INSERT INTO Kullanici (kullanici_adi, sifre_hash, email, rol, personel_id, ilk_giris, aktif_mi)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, [
+        (r['kullanici_adi'], password_hash, r['email'], r['rol'], personel_by_tc[r['tc_kimlik_no']], 1, 1)
+        for r, password_hash in zip(records, password_hashes)
+    ])
+
+
+def decode_lines(stream):
+    """İkili akışı satır satır UTF-8 çözer.
+
+    TextIOWrapper 8 KB'lık bloklar halinde çözdüğünden bozuk bayt, önündeki
+    geçerli satırlarla birlikte hata verir; satır bazında çözmek hatayı tam
+    olarak o satıra bağlar.
+    """
+    for number, raw in enumerate(stream, start=1):
+        yield raw.decode('utf-8-sig' if number == 1 else 'utf-8')
+
+
+def run_import(conn, lines):
+    """`lines` (metin satırları) üzerinden içe aktarmayı yürütür ve raporu döner."""
+    cursor = conn.cursor()
+    reader = csv.DictReader(lines)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Eksik kolonlar: {', '.join(missing)}")
+
+    tc_numbers, usernames, departments, positions = _lookup_sets(cursor)
+    report = {'toplam_satir': 0, 'eklenen': 0, 'hatali': 0, 'hatalar': []}
+
+    def fail(satir, hatalar):
+        report['hatali'] += 1
+        if len(report['hatalar']) < IMPORT_MAX_ERRORS:
+            report['hatalar'].append({'satir': satir, 'hatalar': hatalar})
+
+    def flush(chunk):
+        if not chunk:
+            return
+        records = [record for _, record in chunk]
+        password_hashes = hash_passwords([r['sifre'] for r in records], processes=True)
+        try:
+            _write_chunk(cursor, records, password_hashes)
+            conn.commit()
+            report['eklenen'] += len(records)
+        except Exception as e:
+            conn.rollback()
+            print(f"Personel içe aktarma hatası: {e}")
+            for satir, record in chunk:
+                # Yazılamayan kayıtlar kümelerden çıkarılır; dosyada tekrar geçerlerse yeniden denenir
+                tc_numbers.discard(record['tc_kimlik_no'])
+                usernames.discard(record['kullanici_adi'].lower())
+                fail(satir, [f'Veritabanı hatası: {e}'])
+
+    chunk = []
+    # Başlık 1. satırdır; veri satırları 2'den başlar
+    satir = 1
+    while True:
+        satir += 1
+        try:
+            raw = next(reader)
+        except StopIteration:
+            break
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Önceki parçalar commit edilmiş olabilir; rapor kaybolmasın diye okuma burada kesilir
+            mesaj = 'Dosya UTF-8 olmalıdır' if isinstance(e, UnicodeDecodeError) else f'CSV okunamadı: {e}'
+            report['toplam_satir'] += 1
+            report['kesildi'] = True
+            report['kesildi_satir'] = satir
+            fail(satir, [mesaj])
+            break
+        report['toplam_satir'] += 1
+        if report['toplam_satir'] > IMPORT_MAX_ROWS:
+            report['toplam_satir'] -= 1
+            report['kesildi'] = True
+            break
+        record, hatalar = _validate(raw, tc_numbers, usernames, departments, positions)
+        if hatalar:
+            fail(satir, hatalar)
+            continue
+        chunk.append((satir, record))
+        if len(chunk) >= IMPORT_CHUNK:
+            flush(chunk)
+            chunk = []
+    flush(chunk)
+    return report
@@ -0,0 +1,223 @@
+"""Personel profil sayfası için birleşik yükleyici.
+
+Profil bölümleri (kimlik, pozisyon geçmişi, izinler, devam özeti, maaşlar ve
+sekmelerdeki tam listeler) personel+bölüm bazında kısa süreli önbellekte
+tutulur. Önbellekte olmayan bölümlerin sorguları tek bir çoklu ifade olarak
+gönderilir ve sonuç kümeleri sırayla okunur; profil açmak tek gidiş-dönüştür.
+
+Personel verisini değiştiren kod commit'ten sonra `invalidate(personel_ids)`
+çağırır; birden çok personeli etkileyen değişikliklerde (pozisyon maaşı,
+departman adı, toplu bordro) argümansız çağrılır. Diğer süreçler en geç
+PROFILE_CACHE_TTL saniyede tazelenir. Her personel için bir nesil sayacı
+tutulur; sorgu sürerken `invalidate` çağrıldıysa eski sonuç önbelleğe yazılmaz.
+"""
+import os
+import threading
+
+from utils.cache import VersionedCache
+from utils.db import get_connection
+
+PROFILE_CACHE_TTL = float(os.getenv('PROFILE_CACHE_TTL', 30))
+
+_sections = VersionedCache('personel_profil', ttl=PROFILE_CACHE_TTL, maxsize=4096)
+_MISSING = object()
+# personel_id -> nesil; invalidate artırır, load sorgudan önceki değeri karşılaştırır
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+def _personel(rows):
+    if not rows:
+        return None
+    row = rows[0]
+    return {
+        'personel_id': row['personel_id'],
+        'tc_kimlik_no': row['tc_kimlik_no'],
+        'ad': row['ad'],
+        'soyad': row['soyad'],
+        'telefon': row['telefon'],
+        'email': row['email'],
+        'ise_giris_tarihi': row['ise_giris_tarihi'],
+        'dogum_tarihi': row['dogum_tarihi'],
+        'adres': row['adres'],
+        'aktif_mi': bool(row['aktif_mi']),
+        'departman_id': row['departman_id'],
+        'departman_adi': row['departman_adi'],
+        'pozisyon_id': row['pozisyon_id'],
+        'pozisyon_adi': row['pozisyon_adi'],
+        'taban_maas': row['taban_maas'],
+        'kidem_seviyesi': row.get('kidem_seviyesi'),
+        'ozel_taban_maas': row.get('ozel_taban_maas'),
+    }
+
+
+def _money(value):
+    return float(value) if value else 0
+
+
+# bölüm -> (sorgu, biçimlendirici); sorgular tek %s parametresi (personel_id) alır
+SECTIONS = {
+    'personel': ("""
+        SELECT
+            p.personel_id, p.tc_kimlik_no, p.ad, p.soyad, p.telefon, p.email,
+            p.ise_giris_tarihi, p.dogum_tarihi, p.adres, p.aktif_mi,
+            d.departman_id, d.departman_adi,
+            poz.pozisyon_id, poz.pozisyon_adi,
+            COALESCE(pp.ozel_taban_maas, poz.taban_maas + (COALESCE(pp.kidem_seviyesi, 3) - 1) * 15000) AS taban_maas,
+            COALESCE(pp.kidem_seviyesi, 3) AS kidem_seviyesi,
+            pp.ozel_taban_maas
+        FROM Personel p
+        LEFT JOIN Departman d ON p.departman_id = d.departman_id
+        LEFT JOIN Personel_Pozisyon pp ON p.personel_id = pp.personel_id AND pp.guncel_mi = 1
+        LEFT JOIN Pozisyon poz ON pp.pozisyon_id = poz.pozisyon_id
+        WHERE p.personel_id = %s
+    """, _personel),
+    'pozisyon_gecmisi': ("""
+        SELECT pp.baslangic_tarihi, pp.bitis_tarihi, poz.pozisyon_adi
+        FROM Personel_Pozisyon pp
+        JOIN Pozisyon poz ON pp.pozisyon_id = poz.pozisyon_id
+        WHERE pp.personel_id = %s
+        ORDER BY pp.baslangic_tarihi DESC
+    """, lambda rows: [{
+        'baslangic_tarihi': r['baslangic_tarihi'],
+        'bitis_tarihi': r['bitis_tarihi'],
+        'pozisyon_adi': r['pozisyon_adi'],
+    } for r in rows]),
+    'izinler': ("""
+        SELECT ik.baslangic_tarihi, ik.bitis_tarihi, ik.gun_sayisi,
+               ik.onay_durumu, it.izin_adi
+        FROM Izin_Kayit ik
+        JOIN Izin_Turu it ON ik.izin_turu_id = it.izin_turu_id
+        WHERE ik.personel_id = %s
+        ORDER BY ik.baslangic_tarihi DESC
+        LIMIT 50
+    """, lambda rows: [{
+        'baslangic_tarihi': r['baslangic_tarihi'],
+        'bitis_tarihi': r['bitis_tarihi'],
+        'gun_sayisi': r['gun_sayisi'],
+        'onay_durumu': r['onay_durumu'],
+        'izin_adi': r['izin_adi'],
+    } for r in rows]),
+    'devam_ozet': ("""
+        SELECT durum, COUNT(*) AS adet FROM Devam
+        WHERE personel_id = %s AND tarih BETWEEN DATE_SUB(CURDATE(), INTERVAL 30 DAY) AND CURDATE()
+        GROUP BY durum
+    """, lambda rows: [{'durum': r['durum'], 'adet': r['adet']} for r in rows]),
+    'maaslar': ("""
+        SELECT donem_yil, donem_ay, brut_maas, toplam_ekleme, toplam_kesinti, net_maas, odendi_mi
+        FROM Maas_Hesap
+        WHERE personel_id = %s
+        ORDER BY donem_yil DESC, donem_ay DESC
+        LIMIT 6
+    """, lambda rows: [{
+        'donem_yil': r['donem_yil'], 'donem_ay': r['donem_ay'],
+        'brut_maas': r['brut_maas'], 'toplam_ekleme': r['toplam_ekleme'],
+        'toplam_kesinti': r['toplam_kesinti'], 'net_maas': r['net_maas'],
+        'odendi_mi': r['odendi_mi'],
+    } for r in rows]),
+    # Sekmelerdeki tam listeler (/employees/<id>/attendance, /leaves, /salary)
+    'devam': ("""
+        SELECT tarih, durum, ek_mesai_saat
+        FROM Devam
+        WHERE personel_id = %s
+        ORDER BY tarih DESC
+    """, lambda rows: [{
+        'tarih': str(r['tarih']),
+        'durum': r['durum'],
+        'ek_mesai_saat': r.get('ek_mesai_saat', 0),
+    } for r in rows]),
+    'izin_gecmisi': ("""
+        SELECT k.izin_kayit_id, k.baslangic_tarihi, k.bitis_tarihi,
+               k.gun_sayisi, k.onay_durumu, t.izin_adi
+        FROM Izin_Kayit k
+        JOIN Izin_Turu t ON k.izin_turu_id = t.izin_turu_id
+        WHERE k.personel_id = %s
+        ORDER BY k.baslangic_tarihi DESC
+    """, lambda rows: [{
+        'izin_kayit_id': r['izin_kayit_id'],
+        'baslangic_tarihi': str(r['baslangic_tarihi']),
+        'bitis_tarihi': str(r['bitis_tarihi']),
+        'gun_sayisi': r['gun_sayisi'],
+        'onay_durumu': r['onay_durumu'],
+        'izin_adi': r['izin_adi'],
+    } for r in rows]),
+    'maas_gecmisi': ("""
+        SELECT maas_hesap_id, donem_yil, donem_ay, brut_maas,
+               toplam_ekleme, toplam_kesinti, net_maas, odendi_mi
+        FROM Maas_Hesap
+        WHERE personel_id = %s
+        ORDER BY donem_yil DESC, donem_ay DESC
+    """, lambda rows: [{
+        'maas_hesap_id': r['maas_hesap_id'],
+        'donem_yil': r['donem_yil'],
+        'donem_ay': r['donem_ay'],
+        'brut_maas': _money(r['brut_maas']),
+        'toplam_ekleme': _money(r['toplam_ekleme']),
+        'toplam_kesinti': _money(r['toplam_kesinti']),
+        'net_maas': _money(r['net_maas']),
+        'odendi_mi': bool(r['odendi_mi']),
+    } for r in rows]),
+}
+
+DEFAULT_INCLUDE = ('pozisyon_gecmisi', 'izinler', 'devam_ozet', 'maaslar')
+
+
+def parse_include(value, default=DEFAULT_INCLUDE):
+    """`include=a,b` parametresini çözer; bilinmeyen bölümde ValueError."""
+    if not value:
+        return list(default)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Bilinmeyen bölüm: {', '.join(unknown)}")
+    return names
+
+
+def load(personel_id, sections):
+    """{bölüm: veri} döner; önbellekte olmayan bölümler tek çoklu ifadeyle okunur.
+
+    İstenen tüm bölümler önbellekteyse veritabanı bağlantısı açılmaz.
+    """
+    result = {}
+    missing = []
+    for name in dict.fromkeys(sections):
+        cached = _sections.get((personel_id, name), _MISSING)
+        if cached is _MISSING:
+            missing.append(name)
+        else:
+            result[name] = cached
+    if not missing:
+        return result
+
+    version = _sections.version
+    generation = _generations.get(personel_id, 0)
+    conn = get_connection(multi_statements=True)
+    try:
+        cursor = conn.cursor()
+        # Parametre istemcide kaçışlanır; bölüm sorguları sunucuya tek metin olarak gider
+        cursor.execute(';\n'.join(cursor.mogrify(SECTIONS[name][0].strip(), (personel_id,)) for name in missing))
+        for index, name in enumerate(missing):
+            if index:
+                cursor.nextset()
+            result[name] = SECTIONS[name][1](cursor.fetchall())
+    finally:
+        conn.close()
+    with _generations_lock:
+        if _generations.get(personel_id, 0) != generation:
+            return result
+        for name in missing:
+            # Henüz var olmayan personel önbelleğe alınmaz
+            if name != 'personel' or result[name] is not None:
+                _sections.set((personel_id, name), result[name], version=version)
+    return result
+
+
+def invalidate(personel_ids=None):
+    if personel_ids is None:
+        _sections.bump()
+        return
+    with _generations_lock:
+        for personel_id in {int(pid) for pid in personel_ids if pid}:
+            _generations[personel_id] = _generations.get(personel_id, 0) + 1
+            for name in SECTIONS:
+                _sections.discard((personel_id, name))
@@ -0,0 +1,121 @@
+"""Süreç içi yayın/abonelik ve Server-Sent Events akışı.
+
+Yazma uç noktaları commit'ten sonra `publish()` çağırır; `/api/events`
+aboneleri yalnızca değişiklik bildirimi alır ve ilgili veriyi yeniden çeker.
+
+Abonelere ayrı kuyruk ya da thread açılmaz: olaylar tek bir halka tampona
+sıra numarasıyla yazılır ve tüm bekleyen akışlar tek bir Condition ile
+uyandırılır; her akış kendi son sıra numarasından sonrasını okur. Böylece
+yayın maliyeti abone sayısından bağımsızdır. Binlerce boşta bağlantı için
+uygulama gevent worker'ı ile çalıştırılmalıdır (her bağlantı bir greenlet):
+
+    gunicorn -k gevent --worker-connections 2000 'app:create_app()'
+
+Olaylar yalnızca yayınlandıkları süreçteki abonelere ulaşır.
+"""
+import json
+import os
+import threading
+import uuid
+from collections import deque
+
+from utils import metrics
+
+EVENTS_BUFFER = int(os.getenv('EVENTS_BUFFER', 1000))
+EVENTS_HEARTBEAT = float(os.getenv('EVENTS_HEARTBEAT', 15))
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv('EVENTS_MAX_SUBSCRIBERS', 5000))
+
+_events = deque(maxlen=EVENTS_BUFFER)
+_cond = threading.Condition()
+_state = {'seq': 0, 'subscribers': 0}
+_versions = {}  # kanal -> yayın sayısı (sürüm tabanlı ETag'ler için)
+# Olay id'leri '<süreç>-<sıra>' biçimindedir; başka süreçten ya da yeniden
+# başlatılmadan önceki bir id ile bağlanan istemciye `reset` gönderilir.
+_EPOCH = uuid.uuid4().hex[:8]
+
+metrics.register_gauge('hr_sse_subscribers', 'Açık SSE bağlantıları', lambda: _state['subscribers'])
+
+
+def publish(kanal, veri=None, roller=None, personel_ids=None):
+    """Bildirim yayınlar.
+
+    `roller` ve `personel_ids` verilmezse olay herkese gider; verilirse
+    rolü listede olan ya da personel id'si listede olan abonelere gider.
+    """
+    audience = None
+    if roller is not None or personel_ids is not None:
+        audience = (frozenset(roller or ()), frozenset(int(p) for p in (personel_ids or ()) if p))
+    with _cond:
+        _state['seq'] += 1
+        _versions[kanal] = _versions.get(kanal, 0) + 1
+        _events.append((_state['seq'], kanal, veri, audience))
+        _cond.notify_all()
+    metrics.inc('hr_events_published_total', help_text='Yayınlanan bildirimler', kanal=kanal)
+
+
+def version(*kanallar):
+    """Kanalların bu süreçteki yayın sayaçlarından sürüm metni üretir."""
+    return '.'.join([_EPOCH] + [str(_versions.get(kanal, 0)) for kanal in kanallar])
+
+
+def _visible(audience, role, personel_id):
+    if audience is None:
+        return True
+    roller, personel_ids = audience
+    return role in roller or (personel_id is not None and int(personel_id) in personel_ids)
+
+
+def _message(seq, event, data):
+    return f"id: {_EPOCH}-{seq}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _parse_last_id(last_id):
+    epoch, _, seq = (last_id or '').partition('-')
+    if epoch != _EPOCH or not seq.isdigit():
+        return None
+    return int(seq)
+
+
+def at_capacity():
+    return _state['subscribers'] >= EVENTS_MAX_SUBSCRIBERS
+
+
+def stream(payload, last_id=None, heartbeat=EVENTS_HEARTBEAT):
+    """Aboneye görünür olayları SSE olarak üretir.
+
+    `last_id` (Last-Event-ID) tampondan daha eskiyse ya da başka bir sürece
+    aitse istemciye `reset` olayı gönderilir; istemci tüm verisini yeniden
+    çekmelidir.
+    """
+    role = payload.get('role')
+    personel_id = payload.get('personel_id')
+    resume = _parse_last_id(last_id)
+    with _cond:
+        _state['subscribers'] += 1
+        seq = _state['seq'] if resume is None else min(resume, _state['seq'])
+    try:
+        yield "retry: 5000\n\n"
+        if last_id and resume is None:
+            yield _message(seq, 'reset', {})
+        while True:
+            with _cond:
+                if _state['seq'] == seq:
+                    _cond.wait(heartbeat)
+                current = _state['seq']
+                oldest = _events[0][0] if _events else current + 1
+                # Sıra numaraları ardışık olduğundan yeni olaylar tamponun sonundan okunur
+                pending = [_events[-i] for i in range(min(current - seq, len(_events)), 0, -1)]
+            if current == seq:
+                yield ": keepalive\n\n"
+                continue
+            if oldest > seq + 1:
+                yield _message(current, 'reset', {})
+                seq = current
+                continue
+            for event_seq, kanal, veri, audience in pending:
+                if _visible(audience, role, personel_id):
+                    yield _message(event_seq, kanal, veri)
+            seq = current
+    finally:
+        with _cond:
+            _state['subscribers'] -= 1
@@ -0,0 +1,136 @@
+"""Hızlı JSON sağlayıcı.
+
+orjson kuruluysa serileştirme onunla yapılır; değilse Flask'ın varsayılan
+sağlayıcısına düşülür. Her iki yolda da tarih ve para alanlarının formatı
+Flask varsayılanıyla aynıdır:
+
+- date/datetime -> HTTP tarihi ("Mon, 01 Jan 2024 00:00:00 GMT")
+- Decimal       -> string ("12345.67")
+- time          -> "HH:MM:SS"
+- timedelta     -> "HH:MM:SS" (PyMySQL TIME kolonlarını timedelta döndürür)
+"""
+import datetime
+import decimal
+from functools import lru_cache
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson opsiyonel
+    orjson = None
+
+# Bu sayının üzerindeki listeler parça parça akıtılarak gönderilir
+STREAM_THRESHOLD = 5000
+STREAM_CHUNK = 1000
+
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _http_datetime(d):
+    # werkzeug.http.http_date ile aynı çıktı; naive değerler UTC kabul edilir
+    if d.tzinfo is not None:
+        d = d.astimezone(datetime.timezone.utc)
+    return (f'{_DAYS[d.weekday()]}, {d.day:02d} {_MONTHS[d.month - 1]} {d.year:04d} '
+            f'{d.hour:02d}:{d.minute:02d}:{d.second:02d} GMT')
+
+
+@lru_cache(maxsize=4096)
+def _http_date(d):
+    # Listelerde aynı tarihler çok tekrar ettiği için sonuç önbelleğe alınır
+    return f'{_DAYS[d.weekday()]}, {d.day:02d} {_MONTHS[d.month - 1]} {d.year:04d} 00:00:00 GMT'
+
+
+def _format_timedelta(value):
+    total = int(value.total_seconds())
+    sign = '-' if total < 0 else ''
+    total = abs(total)
+    return f'{sign}{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}'
+
+
+def _default(o):
+    if isinstance(o, datetime.datetime):
+        return _http_datetime(o)
+    if isinstance(o, datetime.date):
+        return _http_date(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, datetime.time):
+        return o.isoformat()
+    if isinstance(o, datetime.timedelta):
+        return _format_timedelta(o)
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def _orjson_option(self, indent=False):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, indent=False):
+        if orjson is None:
+            kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+            return self.dumps(obj, **kwargs).encode('utf-8')
+        return orjson.dumps(obj, default=_default, option=self._orjson_option(indent))
+
+    def dumps(self, obj, **kwargs):
+        # Özel argüman (cls, indent vb.) isteyen çağrılar standart kütüphaneye gider
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._orjson_option()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(
+            self.dumps_bytes(obj, indent=indent) + b'\n',
+            mimetype=self.mimetype,
+        )
+
+
+def _bytes_dumper(provider):
+    if isinstance(provider, FastJSONProvider):
+        return provider.dumps_bytes
+    return lambda obj: provider.dumps(obj).encode('utf-8')
+
+
+def stream_json_array(items, dumps, chunk=STREAM_CHUNK):
+    """Listeyi JSON dizisi olarak parça parça üreten generator.
+
+    Generator uygulama bağlamı kapandıktan sonra tüketilir; `dumps` bu yüzden
+    çağıran tarafta çözülüp verilir.
+    """
+    yield b'['
+    first = True
+    for start in range(0, len(items), chunk):
+        body = dumps(items[start:start + chunk])[1:-1]
+        if not body:
+            continue
+        if not first:
+            yield b','
+        yield body
+        first = False
+    yield b']\n'
+
+
+def json_list_response(items):
+    """Küçük listeler için normal jsonify; büyük listeleri akıtarak gönderir."""
+    provider = current_app.json
+    if len(items) < STREAM_THRESHOLD:
+        return provider.response(items)
+    return current_app.response_class(
+        stream_json_array(items, _bytes_dumper(provider)), mimetype=provider.mimetype,
+    )
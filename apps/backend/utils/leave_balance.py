@@ -0,0 +1,175 @@
+"""İzin bakiyesi defteri (Izin_Bakiye).
+
+Her (personel, yıl, izin türü) için onaylı ve bekleyen gün toplamları tutulur;
+izin kaydı oluşturma ve durum değişiklikleri aynı transaction içinde defteri
+günceller. İzin, başlangıç tarihinin yılına yazılır. Hak edilen gün Izin_Turu
+tablosundan okunur, böylece hak değişiklikleri defteri bozmaz.
+
+Defter ile Izin_Kayit arasında sapma şüphesi olduğunda:
+
+    flask --app app leave-balance rebuild [--personel-id 5] [--check]
+"""
+import datetime
+
+from utils.archive import table_source
+
+# Durum -> defterde etkilediği kolon; Reddedildi ve Iptal bakiyeden düşmez
+STATUS_COLUMNS = {'Beklemede': 'bekleyen_gun', 'Onaylandi': 'kullanilan_gun'}
+
+
+def _year(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.year
+    return int(str(value)[:4])
+
+
+def _delta(leave, old_status, new_status):
+    gun = int(leave['gun_sayisi'] or 0)
+    delta = {'kullanilan_gun': 0, 'bekleyen_gun': 0}
+    if old_status in STATUS_COLUMNS:
+        delta[STATUS_COLUMNS[old_status]] -= gun
+    if new_status in STATUS_COLUMNS:
+        delta[STATUS_COLUMNS[new_status]] += gun
+    key = (int(leave['personel_id']), _year(leave['baslangic_tarihi']), int(leave['izin_turu_id']))
+    return key, delta['kullanilan_gun'], delta['bekleyen_gun']
+
+
+def apply_transitions(cursor, transitions):
+    """[(izin, eski_durum, yeni_durum)] değişikliklerini deftere tek seferde yazar.
+
+    `izin` en az personel_id, izin_turu_id, baslangic_tarihi ve gun_sayisi
+    içermelidir; yeni kayıtlar için eski durum None verilir.
+    """
+    totals = {}
+    for leave, old_status, new_status in transitions:
+        if old_status == new_status:
+            continue
+        key, kullanilan, bekleyen = _delta(leave, old_status, new_status)
+        current = totals.get(key, (0, 0))
+        totals[key] = (current[0] + kullanilan, current[1] + bekleyen)
+    rows = [(*key, k, b, k, b) for key, (k, b) in sorted(totals.items()) if k or b]
+    if not rows:
+        return 0
+    cursor.executemany("""
+        INSERT INTO Izin_Bakiye (personel_id, yil, izin_turu_id, kullanilan_gun, bekleyen_gun)
+        VALUES (%s, %s, %s, GREATEST(%s, 0), GREATEST(%s, 0))
+        ON DUPLICATE KEY UPDATE
+            kullanilan_gun = GREATEST(kullanilan_gun + %s, 0),
+            bekleyen_gun = GREATEST(bekleyen_gun + %s, 0)
+    """, rows)
+    return len(rows)
+
+
+def apply_transition(cursor, leave, old_status, new_status):
+    return apply_transitions(cursor, [(leave, old_status, new_status)])
+
+
+def lock_balance(cursor, personel_id, izin_turu_id, yil):
+    """Defter satırını (yoksa oluşturup) kilitler; eşzamanlı taleplerin aynı bakiyeyi harcamasını önler."""
+    cursor.execute(
+        "INSERT IGNORE INTO Izin_Bakiye (personel_id, yil, izin_turu_id) VALUES (%s, %s, %s)",
+        (personel_id, yil, izin_turu_id),
+    )
+    cursor.execute("""
+        SELECT kullanilan_gun, bekleyen_gun FROM Izin_Bakiye
+        WHERE personel_id = %s AND yil = %s AND izin_turu_id = %s
+        FOR UPDATE
+    """, (personel_id, yil, izin_turu_id))
+    return cursor.fetchone()
+
+
+def balances(cursor, personel_id, yil):
+    cursor.execute("""
+        SELECT it.izin_turu_id, it.izin_adi, it.yillik_hak_gun, it.ucretli_mi,
+               COALESCE(b.kullanilan_gun, 0) AS kullanilan_gun,
+               COALESCE(b.bekleyen_gun, 0) AS bekleyen_gun
+        FROM Izin_Turu it
+        LEFT JOIN Izin_Bakiye b
+          ON b.personel_id = %s AND b.yil = %s AND b.izin_turu_id = it.izin_turu_id
+        ORDER BY it.izin_adi
+    """, (personel_id, yil))
+    result = []
+    for row in cursor.fetchall():
+        hak = int(row['yillik_hak_gun'] or 0)
+        kullanilan = int(row['kullanilan_gun'])
+        bekleyen = int(row['bekleyen_gun'])
+        result.append({
+            'izin_turu_id': row['izin_turu_id'],
+            'izin_adi': row['izin_adi'],
+            'ucretli_mi': bool(row['ucretli_mi']),
+            'hak_gun': hak,
+            'kullanilan_gun': kullanilan,
+            'bekleyen_gun': bekleyen,
+            'kalan_gun': max(hak - kullanilan - bekleyen, 0) if hak > 0 else None,
+        })
+    return result
+
+
+def _expected_sql(personel_id=None, yil=None):
+    conditions = ["k.onay_durumu IN ('Beklemede', 'Onaylandi')"]
+    params = []
+    if personel_id is not None:
+        conditions.append("k.personel_id = %s")
+        params.append(personel_id)
+    if yil is not None:
+        conditions.append("k.baslangic_tarihi BETWEEN %s AND %s")
+        params.extend([f'{yil}-01-01', f'{yil}-12-31'])
+    # Arşivlenmiş izinler de bakiyeye dahildir
+    sql = f"""
+        SELECT k.personel_id, YEAR(k.baslangic_tarihi) AS yil, k.izin_turu_id,
+               SUM(CASE WHEN k.onay_durumu = 'Onaylandi' THEN k.gun_sayisi ELSE 0 END) AS kullanilan_gun,
+               SUM(CASE WHEN k.onay_durumu = 'Beklemede' THEN k.gun_sayisi ELSE 0 END) AS bekleyen_gun
+        FROM {table_source('Izin_Kayit', True)} k
+        WHERE {' AND '.join(conditions)}
+        GROUP BY k.personel_id, YEAR(k.baslangic_tarihi), k.izin_turu_id
+    """
+    return sql, params
+
+
+def _scope(personel_id=None, yil=None):
+    conditions, params = [], []
+    if personel_id is not None:
+        conditions.append("personel_id = %s")
+        params.append(personel_id)
+    if yil is not None:
+        conditions.append("yil = %s")
+        params.append(yil)
+    return (' WHERE ' + ' AND '.join(conditions)) if conditions else '', params
+
+
+def rebuild(cursor, personel_id=None, yil=None):
+    """Defteri Izin_Kayit (ve arşivi) üzerinden yeniden hesaplar; yazılan satır sayısını döner."""
+    where, params = _scope(personel_id, yil)
+    cursor.execute(f"DELETE FROM Izin_Bakiye{where}", params)
+    sql, params = _expected_sql(personel_id, yil)
+    cursor.execute(f"""
+        INSERT INTO Izin_Bakiye (personel_id, yil, izin_turu_id, kullanilan_gun, bekleyen_gun)
+        {sql}
+    """, params)
+    return cursor.rowcount
+
+
+def drift(cursor, personel_id=None, yil=None):
+    """Defter ile kayıtlardan hesaplanan değerlerin farklı olduğu satırlar."""
+    sql, params = _expected_sql(personel_id, yil)
+    cursor.execute(sql, params)
+    expected = {
+        (r['personel_id'], r['yil'], r['izin_turu_id']): (int(r['kullanilan_gun']), int(r['bekleyen_gun']))
+        for r in cursor.fetchall()
+    }
+    where, params = _scope(personel_id, yil)
+    cursor.execute(f"SELECT personel_id, yil, izin_turu_id, kullanilan_gun, bekleyen_gun FROM Izin_Bakiye{where}", params)
+    actual = {
+        (r['personel_id'], r['yil'], r['izin_turu_id']): (int(r['kullanilan_gun']), int(r['bekleyen_gun']))
+        for r in cursor.fetchall()
+    }
+    differences = []
+    for key in sorted(set(expected) | set(actual)):
+        beklenen = expected.get(key, (0, 0))
+        defter = actual.get(key, (0, 0))
+        if beklenen != defter:
+            differences.append({
+                'personel_id': key[0], 'yil': key[1], 'izin_turu_id': key[2],
+                'defter': defter, 'beklenen': beklenen,
+            })
+    return differences
@@ -0,0 +1,197 @@
+"""Personel bazlı izin aralığı dizini.
+
+Her personelin izinleri başlangıç tarihine göre sıralı tutulur; yanında bitiş
+tarihlerinin önek maksimumu saklanır. Bir tarih aralığıyla çakışan izinler
+ikili arama ile bulunur ve yalnızca gerçekten çakışma ihtimali olan kayıtlar
+gezilir. Çakışma kontrolü, bordro izinleri ve devam kapsama kontrolü SQL
+sorgusu yerine bu dizinden yapılır.
+
+Dizin süreç içidir: izin yazan uç noktalar commit'ten sonra `invalidate()`
+çağırır, diğer süreçlerdeki (ör. farklı gunicorn worker'ları) eski kayıtlar
+LEAVE_INDEX_TTL saniye sonra yeniden okunur. Yazma kararı veren çağrılar
+`fresh=True` ile personelin kaydını her zaman veritabanından tazeler.
+
+Toplu bordro üretimi süreç dizinini kullanmaz: `period_index()` yalnızca
+dönemle kesişen izinleri okuyup çağırana ait, LEAVE_INDEX_MAX sınırına
+tabi olmayan yerel bir dizin döner.
+"""
+import datetime
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+
+from utils import metrics
+
+LEAVE_INDEX_TTL = float(os.getenv('LEAVE_INDEX_TTL', 60))
+LEAVE_INDEX_MAX = int(os.getenv('LEAVE_INDEX_MAX', 20000))
+LOAD_CHUNK = 500
+
+# Çakışma kontrolünde dikkate alınan durumlar
+ACTIVE_STATUSES = ('Beklemede', 'Onaylandi')
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+
+metrics.register_gauge('hr_leave_index_employees', 'İzin dizinindeki personel sayısı', lambda: len(_entries))
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+class Leave:
+    __slots__ = ('izin_kayit_id', 'izin_turu_id', 'bas', 'bit', 'gun_sayisi', 'onay_durumu', 'ucretli')
+
+    def __init__(self, row):
+        self.izin_kayit_id = row['izin_kayit_id']
+        self.izin_turu_id = row['izin_turu_id']
+        self.bas = _to_date(row['baslangic_tarihi'])
+        self.bit = _to_date(row['bitis_tarihi'])
+        self.gun_sayisi = int(row['gun_sayisi'] or 0)
+        self.onay_durumu = row['onay_durumu']
+        self.ucretli = bool(row['ucretli_mi'])
+
+
+class _EmployeeLeaves:
+    """Başlangıca göre sıralı aralıklar ve bitişlerin önek maksimumu."""
+
+    __slots__ = ('leaves', 'starts', 'max_end', 'loaded_at')
+
+    def __init__(self, leaves):
+        self.leaves = sorted(leaves, key=lambda l: (l.bas, l.izin_kayit_id))
+        self.starts = [l.bas for l in self.leaves]
+        self.max_end = []
+        current = None
+        for l in self.leaves:
+            current = l.bit if current is None or l.bit > current else current
+            self.max_end.append(current)
+        self.loaded_at = time.monotonic()
+
+    def overlapping(self, start, end):
+        # bas <= end olan son kayıttan geriye gidilir; önek maksimum bitiş
+        # start'ın altına düştüğünde solda çakışan kayıt kalmaz.
+        i = bisect_right(self.starts, end) - 1
+        found = []
+        while i >= 0 and self.max_end[i] >= start:
+            if self.leaves[i].bit >= start:
+                found.append(self.leaves[i])
+            i -= 1
+        found.reverse()
+        return found
+
+
+def _load(cursor, personel_ids, start=None, end=None):
+    """`start`/`end` verilirse yalnızca [start, end] ile kesişen onaylı izinler okunur."""
+    rows_by_pid = {pid: [] for pid in personel_ids}
+    ids = list(personel_ids)
+    period_sql, period_params = '', []
+    if start is not None:
+        period_sql = " AND ik.onay_durumu = 'Onaylandi' AND ik.baslangic_tarihi <= %s AND ik.bitis_tarihi >= %s"
+        period_params = [end, start]
+    for i in range(0, len(ids), LOAD_CHUNK):
+        chunk = ids[i:i + LOAD_CHUNK]
+        cursor.execute(f"""
+            SELECT ik.izin_kayit_id, ik.personel_id, ik.izin_turu_id, ik.baslangic_tarihi, ik.bitis_tarihi,
+                   ik.gun_sayisi, ik.onay_durumu, it.ucretli_mi
+            FROM Izin_Kayit ik
+            JOIN Izin_Turu it ON ik.izin_turu_id = it.izin_turu_id
+            WHERE ik.personel_id IN ({', '.join(['%s'] * len(chunk))}){period_sql}
+        """, [*chunk, *period_params])
+        for row in cursor.fetchall():
+            rows_by_pid[row['personel_id']].append(Leave(row))
+    return {pid: _EmployeeLeaves(leaves) for pid, leaves in rows_by_pid.items()}
+
+
+def ensure(cursor, personel_ids, fresh=False):
+    """Verilen personellerin dizinde güncel olmasını sağlar; eksikler tek sorguda yüklenir."""
+    ids = {int(pid) for pid in personel_ids if pid}
+    now = time.monotonic()
+    with _lock:
+        missing = set()
+        for pid in ids:
+            entry = _entries.get(pid)
+            if fresh or entry is None or now - entry.loaded_at > LEAVE_INDEX_TTL:
+                missing.add(pid)
+            else:
+                _entries.move_to_end(pid)
+    for pid in ids:
+        metrics.record_cache('leave_index', pid not in missing)
+    if not missing:
+        return
+    loaded = _load(cursor, missing)
+    with _lock:
+        _entries.update(loaded)
+        while len(_entries) > LEAVE_INDEX_MAX:
+            _entries.popitem(last=False)
+
+
+def period_index(cursor, personel_ids, start, end):
+    """Dönemle kesişen onaylı izinlerin yerel dizini ({personel_id: giriş}).
+
+    Süreç dizinine yazılmaz; binlerce personelli bordro üretimi LRU sınırı
+    yüzünden tekrar tek tek sorguya düşmez.
+    """
+    ids = {int(pid) for pid in personel_ids if pid}
+    if not ids:
+        return {}
+    return _load(cursor, ids, _to_date(start), _to_date(end))
+
+
+def _entry(cursor, personel_id):
+    personel_id = int(personel_id)
+    entry = _entries.get(personel_id)
+    if entry is None or time.monotonic() - entry.loaded_at > LEAVE_INDEX_TTL:
+        ensure(cursor, [personel_id])
+        entry = _entries.get(personel_id) or _EmployeeLeaves([])
+    return entry
+
+
+def overlapping(cursor, personel_id, start, end, statuses=None, index=None):
+    """[start, end] ile kesişen izinler (başlangıca göre sıralı).
+
+    `index` (bkz. period_index) verilirse süreç dizini yerine o kullanılır.
+    """
+    entry = index.get(int(personel_id)) if index is not None else None
+    if entry is None:
+        entry = _entry(cursor, personel_id)
+    found = entry.overlapping(_to_date(start), _to_date(end))
+    if statuses is not None:
+        found = [l for l in found if l.onay_durumu in statuses]
+    return found
+
+
+def has_conflict(cursor, personel_id, start, end):
+    """Beklemede ya da onaylı bir izinle çakışma varsa ilk çakışan kaydı döner."""
+    found = overlapping(cursor, personel_id, start, end, statuses=ACTIVE_STATUSES)
+    return found[0] if found else None
+
+
+def covers(cursor, personel_id, day):
+    """Gün herhangi bir izin kaydının kapsamında mı?"""
+    return bool(overlapping(cursor, personel_id, day, day))
+
+
+def approved_leaves(cursor, personel_id, start, end, index=None):
+    """Bordro hesabı için dönemle kesişen onaylı izinler ({'bas', 'bit', 'ucretli'})."""
+    return [
+        {'bas': l.bas, 'bit': l.bit, 'ucretli': l.ucretli}
+        for l in overlapping(cursor, personel_id, start, end, statuses=('Onaylandi',), index=index)
+    ]
+
+
+def invalidate(personel_ids):
+    with _lock:
+        for pid in personel_ids:
+            if pid:
+                _entries.pop(int(pid), None)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,245 @@
+"""Prometheus metin formatında uygulama metrikleri.
+
+Sayaçlar ve histogramlar thread başına ayrı sözlüklerde (shard) tutulur; yazma
+yolunda kilit alınmaz. Kilit yalnızca yeni bir thread ilk kez metrik yazdığında
+ve /metrics okunurken shard listesi üzerinde kullanılır.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (tip, açıklama)
+_meta = {}
+_buckets = {}
+# name -> (açıklama, fonksiyon); okuma anında hesaplanan göstergeler
+_gauge_callbacks = {}
+
+_local = threading.local()
+_shards = []  # [(thread, {key: değer})]
+_retired = {}  # biten thread'lerin birleştirilmiş değerleri
+_shards_lock = threading.Lock()
+
+# Ayarlanırsa /metrics yalnızca `Authorization: Bearer <token>` ile okunabilir
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+
+def _describe(name, kind, help_text, buckets=None):
+    _meta.setdefault(name, (kind, help_text))
+    if buckets is not None:
+        _buckets.setdefault(name, tuple(buckets))
+
+
+def _merge_into(target, shard):
+    for key, value in list(shard.items()):
+        if isinstance(value, list):
+            current = target.get(key)
+            if current is None:
+                target[key] = list(value)
+            else:
+                for i, v in enumerate(value):
+                    current[i] += v
+        else:
+            target[key] = target.get(key, 0) + value
+
+
+def _retire_dead_shards():
+    # _shards_lock tutulurken çağrılır. İstek başına thread açan sunucularda
+    # listenin büyümemesi için biten thread'lerin değerleri tek sözlükte toplanır.
+    alive = []
+    for thread, shard in _shards:
+        if thread.is_alive():
+            alive.append((thread, shard))
+        else:
+            _merge_into(_retired, shard)
+    _shards[:] = alive
+
+
+def _shard():
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = {}
+        with _shards_lock:
+            if len(_shards) >= 64:
+                _retire_dead_shards()
+            _shards.append((threading.current_thread(), shard))
+    return shard
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())) if labels else ())
+
+
+def inc(name, value=1, help_text='', **labels):
+    """Sayaç artırır (gauge olarak kullanıldığında negatif değer de verilebilir)."""
+    _describe(name, 'counter', help_text)
+    shard = _shard()
+    key = _key(name, labels)
+    shard[key] = shard.get(key, 0) + value
+
+
+def gauge_add(name, value, help_text='', **labels):
+    _describe(name, 'gauge', help_text)
+    shard = _shard()
+    key = _key(name, labels)
+    shard[key] = shard.get(key, 0) + value
+
+
+def observe(name, value, help_text='', buckets=DEFAULT_BUCKETS, **labels):
+    """Histograma bir gözlem ekler. Değer listesi: [kova sayıları..., toplam, adet]."""
+    _describe(name, 'histogram', help_text, buckets)
+    bounds = _buckets[name]
+    shard = _shard()
+    key = _key(name, labels)
+    data = shard.get(key)
+    if data is None:
+        data = shard[key] = [0] * (len(bounds) + 2)
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            data[i] += 1
+            break
+    data[-2] += value
+    data[-1] += 1
+
+
+def register_gauge(name, help_text, fn):
+    """Okuma anında `fn()` çağrılır; sayı ya da {etiket sözlüğü tuple'ı: değer} dönebilir."""
+    _gauge_callbacks[name] = (help_text, fn)
+
+
+def record_cache(cache, hit):
+    inc('hr_cache_requests_total', help_text='Önbellek erişimleri', cache=cache, result='hit' if hit else 'miss')
+
+
+@contextmanager
+def track_inflight(name, help_text='', **labels):
+    """Blok süresince `<name>_in_progress` göstergesini artırır, süreyi `<name>_seconds` histogramına yazar."""
+    gauge_add(f'{name}_in_progress', 1, help_text, **labels)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        gauge_add(f'{name}_in_progress', -1, help_text, **labels)
+        observe(f'{name}_seconds', time.perf_counter() - started, help_text, **labels)
+
+
+def _collect():
+    with _shards_lock:
+        _retire_dead_shards()
+        total = {}
+        _merge_into(total, _retired)
+        for _, shard in _shards:
+            _merge_into(total, shard)
+    return total
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + (list(extra) if extra else [])
+    if not items:
+        return ''
+    parts = []
+    for k, v in items:
+        v = str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{k}="{v}"')
+    return '{' + ','.join(parts) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value) if value != int(value) else str(int(value))
+    return str(value)
+
+
+def render():
+    total = _collect()
+    by_name = {}
+    for (name, labels), value in total.items():
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name in sorted(by_name):
+        kind, help_text = _meta.get(name, ('untyped', ''))
+        if help_text:
+            lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(by_name[name]):
+            if kind == 'histogram':
+                cumulative = 0
+                for bound, count in zip(_buckets[name], value):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {value[-1]}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value[-2])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {value[-1]}')
+            else:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    hits = {}
+    for (name, labels), value in total.items():
+        if name == 'hr_cache_requests_total':
+            d = dict(labels)
+            entry = hits.setdefault(d['cache'], [0, 0])
+            entry[0 if d['result'] == 'hit' else 1] += value
+    if hits:
+        lines.append('# HELP hr_cache_hit_ratio Önbellek isabet oranı')
+        lines.append('# TYPE hr_cache_hit_ratio gauge')
+        for cache, (hit, miss) in sorted(hits.items()):
+            ratio = hit / (hit + miss) if hit + miss else 0
+            lines.append(f'hr_cache_hit_ratio{_format_labels([("cache", cache)])} {ratio:.4f}')
+
+    for name, (help_text, fn) in sorted(_gauge_callbacks.items()):
+        try:
+            value = fn()
+        except Exception as e:
+            print(f'Metrik okunamadı ({name}): {e}')
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        if isinstance(value, dict):
+            for labels, v in sorted(value.items()):
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(v)}')
+        else:
+            lines.append(f'{name} {_format_value(value)}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def init_metrics(app):
+    """Tüm route'lara süre/durum metriklerini ekler ve /metrics uç noktasını açar."""
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_started = time.perf_counter()
+        g._metrics_endpoint = request.endpoint or 'unmatched'
+        gauge_add('hr_http_requests_in_progress', 1, 'İşlenmekte olan istekler', endpoint=g._metrics_endpoint)
+
+    @app.after_request
+    def _metrics_record(response):
+        started = g.get('_metrics_started')
+        if started is not None:
+            endpoint = g._metrics_endpoint
+            observe(
+                'hr_http_request_duration_seconds', time.perf_counter() - started,
+                'İstek süresi', endpoint=endpoint, method=request.method,
+            )
+            inc('hr_http_requests_total', help_text='Durum koduna göre istekler',
+                endpoint=endpoint, method=request.method, status=response.status_code)
+        return response
+
+    @app.teardown_request
+    def _metrics_done(exc):
+        endpoint = g.pop('_metrics_endpoint', None)
+        if endpoint is not None:
+            gauge_add('hr_http_requests_in_progress', -1, 'İşlenmekte olan istekler', endpoint=endpoint)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+            return Response('yetkisiz\n', status=401, mimetype='text/plain')
+        return Response(render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    return app
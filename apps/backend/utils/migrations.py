@@ -0,0 +1,515 @@
+"""Sürümlü şema göçleri.
+
+Her göç bir kez çalışır ve `schema_version` tablosuna kaydedilir. MySQL'de DDL
+ifadeleri örtük commit yaptığı için göçler tekrar çalıştırılabilir şekilde
+yazılır (IF NOT EXISTS, kolon/indeks varlık kontrolü); yarıda kesilen bir göç
+sonraki çalıştırmada güvenle tamamlanır.
+
+    flask --app app migrate            # bekleyen göçleri uygula
+    flask --app app migrate --status   # uygulanmış/bekleyen göçleri listele
+"""
+from utils.db import get_connection
+
+MIGRATION_LOCK = 'hr_schema_migrate'
+
+BASE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS Departman (
+        departman_id INT AUTO_INCREMENT PRIMARY KEY,
+        departman_adi VARCHAR(255) NOT NULL,
+        aciklama TEXT,
+        olusturma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Personel (
+        personel_id INT AUTO_INCREMENT PRIMARY KEY,
+        tc_kimlik_no VARCHAR(20) UNIQUE NOT NULL,
+        ad VARCHAR(100) NOT NULL,
+        soyad VARCHAR(100) NOT NULL,
+        dogum_tarihi DATE NOT NULL,
+        telefon VARCHAR(20),
+        email VARCHAR(255),
+        adres TEXT,
+        ise_giris_tarihi DATE NOT NULL,
+        departman_id INT,
+        aktif_mi TINYINT DEFAULT 1,
+        FOREIGN KEY (departman_id) REFERENCES Departman(departman_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Kullanici (
+        kullanici_id INT AUTO_INCREMENT PRIMARY KEY,
+        kullanici_adi VARCHAR(100) UNIQUE NOT NULL,
+        sifre_hash VARCHAR(255) NOT NULL,
+        email VARCHAR(255),
+        rol VARCHAR(50) NOT NULL DEFAULT 'employee',
+        personel_id INT,
+        ilk_giris TINYINT DEFAULT 1,
+        aktif_mi TINYINT DEFAULT 1,
+        olusturma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        son_giris DATETIME,
+        FOREIGN KEY (personel_id) REFERENCES Personel(personel_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Pozisyon (
+        pozisyon_id INT AUTO_INCREMENT PRIMARY KEY,
+        pozisyon_adi VARCHAR(255) NOT NULL,
+        taban_maas DECIMAL(12, 2) NOT NULL,
+        departman_id INT,
+        FOREIGN KEY (departman_id) REFERENCES Departman(departman_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Personel_Pozisyon (
+        personel_pozisyon_id INT AUTO_INCREMENT PRIMARY KEY,
+        personel_id INT NOT NULL,
+        pozisyon_id INT NOT NULL,
+        baslangic_tarihi DATE NOT NULL,
+        bitis_tarihi DATE,
+        guncel_mi TINYINT DEFAULT 1,
+        FOREIGN KEY (personel_id) REFERENCES Personel(personel_id),
+        FOREIGN KEY (pozisyon_id) REFERENCES Pozisyon(pozisyon_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Devam (
+        devam_id INT AUTO_INCREMENT PRIMARY KEY,
+        personel_id INT NOT NULL,
+        tarih DATE NOT NULL,
+        giris_saati TIME,
+        cikis_saati TIME,
+        durum VARCHAR(50) DEFAULT 'Normal',
+        ek_mesai_saat DECIMAL(8, 2) DEFAULT 0,
+        aciklama TEXT,
+        FOREIGN KEY (personel_id) REFERENCES Personel(personel_id),
+        UNIQUE KEY unique_personel_tarih (personel_id, tarih)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Izin_Turu (
+        izin_turu_id INT AUTO_INCREMENT PRIMARY KEY,
+        izin_adi VARCHAR(255) NOT NULL,
+        yillik_hak_gun INT DEFAULT 0,
+        ucretli_mi TINYINT DEFAULT 1
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Izin_Kayit (
+        izin_kayit_id INT AUTO_INCREMENT PRIMARY KEY,
+        personel_id INT NOT NULL,
+        izin_turu_id INT NOT NULL,
+        baslangic_tarihi DATE NOT NULL,
+        bitis_tarihi DATE NOT NULL,
+        gun_sayisi INT NOT NULL,
+        onay_durumu VARCHAR(50) DEFAULT 'Beklemede',
+        FOREIGN KEY (personel_id) REFERENCES Personel(personel_id),
+        FOREIGN KEY (izin_turu_id) REFERENCES Izin_Turu(izin_turu_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Maas_Bileseni (
+        bilesen_id INT AUTO_INCREMENT PRIMARY KEY,
+        bilesen_adi VARCHAR(255) NOT NULL,
+        bilesen_tipi VARCHAR(100) NOT NULL,
+        sabit_mi TINYINT DEFAULT 0,
+        varsayilan_tutar DECIMAL(12, 2) DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Maas_Hesap (
+        maas_hesap_id INT AUTO_INCREMENT PRIMARY KEY,
+        personel_id INT NOT NULL,
+        donem_yil INT NOT NULL,
+        donem_ay INT NOT NULL,
+        brut_maas DECIMAL(12, 2) NOT NULL,
+        toplam_ekleme DECIMAL(12, 2) DEFAULT 0,
+        toplam_kesinti DECIMAL(12, 2) DEFAULT 0,
+        net_maas DECIMAL(12, 2) NOT NULL,
+        odeme_tarihi DATE,
+        odendi_mi TINYINT DEFAULT 0,
+        FOREIGN KEY (personel_id) REFERENCES Personel(personel_id),
+        UNIQUE KEY unique_personel_donem (personel_id, donem_yil, donem_ay)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Maas_Detay (
+        maas_detay_id INT AUTO_INCREMENT PRIMARY KEY,
+        maas_hesap_id INT NOT NULL,
+        bilesen_id INT NOT NULL,
+        tutar DECIMAL(12, 2) NOT NULL,
+        FOREIGN KEY (maas_hesap_id) REFERENCES Maas_Hesap(maas_hesap_id),
+        FOREIGN KEY (bilesen_id) REFERENCES Maas_Bileseni(bilesen_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Bordro_Degisiklik (
+        personel_id INT NOT NULL,
+        donem_yil INT NOT NULL,
+        donem_ay INT NOT NULL,
+        sebep VARCHAR(100),
+        degisiklik_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (personel_id, donem_yil, donem_ay),
+        FOREIGN KEY (personel_id) REFERENCES Personel(personel_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Bordro_Is (
+        is_id INT AUTO_INCREMENT PRIMARY KEY,
+        baslangic_yil INT NOT NULL,
+        baslangic_ay INT NOT NULL,
+        bitis_yil INT NOT NULL,
+        bitis_ay INT NOT NULL,
+        departman_id INT NULL,
+        incremental TINYINT DEFAULT 0,
+        durum VARCHAR(20) DEFAULT 'Beklemede',
+        son_yil INT NULL,
+        son_ay INT NULL,
+        islenen_personel INT DEFAULT 0,
+        hata TEXT,
+        olusturma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (departman_id) REFERENCES Departman(departman_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Duyuru (
+        duyuru_id INT AUTO_INCREMENT PRIMARY KEY,
+        baslik VARCHAR(255) NOT NULL,
+        icerik TEXT NOT NULL,
+        olusturan_kullanici_id INT NOT NULL,
+        yayin_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
+        bitis_tarihi DATETIME NULL,
+        oncelik VARCHAR(20) DEFAULT 'Normal',
+        aktif_mi TINYINT DEFAULT 1,
+        FOREIGN KEY (olusturan_kullanici_id) REFERENCES Kullanici(kullanici_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Adaylar (
+        aday_id INT AUTO_INCREMENT PRIMARY KEY,
+        ad VARCHAR(100) NOT NULL,
+        soyad VARCHAR(100) NOT NULL,
+        telefon VARCHAR(20),
+        email VARCHAR(255),
+        pozisyon_id INT NOT NULL,
+        basvuru_tarihi DATE NOT NULL,
+        gorusme_tarihi DATE NULL,
+        durum VARCHAR(50) DEFAULT 'Basvuru Alindi',
+        aciklama TEXT,
+        FOREIGN KEY (pozisyon_id) REFERENCES Pozisyon(pozisyon_id)
+    )
+    """,
+]
+
+
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT COUNT(*) AS cnt FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column))
+    return cursor.fetchone()['cnt'] > 0
+
+
+def index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT COUNT(*) AS cnt FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """, (table, index))
+    return cursor.fetchone()['cnt'] > 0
+
+
+def add_column(cursor, table, column, definition):
+    if not column_exists(cursor, table, column):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def add_index(cursor, table, index, columns):
+    if not index_exists(cursor, table, index):
+        cursor.execute(f"CREATE INDEX {index} ON {table} ({columns})")
+
+
+def m0001_base_schema(cursor):
+    for ddl in BASE_TABLES:
+        cursor.execute(ddl)
+
+
+def m0002_devam_ek_mesai(cursor):
+    # Eski kurulumlarda Devam.ek_mesai_saat kolonu bulunmayabilir
+    add_column(cursor, 'Devam', 'ek_mesai_saat', 'DECIMAL(8, 2) DEFAULT 0')
+
+
+def m0003_personel_pozisyon_kidem(cursor):
+    # database.sql'de olan ama init_db ile kurulan veritabanlarında eksik kalan kolonlar
+    add_column(cursor, 'Personel_Pozisyon', 'kidem_seviyesi', 'TINYINT DEFAULT 3')
+    add_column(cursor, 'Personel_Pozisyon', 'ozel_taban_maas', 'DECIMAL(12, 2) DEFAULT NULL')
+
+
+def m0004_hot_path_indexes(cursor):
+    add_index(cursor, 'Izin_Kayit', 'idx_izin_personel_durum_tarih', 'personel_id, onay_durumu, baslangic_tarihi')
+    add_index(cursor, 'Personel', 'idx_personel_aktif_departman', 'aktif_mi, departman_id')
+    add_index(cursor, 'Personel_Pozisyon', 'idx_pp_personel_guncel', 'personel_id, guncel_mi')
+    add_index(cursor, 'Duyuru', 'idx_duyuru_aktif_yayin', 'aktif_mi, yayin_tarihi')
+    add_index(cursor, 'Adaylar', 'idx_aday_basvuru', 'basvuru_tarihi')
+
+
+ARCHIVE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS Personel_Archive (
+        archive_id INT AUTO_INCREMENT PRIMARY KEY,
+        personel_id INT NOT NULL,
+        tc_kimlik_no VARCHAR(20),
+        ad VARCHAR(100),
+        soyad VARCHAR(100),
+        dogum_tarihi DATE,
+        telefon VARCHAR(20),
+        email VARCHAR(255),
+        adres TEXT,
+        ise_giris_tarihi DATE,
+        cikis_tarihi DATE,
+        departman_id INT,
+        aktif_mi TINYINT,
+        arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
+        arsiv_sebebi VARCHAR(255)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Maas_Hesap_Archive (
+        archive_id INT AUTO_INCREMENT PRIMARY KEY,
+        maas_hesap_id INT NOT NULL,
+        personel_id INT NOT NULL,
+        donem_yil INT NOT NULL,
+        donem_ay INT NOT NULL,
+        brut_maas DECIMAL(12, 2) NOT NULL,
+        toplam_ekleme DECIMAL(12, 2) DEFAULT 0,
+        toplam_kesinti DECIMAL(12, 2) DEFAULT 0,
+        net_maas DECIMAL(12, 2) NOT NULL,
+        odeme_tarihi DATE,
+        odendi_mi TINYINT,
+        arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
+        arsiv_sebebi VARCHAR(255)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Maas_Detay_Archive (
+        archive_id INT AUTO_INCREMENT PRIMARY KEY,
+        maas_detay_id INT NOT NULL,
+        maas_hesap_id INT NOT NULL,
+        bilesen_id INT NOT NULL,
+        tutar DECIMAL(12, 2) NOT NULL,
+        arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Izin_Kayit_Archive (
+        archive_id INT AUTO_INCREMENT PRIMARY KEY,
+        izin_kayit_id INT NOT NULL,
+        personel_id INT NOT NULL,
+        izin_turu_id INT NOT NULL,
+        baslangic_tarihi DATE NOT NULL,
+        bitis_tarihi DATE NOT NULL,
+        gun_sayisi INT NOT NULL,
+        onay_durumu VARCHAR(50),
+        arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
+        arsiv_sebebi VARCHAR(255)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Devam_Archive (
+        archive_id INT AUTO_INCREMENT PRIMARY KEY,
+        devam_id INT NOT NULL,
+        personel_id INT NOT NULL,
+        tarih DATE NOT NULL,
+        giris_saati TIME,
+        cikis_saati TIME,
+        durum VARCHAR(50),
+        ek_mesai_saat DECIMAL(8, 2) DEFAULT 0,
+        aciklama TEXT,
+        arsiv_tarihi DATETIME DEFAULT CURRENT_TIMESTAMP,
+        arsiv_sebebi VARCHAR(255)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS Arsiv_Durum (
+        hedef VARCHAR(50) PRIMARY KEY,
+        kesim_degeri VARCHAR(20) NOT NULL,
+        son_id INT DEFAULT 0,
+        tasinan INT DEFAULT 0,
+        durum VARCHAR(20) DEFAULT 'Calisiyor',
+        guncelleme_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+    """,
+]
+
+
+def drop_foreign_keys(cursor, table, referenced=None):
+    sql = """
+        SELECT constraint_name FROM information_schema.referential_constraints
+        WHERE constraint_schema = DATABASE() AND table_name = %s
+    """
+    params = [table]
+    if referenced:
+        sql += " AND referenced_table_name = %s"
+        params.append(referenced)
+    cursor.execute(sql, params)
+    for row in cursor.fetchall():
+        cursor.execute(f"ALTER TABLE {table} DROP FOREIGN KEY {row['constraint_name']}")
+
+
+def m0005_archive_tables(cursor):
+    # database.sql'deki arşiv tabloları kaynak satırlara FK ile bağlıydı; bu
+    # yüzden arşivlenen satır ana tablodan silinemiyordu. FK'lar kaldırılır.
+    for ddl in ARCHIVE_TABLES:
+        cursor.execute(ddl)
+    for table in ('Personel_Archive', 'Maas_Hesap_Archive', 'Maas_Detay_Archive', 'Izin_Kayit_Archive', 'Devam_Archive'):
+        drop_foreign_keys(cursor, table)
+    add_column(cursor, 'Devam_Archive', 'ek_mesai_saat', 'DECIMAL(8, 2) DEFAULT 0')
+    add_index(cursor, 'Devam_Archive', 'idx_devam_arsiv_personel_tarih', 'personel_id, tarih')
+    add_index(cursor, 'Devam_Archive', 'idx_devam_arsiv_tarih', 'tarih')
+    add_index(cursor, 'Maas_Hesap_Archive', 'idx_maas_arsiv_personel_donem', 'personel_id, donem_yil, donem_ay')
+    add_index(cursor, 'Maas_Detay_Archive', 'idx_detay_arsiv_hesap', 'maas_hesap_id')
+    add_index(cursor, 'Izin_Kayit_Archive', 'idx_izin_arsiv_personel', 'personel_id, baslangic_tarihi')
+    add_index(cursor, 'Personel_Archive', 'idx_personel_arsiv_personel', 'personel_id')
+
+
+def m0006_izin_bakiye(cursor):
+    # Göç metni donmuştur; utils/leave_balance.py'deki sonraki değişiklikler bu göçü değiştirmez
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Izin_Bakiye (
+            personel_id INT NOT NULL,
+            yil INT NOT NULL,
+            izin_turu_id INT NOT NULL,
+            kullanilan_gun INT NOT NULL DEFAULT 0,
+            bekleyen_gun INT NOT NULL DEFAULT 0,
+            guncelleme_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            PRIMARY KEY (personel_id, yil, izin_turu_id),
+            FOREIGN KEY (personel_id) REFERENCES Personel(personel_id)
+        )
+    """)
+    cursor.execute("DELETE FROM Izin_Bakiye")
+    cursor.execute("""
+        INSERT INTO Izin_Bakiye (personel_id, yil, izin_turu_id, kullanilan_gun, bekleyen_gun)
+        SELECT k.personel_id, YEAR(k.baslangic_tarihi), k.izin_turu_id,
+               SUM(CASE WHEN k.onay_durumu = 'Onaylandi' THEN k.gun_sayisi ELSE 0 END),
+               SUM(CASE WHEN k.onay_durumu = 'Beklemede' THEN k.gun_sayisi ELSE 0 END)
+        FROM (
+            SELECT personel_id, izin_turu_id, baslangic_tarihi, gun_sayisi, onay_durumu FROM Izin_Kayit
+            UNION ALL
+            SELECT personel_id, izin_turu_id, baslangic_tarihi, gun_sayisi, onay_durumu FROM Izin_Kayit_Archive
+        ) k
+        WHERE k.onay_durumu IN ('Beklemede', 'Onaylandi')
+        GROUP BY k.personel_id, YEAR(k.baslangic_tarihi), k.izin_turu_id
+    """)
+
+
+def m0007_leave_list_indexes(cursor):
+    # /leaves keyset sayfalaması (baslangic_tarihi, izin_kayit_id) sırasıyla okur
+    add_index(cursor, 'Izin_Kayit', 'idx_izin_tarih', 'baslangic_tarihi')
+    add_index(cursor, 'Izin_Kayit', 'idx_izin_durum_tarih', 'onay_durumu, baslangic_tarihi')
+    add_index(cursor, 'Izin_Kayit', 'idx_izin_personel_tarih', 'personel_id, baslangic_tarihi')
+
+
+def m0008_duyuru_bitis_index(cursor):
+    # Süresi dolan duyuruları pasifleştiren süpürücü için
+    add_index(cursor, 'Duyuru', 'idx_duyuru_aktif_bitis', 'aktif_mi, bitis_tarihi')
+
+
+def m0009_aday_email_index(cursor):
+    # Başvuru yazıcısının toplu tekrar kontrolü için
+    add_index(cursor, 'Adaylar', 'idx_aday_email_pozisyon', 'email, pozisyon_id')
+
+
+def m0010_aday_sayac(cursor):
+    # Göç metni donmuştur; utils/candidate_counts.py'deki sonraki değişiklikler bu göçü değiştirmez
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Aday_Durum_Sayac (
+            durum VARCHAR(50) NOT NULL PRIMARY KEY,
+            adet INT NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("DELETE FROM Aday_Durum_Sayac")
+    cursor.execute("""
+        INSERT INTO Aday_Durum_Sayac (durum, adet)
+        SELECT COALESCE(durum, 'Basvuru Alindi'), COUNT(*) FROM Adaylar GROUP BY COALESCE(durum, 'Basvuru Alindi')
+    """)
+    # Aday listesi filtreleri ve ad/soyad önek araması için
+    add_index(cursor, 'Adaylar', 'idx_aday_durum_basvuru', 'durum, basvuru_tarihi')
+    add_index(cursor, 'Adaylar', 'idx_aday_pozisyon_basvuru', 'pozisyon_id, basvuru_tarihi')
+    add_index(cursor, 'Adaylar', 'idx_aday_ad', 'ad')
+    add_index(cursor, 'Adaylar', 'idx_aday_soyad', 'soyad')
+
+
+MIGRATIONS = [
+    (1, 'base_schema', m0001_base_schema),
+    (2, 'devam_ek_mesai', m0002_devam_ek_mesai),
+    (3, 'personel_pozisyon_kidem', m0003_personel_pozisyon_kidem),
+    (4, 'hot_path_indexes', m0004_hot_path_indexes),
+    (5, 'archive_tables', m0005_archive_tables),
+    (6, 'izin_bakiye', m0006_izin_bakiye),
+    (7, 'leave_list_indexes', m0007_leave_list_indexes),
+    (8, 'duyuru_bitis_index', m0008_duyuru_bitis_index),
+    (9, 'aday_email_index', m0009_aday_email_index),
+    (10, 'aday_sayac', m0010_aday_sayac),
+]
+
+
+def _ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            ad VARCHAR(100) NOT NULL,
+            uygulanma_tarihi TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    _ensure_version_table(cursor)
+    cursor.execute("SELECT version FROM schema_version")
+    return {r['version'] for r in cursor.fetchall()}
+
+
+def migration_status():
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        applied = applied_versions(cursor)
+        return [
+            {'version': version, 'ad': name, 'uygulandi': version in applied}
+            for version, name, _ in MIGRATIONS
+        ]
+    finally:
+        conn.close()
+
+
+def migrate(target=None, log=print):
+    """Bekleyen göçleri sırayla uygular; uygulanan sürüm numaralarını döner.
+
+    Aynı anda başlayan birden fazla worker'ın göçleri çift çalıştırmaması için
+    MySQL GET_LOCK ile süreçler arası kilit alınır.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    applied_now = []
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 300) AS kilit", (MIGRATION_LOCK,))
+        if not cursor.fetchone()['kilit']:
+            raise RuntimeError('Göç kilidi alınamadı')
+        try:
+            applied = applied_versions(cursor)
+            for version, name, fn in MIGRATIONS:
+                if version in applied or (target is not None and version > target):
+                    continue
+                log(f'Göç uygulanıyor: {version:04d}_{name}')
+                fn(cursor)
+                cursor.execute("INSERT INTO schema_version (version, ad) VALUES (%s, %s)", (version, name))
+                conn.commit()
+                applied_now.append(version)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return applied_now
@@ -0,0 +1,224 @@
+"""Devam (aylık, tarih) ve Maas_Hesap (yıllık, donem_yil) için range partition.
+
+MySQL'de partition'lı tablolar yabancı anahtar içeremez ve bunlara yabancı
+anahtarla başvurulamaz; ayrıca her benzersiz anahtar partition kolonunu
+içermelidir. Bu yüzden dönüşüm isteğe bağlıdır ve açıkça çalıştırılır:
+
+    flask --app app partition convert                 # tabloları dönüştür
+    flask --app app partition maintain --ahead 3 --retain-years 2 --archive
+
+Eski partition'lar yalnızca `--archive` (arşive kopyalayıp düşür) ya da
+`--force` (arşivsiz kalıcı sil) ile düşürülür. Ödenmemiş bordro içeren
+Maas_Hesap partition'ları hiçbir durumda düşürülmez.
+
+Dönüşümde Devam ve Maas_Hesap'ın Personel FK'ları ile Maas_Detay'ın
+Maas_Hesap FK'sı kaldırılır. Birincil anahtarlar (devam_id, tarih) ve
+(maas_hesap_id, donem_yil) olur; ay kapsamlı sorgular (tarih BETWEEN ...,
+donem_yil = ...) tek partition'a budanır.
+"""
+import datetime
+
+from utils.db import get_connection
+from utils.migrations import drop_foreign_keys
+
+MAX_PARTITION = 'pmax'
+
+
+def _month_start(d):
+    return d.replace(day=1)
+
+
+def _add_months(d, n):
+    total = d.year * 12 + d.month - 1 + n
+    return datetime.date(total // 12, total % 12 + 1, 1)
+
+
+def _devam_partition(month):
+    nxt = _add_months(month, 1)
+    return f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{nxt.isoformat()}')"
+
+
+def _maas_partition(year):
+    return f"PARTITION p{year} VALUES LESS THAN ({year + 1})"
+
+
+def partitions(cursor, table):
+    """[(ad, üst sınır ifadesi)] — partition'lı değilse boş liste."""
+    cursor.execute("""
+        SELECT partition_name, partition_description
+        FROM information_schema.partitions
+        WHERE table_schema = DATABASE() AND table_name = %s AND partition_name IS NOT NULL
+        ORDER BY partition_ordinal_position
+    """, (table,))
+    return [(r['partition_name'], r['partition_description']) for r in cursor.fetchall()]
+
+
+def convert_devam(cursor, ahead=3, today=None):
+    if partitions(cursor, 'Devam'):
+        return False
+    today = today or datetime.date.today()
+    cursor.execute("SELECT MIN(tarih) AS ilk FROM Devam")
+    first = (cursor.fetchone() or {}).get('ilk') or today
+    month, last = _month_start(first), _add_months(_month_start(today), ahead)
+
+    parts = []
+    while month <= last:
+        parts.append(_devam_partition(month))
+        month = _add_months(month, 1)
+    parts.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+
+    drop_foreign_keys(cursor, 'Devam')
+    cursor.execute("ALTER TABLE Devam DROP PRIMARY KEY, ADD PRIMARY KEY (devam_id, tarih)")
+    cursor.execute(f"ALTER TABLE Devam PARTITION BY RANGE COLUMNS(tarih) ({', '.join(parts)})")
+    return True
+
+
+def convert_maas(cursor, ahead=1, today=None):
+    if partitions(cursor, 'Maas_Hesap'):
+        return False
+    today = today or datetime.date.today()
+    cursor.execute("SELECT MIN(donem_yil) AS ilk FROM Maas_Hesap")
+    first = (cursor.fetchone() or {}).get('ilk') or today.year
+
+    parts = [_maas_partition(y) for y in range(int(first), today.year + ahead + 1)]
+    parts.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN MAXVALUE")
+
+    drop_foreign_keys(cursor, 'Maas_Detay', referenced='Maas_Hesap')
+    drop_foreign_keys(cursor, 'Maas_Hesap')
+    cursor.execute("ALTER TABLE Maas_Hesap DROP PRIMARY KEY, ADD PRIMARY KEY (maas_hesap_id, donem_yil)")
+    cursor.execute(f"ALTER TABLE Maas_Hesap PARTITION BY RANGE (donem_yil) ({', '.join(parts)})")
+    return True
+
+
+def _add_future(cursor, table, existing, wanted):
+    """pmax'ı bölerek eksik gelecek partition'ları ekler."""
+    names = {name for name, _ in existing}
+    missing = [(name, ddl) for name, ddl in wanted if name not in names]
+    if not missing:
+        return []
+    tail = "VALUES LESS THAN (MAXVALUE)" if table == 'Devam' else "VALUES LESS THAN MAXVALUE"
+    ddl = ', '.join(d for _, d in missing) + f", PARTITION {MAX_PARTITION} {tail}"
+    cursor.execute(f"ALTER TABLE {table} REORGANIZE PARTITION {MAX_PARTITION} INTO ({ddl})")
+    return [name for name, _ in missing]
+
+
+# Kopyalama NOT EXISTS ile tekrarlanabilir: DROP başarısız olup komut yeniden
+# çalıştırılırsa zaten arşivlenmiş satırlar ikinci kez yazılmaz.
+def _archive_devam_partition(cursor, name):
+    cursor.execute(f"""
+        INSERT INTO Devam_Archive (devam_id, personel_id, tarih, giris_saati, cikis_saati, durum, ek_mesai_saat, aciklama, arsiv_sebebi)
+        SELECT d.devam_id, d.personel_id, d.tarih, d.giris_saati, d.cikis_saati, d.durum, d.ek_mesai_saat, d.aciklama, 'partition {name}'
+        FROM Devam PARTITION ({name}) d
+        WHERE NOT EXISTS (
+            SELECT 1 FROM Devam_Archive a
+            WHERE a.personel_id = d.personel_id AND a.tarih = d.tarih AND a.devam_id = d.devam_id
+        )
+    """)
+
+
+def _archive_maas_partition(cursor, name):
+    cursor.execute(f"""
+        INSERT INTO Maas_Detay_Archive (maas_detay_id, maas_hesap_id, bilesen_id, tutar)
+        SELECT md.maas_detay_id, md.maas_hesap_id, md.bilesen_id, md.tutar
+        FROM Maas_Detay md JOIN Maas_Hesap PARTITION ({name}) mh ON md.maas_hesap_id = mh.maas_hesap_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM Maas_Detay_Archive a
+            WHERE a.maas_hesap_id = md.maas_hesap_id AND a.maas_detay_id = md.maas_detay_id
+        )
+    """)
+    cursor.execute(f"""
+        INSERT INTO Maas_Hesap_Archive (maas_hesap_id, personel_id, donem_yil, donem_ay, brut_maas, toplam_ekleme,
+                                        toplam_kesinti, net_maas, odeme_tarihi, odendi_mi, arsiv_sebebi)
+        SELECT mh.maas_hesap_id, mh.personel_id, mh.donem_yil, mh.donem_ay, mh.brut_maas, mh.toplam_ekleme,
+               mh.toplam_kesinti, mh.net_maas, mh.odeme_tarihi, mh.odendi_mi, 'partition {name}'
+        FROM Maas_Hesap PARTITION ({name}) mh
+        WHERE NOT EXISTS (
+            SELECT 1 FROM Maas_Hesap_Archive a
+            WHERE a.personel_id = mh.personel_id AND a.donem_yil = mh.donem_yil
+              AND a.donem_ay = mh.donem_ay AND a.maas_hesap_id = mh.maas_hesap_id
+        )
+    """)
+
+
+def _unpaid_count(cursor, name):
+    cursor.execute(f"SELECT COUNT(*) AS adet FROM Maas_Hesap PARTITION ({name}) WHERE odendi_mi = 0")
+    return int((cursor.fetchone() or {}).get('adet') or 0)
+
+
+def maintain(ahead_months=3, ahead_years=1, retain_years=None, archive=False, force=False, today=None, log=print):
+    """Gelecek partition'ları önceden oluşturur; istenirse eski olanları arşivleyip düşürür.
+
+    `retain_years` verildiğinde `archive` ya da `force` zorunludur; `force`
+    ile arşivsiz düşürülen partition'lar kalıcı olarak silinir. Arşiv
+    tablolarının yapısı farklı olduğu için EXCHANGE PARTITION yerine
+    kopyala + DROP PARTITION kullanılır.
+    """
+    if retain_years is not None and not (archive or force):
+        raise ValueError("Eski partition'ları düşürmek için archive ya da force gerekli")
+    today = today or datetime.date.today()
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        devam = partitions(cursor, 'Devam')
+        if devam:
+            month = _month_start(today)
+            wanted = []
+            for i in range(ahead_months + 1):
+                m = _add_months(month, i)
+                wanted.append((f'p{m:%Y%m}', _devam_partition(m)))
+            for name in _add_future(cursor, 'Devam', devam, wanted):
+                log(f'Devam: {name} eklendi')
+
+        maas = partitions(cursor, 'Maas_Hesap')
+        if maas:
+            wanted = [(f'p{y}', _maas_partition(y)) for y in range(today.year, today.year + ahead_years + 1)]
+            for name in _add_future(cursor, 'Maas_Hesap', maas, wanted):
+                log(f'Maas_Hesap: {name} eklendi')
+
+        if retain_years is not None:
+            cutoff = today.replace(year=today.year - retain_years, month=1, day=1)
+            for name, _ in devam:
+                if name != MAX_PARTITION and name[1:] < f'{cutoff:%Y%m}':
+                    if archive:
+                        _archive_devam_partition(cursor, name)
+                        conn.commit()
+                    cursor.execute(f"ALTER TABLE Devam DROP PARTITION {name}")
+                    log(f'Devam: {name} {"arşivlendi" if archive else "silindi"}')
+            for name, _ in maas:
+                if name != MAX_PARTITION and int(name[1:]) < cutoff.year:
+                    unpaid = _unpaid_count(cursor, name)
+                    if unpaid:
+                        log(f'Maas_Hesap: {name} atlandı ({unpaid} ödenmemiş bordro)')
+                        continue
+                    if archive:
+                        _archive_maas_partition(cursor, name)
+                    cursor.execute(f"""
+                        DELETE md FROM Maas_Detay md
+                        JOIN Maas_Hesap PARTITION ({name}) mh ON md.maas_hesap_id = mh.maas_hesap_id
+                    """)
+                    conn.commit()
+                    cursor.execute(f"ALTER TABLE Maas_Hesap DROP PARTITION {name}")
+                    log(f'Maas_Hesap: {name} {"arşivlendi" if archive else "silindi"}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def convert(ahead_months=3, ahead_years=1, log=print):
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        if convert_devam(cursor, ahead=ahead_months):
+            log('Devam aylık partition yapısına dönüştürüldü')
+        else:
+            log('Devam zaten partition\'lı')
+        if convert_maas(cursor, ahead=ahead_years):
+            log('Maas_Hesap yıllık partition yapısına dönüştürüldü')
+        else:
+            log('Maas_Hesap zaten partition\'lı')
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,52 @@
+"""Toplu parola hash'leme.
+
+werkzeug'un scrypt hash'i kasıtlı olarak yavaştır (~100 ms); yüzlerce hesap
+açan toplu işlemlerde hash'ler bir worker havuzunda paralel üretilir.
+hashlib.scrypt hesaplama sırasında GIL'i bıraktığından birkaç yüz parola için
+thread havuzu yeterlidir. Binlerce satırlık içe aktarmalar `processes=True`
+ile ayrı süreçlerde hash'ler; web süreci bu sırada istek karşılamaya devam eder.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import generate_password_hash
+
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+
+_pools = {'thread': None, 'process': None}
+_lock = threading.Lock()
+
+
+def _executor(processes):
+    kind = 'process' if processes else 'thread'
+    with _lock:
+        if _pools[kind] is None:
+            if processes:
+                # Çok thread'li web sürecinden fork güvenli olmadığından spawn kullanılır
+                _pools[kind] = ProcessPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context('spawn'),
+                )
+            else:
+                _pools[kind] = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix='parola-hash')
+        return _pools[kind]
+
+
+def hash_passwords(passwords, processes=False):
+    """Parolaları sırayı koruyarak hash'ler."""
+    passwords = list(passwords)
+    if len(passwords) <= 1:
+        return [generate_password_hash(p) for p in passwords]
+    if not processes:
+        return list(_executor(False).map(generate_password_hash, passwords))
+    chunksize = max(1, len(passwords) // (PASSWORD_HASH_WORKERS * 4))
+    try:
+        return list(_executor(True).map(generate_password_hash, passwords, chunksize=chunksize))
+    except BrokenProcessPool as e:
+        # Bozulan havuz bir sonraki çağrıda yeniden kurulur; bu çağrı thread havuzuyla tamamlanır
+        print(f"Parola hash süreç havuzu hatası: {e}")
+        with _lock:
+            _pools['process'] = None
+        return list(_executor(False).map(generate_password_hash, passwords))
@@ -0,0 +1,358 @@
+import calendar
+import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from utils import leave_index
+
+SGK_EMPLOYEE_RATE = Decimal('0.14')
+SGK_EMPLOYER_RATE = Decimal('0.205')
+OVERTIME_MULTIPLIER = Decimal('1.5')
+INCOME_TAX_BANDS = [
+    (Decimal('32000'), Decimal('0.15')),
+    (Decimal('70000'), Decimal('0.20')),
+    (Decimal('250000'), Decimal('0.27')),
+    (Decimal('880000'), Decimal('0.35')),
+    (Decimal('9999999999'), Decimal('0.40')),
+]
+
+CENT = Decimal('0.01')
+
+
+def annual_income_tax(annual_taxable: Decimal) -> Decimal:
+    tax = Decimal('0')
+    remaining = Decimal(annual_taxable)
+    lower = Decimal('0')
+    for upper, rate in INCOME_TAX_BANDS:
+        bracket = min(remaining, upper - lower)
+        if bracket <= 0:
+            lower = upper
+            continue
+        tax += bracket * rate
+        remaining -= bracket
+        lower = upper
+        if remaining <= 0:
+            break
+    return tax
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def month_bounds(yil: int, ay: int):
+    """Dönemin ilk ve son gününü döner."""
+    month_start = datetime.date(yil, ay, 1)
+    last_day = calendar.monthrange(yil, ay)[1]
+    return month_start, datetime.date(yil, ay, last_day)
+
+
+def count_working_days(start: datetime.date, end: datetime.date) -> int:
+    days = 0
+    cur = start
+    while cur <= end:
+        if cur.weekday() < 5:
+            days += 1
+        cur += datetime.timedelta(days=1)
+    return days
+
+
+def base_salary(row) -> Decimal:
+    """Pozisyon taban maaşı + kıdem farkı; özel taban maaş varsa o kullanılır."""
+    if row.get('ozel_taban_maas') is not None:
+        return Decimal(row.get('ozel_taban_maas'))
+    base = Decimal(row.get('taban_maas') or 0)
+    kidem_level = int(row.get('kidem_seviyesi') or 3)
+    if kidem_level < 1:
+        kidem_level = 1
+    return base + Decimal('15000') * Decimal(kidem_level - 1)
+
+
+def load_payroll_inputs(cursor, personel_id, month_start, month_end, leaves_index=None):
+    """Personelin dönemdeki onaylı izinlerini ve toplam ek mesaisini okur.
+
+    İzinler izin dizininden gelir; çok personelli çağrılar önce
+    `leave_index.ensure` ile dizini toplu yüklemeli ya da
+    `leave_index.period_index` sonucunu `leaves_index` olarak vermelidir.
+    """
+    leaves = leave_index.approved_leaves(cursor, personel_id, month_start, month_end, index=leaves_index)
+
+    cursor.execute(
+        "SELECT SUM(ek_mesai_saat) as toplam_ek FROM Devam WHERE personel_id = %s AND tarih BETWEEN %s AND %s",
+        (personel_id, month_start.strftime('%Y-%m-%d'), month_end.strftime('%Y-%m-%d')),
+    )
+    ek_row = cursor.fetchone()
+    overtime_hours = float(ek_row['toplam_ek'] or 0) if ek_row else 0.0
+    return leaves, overtime_hours
+
+
+def unpaid_leave_days(leaves, month_start, month_end) -> int:
+    unpaid_days = 0
+    for l in leaves:
+        if l.get('ucretli'):
+            continue
+        try:
+            bas = _to_date(l['bas'])
+            bit = _to_date(l['bit'])
+        except Exception:
+            continue
+        overlap_start = max(bas, month_start)
+        overlap_end = min(bit, month_end)
+        if overlap_end < overlap_start:
+            continue
+        unpaid_days += count_working_days(overlap_start, overlap_end)
+    return unpaid_days
+
+
+def compute_payroll(row, leaves, overtime_hours, month_start, month_end, working_days):
+    """Tek personel için aylık bordro kalemlerini hesaplar.
+
+    Tutarlar Decimal olarak döner; JSON'a yazarken çağıran taraf float'a çevirir.
+    """
+    taban = base_salary(row)
+    unpaid_days = unpaid_leave_days(leaves, month_start, month_end)
+
+    daily_rate = (taban / Decimal(working_days))
+    unpaid_deduction = (daily_rate * Decimal(unpaid_days)).quantize(CENT, rounding=ROUND_HALF_UP)
+    hourly_rate = (daily_rate / Decimal(8))
+    overtime_pay = (hourly_rate * Decimal(overtime_hours) * OVERTIME_MULTIPLIER).quantize(CENT, rounding=ROUND_HALF_UP)
+    sgk_employee = (taban * SGK_EMPLOYEE_RATE).quantize(CENT, rounding=ROUND_HALF_UP)
+    taxable_monthly = (taban - sgk_employee - unpaid_deduction)
+    if taxable_monthly < 0:
+        taxable_monthly = Decimal('0.00')
+
+    annual_taxable = (taxable_monthly * Decimal(12))
+    annual_income = annual_income_tax(annual_taxable)
+    monthly_income_tax = (annual_income / Decimal(12)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+    toplam_kesinti = (unpaid_deduction + sgk_employee + monthly_income_tax).quantize(CENT, rounding=ROUND_HALF_UP)
+    toplam_ekleme = Decimal('0.00')
+    if overtime_pay > 0:
+        toplam_ekleme += overtime_pay
+    net_maas = (taban - toplam_kesinti + toplam_ekleme).quantize(CENT, rounding=ROUND_HALF_UP)
+    employer_sgk = (taban * SGK_EMPLOYER_RATE).quantize(CENT, rounding=ROUND_HALF_UP)
+
+    return {
+        'brut_maas': taban,
+        'unpaid_days': unpaid_days,
+        'unpaid_deduction': unpaid_deduction,
+        'sgk_employee': sgk_employee,
+        'monthly_income_tax': monthly_income_tax,
+        'overtime_hours': overtime_hours,
+        'overtime_pay': overtime_pay,
+        'employer_sgk': employer_sgk,
+        'toplam_kesinti': toplam_kesinti,
+        'toplam_ekleme': toplam_ekleme,
+        'net_maas': net_maas,
+    }
+
+
+def _months_between(start: datetime.date, end: datetime.date):
+    yil, ay = start.year, start.month
+    while (yil, ay) <= (end.year, end.month):
+        yield yil, ay
+        ay += 1
+        if ay > 12:
+            yil, ay = yil + 1, 1
+
+
+def mark_payroll_dirty(cursor, personel_ids, start, end=None, sebep=None):
+    """Bordro girdisi değişen personelleri ilgili dönemler için kirli işaretler.
+
+    `start`/`end` aralığındaki her ay için (personel, dönem) çifti
+    Bordro_Degisiklik tablosuna yazılır; artımlı bordro üretimi yalnızca bu
+    personelleri yeniden hesaplar. Çağıran tarafın transaction'ı içinde çalışır.
+    """
+    ids = sorted({int(pid) for pid in personel_ids if pid})
+    if not ids:
+        return 0
+    start_date = _to_date(start) if start else datetime.date.today()
+    end_date = _to_date(end) if end else start_date
+
+    rows = [
+        (pid, yil, ay, sebep)
+        for pid in ids
+        for yil, ay in _months_between(start_date, end_date)
+    ]
+    cursor.executemany("""
+        INSERT INTO Bordro_Degisiklik (personel_id, donem_yil, donem_ay, sebep)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE sebep = VALUES(sebep), degisiklik_tarihi = CURRENT_TIMESTAMP
+    """, rows)
+    return len(rows)
+
+
+def bilesen_resolver(cursor):
+    """Bileşen id'lerini bir kez çözüp saklayan yardımcı döner."""
+    cache = {}
+
+    def get_or_create_bilesen(name: str, tip: str = 'kesinti'):
+        if name in cache:
+            return cache[name]
+        cursor.execute("SELECT bilesen_id FROM Maas_Bileseni WHERE bilesen_adi = %s", (name,))
+        r = cursor.fetchone()
+        if r:
+            cache[name] = r['bilesen_id']
+        else:
+            cursor.execute("INSERT INTO Maas_Bileseni (bilesen_adi, bilesen_tipi, sabit_mi, varsayilan_tutar) VALUES (%s, %s, %s, %s)", (name, tip, 0, 0))
+            cache[name] = cursor.lastrowid
+        return cache[name]
+
+    return get_or_create_bilesen
+
+
+def write_payroll_details(cursor, mh_id, result, get_or_create_bilesen):
+    details = []
+    if result['sgk_employee'] > 0:
+        details.append((get_or_create_bilesen('SGK Çalışan', 'kesinti'), result['sgk_employee']))
+    if result['monthly_income_tax'] > 0:
+        details.append((get_or_create_bilesen('Gelir Vergisi', 'kesinti'), result['monthly_income_tax']))
+    if result['unpaid_deduction'] > 0:
+        details.append((get_or_create_bilesen('Ücretsiz İzin Kesintisi', 'kesinti'), result['unpaid_deduction']))
+    if result['overtime_pay'] > 0:
+        details.append((get_or_create_bilesen('Ek Mesai', 'ekleme'), result['overtime_pay']))
+    details.append((get_or_create_bilesen('SGK İşveren', 'ekleme'), result['employer_sgk']))
+    cursor.executemany(
+        "INSERT INTO Maas_Detay (maas_hesap_id, bilesen_id, tutar) VALUES (%s, %s, %s)",
+        [(mh_id, bilesen_id, float(tutar)) for bilesen_id, tutar in details],
+    )
+
+
+def payroll_changed(existing, result):
+    """Kayıtlı bordro ile yeni hesap arasında tutar farkı var mı?"""
+    for key in ('brut_maas', 'toplam_ekleme', 'toplam_kesinti', 'net_maas'):
+        if Decimal(str(existing[key] or 0)) != result[key]:
+            return True
+    return False
+
+
+def select_payroll_employees(cursor, personel_id=None, departman_id=None):
+    sql = """
+        SELECT p.personel_id,
+               poz.taban_maas,
+               COALESCE(pp.kidem_seviyesi, 3) AS kidem_seviyesi,
+               pp.ozel_taban_maas
+        FROM Personel p
+        LEFT JOIN Personel_Pozisyon pp ON p.personel_id = pp.personel_id AND pp.guncel_mi = 1
+        LEFT JOIN Pozisyon poz ON pp.pozisyon_id = poz.pozisyon_id
+        WHERE p.aktif_mi = 1
+    """
+    params = []
+    if personel_id:
+        sql += " AND p.personel_id = %s"
+        params.append(personel_id)
+    if departman_id:
+        sql += " AND p.departman_id = %s"
+        params.append(departman_id)
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+
+def generate_period(cursor, yil, ay, personel_id=None, departman_id=None, incremental=False, on_progress=None):
+    """Bir dönemin bordrolarını üretir; commit çağıran tarafa aittir.
+
+    `incremental` modunda yalnızca Bordro_Degisiklik tablosunda kirli
+    işaretlenmiş ya da o dönem bordrosu hiç olmayan personeller yeniden
+    hesaplanır. Ödenmiş bordrolara iki modda da dokunulmaz; `skipped_paid`
+    içinde raporlanır. `on_progress(done, total)` her personelden sonra
+    çağrılır.
+    """
+    month_start, month_end = month_bounds(yil, ay)
+    working_days = count_working_days(month_start, month_end)
+
+    employees = select_payroll_employees(cursor, personel_id, departman_id)
+
+    cursor.execute("""
+        SELECT maas_hesap_id, personel_id, brut_maas, toplam_ekleme, toplam_kesinti, net_maas, odendi_mi
+        FROM Maas_Hesap
+        WHERE donem_yil = %s AND donem_ay = %s
+    """, (yil, ay))
+    existing = {r['personel_id']: r for r in cursor.fetchall()}
+
+    dirty = {}
+    if incremental:
+        cursor.execute(
+            "SELECT personel_id, sebep FROM Bordro_Degisiklik WHERE donem_yil = %s AND donem_ay = %s",
+            (yil, ay),
+        )
+        dirty = {r['personel_id']: r['sebep'] for r in cursor.fetchall()}
+
+    get_or_create_bilesen = bilesen_resolver(cursor)
+    to_process = [
+        r['personel_id'] for r in employees
+        if not (existing.get(r['personel_id']) or {}).get('odendi_mi')
+        and (not incremental or r['personel_id'] in dirty or r['personel_id'] not in existing)
+    ]
+    # Yazma kararı verildiği için izinler her çalıştırmada tazelenir; yalnızca dönem okunur
+    leaves_index = leave_index.period_index(cursor, to_process, month_start, month_end)
+
+    created = []
+    updated = []
+    unchanged = []
+    skipped_paid = []
+    processed = []
+    total = len(employees)
+    for done, row in enumerate(employees, start=1):
+        if on_progress:
+            on_progress(done - 1, total)
+        pid = row['personel_id']
+        current = existing.get(pid)
+        if incremental and current and pid not in dirty:
+            continue
+        if current and current['odendi_mi']:
+            skipped_paid.append(pid)
+            continue
+
+        leaves, overtime_hours = load_payroll_inputs(cursor, pid, month_start, month_end, leaves_index)
+        result = compute_payroll(row, leaves, overtime_hours, month_start, month_end, working_days)
+        processed.append(pid)
+        summary = {'personel_id': pid, 'net_maas': float(result['net_maas']), 'kesinti': float(result['toplam_kesinti'])}
+
+        if incremental and current:
+            if not payroll_changed(current, result):
+                unchanged.append(pid)
+                continue
+            mh_id = current['maas_hesap_id']
+            cursor.execute("DELETE FROM Maas_Detay WHERE maas_hesap_id = %s", (mh_id,))
+            cursor.execute("""
+                UPDATE Maas_Hesap
+                SET brut_maas = %s, toplam_ekleme = %s, toplam_kesinti = %s, net_maas = %s
+                WHERE maas_hesap_id = %s
+            """, (float(result['brut_maas']), float(result['toplam_ekleme']), float(result['toplam_kesinti']), float(result['net_maas']), mh_id))
+            write_payroll_details(cursor, mh_id, result, get_or_create_bilesen)
+            summary['onceki_net_maas'] = float(current['net_maas'] or 0)
+            summary['sebep'] = dirty.get(pid)
+            updated.append(summary)
+            continue
+
+        if current:
+            cursor.execute("DELETE FROM Maas_Detay WHERE maas_hesap_id = %s", (current['maas_hesap_id'],))
+            cursor.execute("DELETE FROM Maas_Hesap WHERE maas_hesap_id = %s", (current['maas_hesap_id'],))
+        cursor.execute("""
+            INSERT INTO Maas_Hesap (personel_id, donem_yil, donem_ay, brut_maas, toplam_ekleme, toplam_kesinti, net_maas, odendi_mi)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, 0)
+        """, (pid, yil, ay, float(result['brut_maas']), float(result['toplam_ekleme']), float(result['toplam_kesinti']), float(result['net_maas'])))
+        write_payroll_details(cursor, cursor.lastrowid, result, get_or_create_bilesen)
+        created.append(summary)
+
+    # Ödenmiş bordrolar yeniden hesaplanmayacağından işaretleri de çözülmüş sayılır
+    resolved = processed + skipped_paid
+    if resolved:
+        cursor.execute(
+            "DELETE FROM Bordro_Degisiklik WHERE donem_yil = %s AND donem_ay = %s AND personel_id IN (%s)"
+            % ('%s', '%s', ', '.join(['%s'] * len(resolved))),
+            (yil, ay, *resolved),
+        )
+    if on_progress:
+        on_progress(total, total)
+
+    return {
+        'toplam': total,
+        'created': created,
+        'updated': updated,
+        'unchanged': unchanged,
+        'skipped_paid': skipped_paid,
+    }
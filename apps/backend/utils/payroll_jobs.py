@@ -0,0 +1,253 @@
+import json
+import threading
+import time
+
+from utils import employee_profile, events, metrics
+from utils.db import get_connection
+from utils.payroll import generate_period
+
+# Süreç içi iş durumu; SSE akışları buradan beslenir. Kalıcı durum (hangi ayın
+# tamamlandığı) Bordro_Is tablosunda tutulur, böylece süreç çökse de iş kaldığı
+# aydan devam ettirilebilir. Bir iş aynı anda yalnızca `bordro-is-<id>` kilidini
+# tutan tek bir süreçte çalışır.
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+class _JobState:
+    def __init__(self, is_id):
+        self.is_id = is_id
+        self.cond = threading.Condition()
+        self.seq = 0
+        self.data = {'is_id': is_id, 'durum': 'Beklemede'}
+
+    def update(self, **fields):
+        with self.cond:
+            self.data.update(fields)
+            self.seq += 1
+            self.cond.notify_all()
+
+    def snapshot(self):
+        with self.cond:
+            return self.seq, dict(self.data)
+
+    def wait(self, seq, timeout):
+        with self.cond:
+            if self.seq == seq:
+                self.cond.wait(timeout)
+            return self.seq, dict(self.data)
+
+
+def _running_jobs():
+    with _jobs_lock:
+        return sum(1 for state in _jobs.values() if state.data.get('durum') == 'Calisiyor')
+
+
+metrics.register_gauge('hr_payroll_jobs_running', 'Çalışan toplu bordro işleri', _running_jobs)
+
+
+def _period_range(bas_yil, bas_ay, bit_yil, bit_ay):
+    yil, ay = bas_yil, bas_ay
+    while (yil, ay) <= (bit_yil, bit_ay):
+        yield yil, ay
+        ay += 1
+        if ay > 12:
+            yil, ay = yil + 1, 1
+
+
+def _job_row_to_dict(row):
+    return {
+        'is_id': row['is_id'],
+        'baslangic': {'yil': row['baslangic_yil'], 'ay': row['baslangic_ay']},
+        'bitis': {'yil': row['bitis_yil'], 'ay': row['bitis_ay']},
+        'departman_id': row['departman_id'],
+        'incremental': bool(row['incremental']),
+        'durum': row['durum'],
+        'son_donem': {'yil': row['son_yil'], 'ay': row['son_ay']} if row['son_yil'] else None,
+        'islenen_personel': row['islenen_personel'],
+        'hata': row['hata'],
+    }
+
+
+def create_job(cursor, bas_yil, bas_ay, bit_yil, bit_ay, departman_id=None, incremental=False):
+    cursor.execute("""
+        INSERT INTO Bordro_Is (baslangic_yil, baslangic_ay, bitis_yil, bitis_ay, departman_id, incremental, durum)
+        VALUES (%s, %s, %s, %s, %s, %s, 'Beklemede')
+    """, (bas_yil, bas_ay, bit_yil, bit_ay, departman_id, 1 if incremental else 0))
+    return cursor.lastrowid
+
+
+def get_job(cursor, is_id):
+    cursor.execute("SELECT * FROM Bordro_Is WHERE is_id = %s", (is_id,))
+    row = cursor.fetchone()
+    return _job_row_to_dict(row) if row else None
+
+
+def job_state(is_id):
+    with _jobs_lock:
+        return _jobs.get(is_id)
+
+
+def _claim(is_id):
+    """İş için süreçler arası kilidi alır; kilidi tutan bağlantıyı ya da None döner.
+
+    Kilit bağlantı açık kaldıkça tutulur; çöken bir çalıştırmanın kilidi
+    bağlantısıyla birlikte düşer ve iş başka bir worker'da devralınabilir.
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT GET_LOCK(%s, 0) AS kilit", (f'bordro-is-{is_id}',))
+        if cursor.fetchone()['kilit'] == 1:
+            return conn
+    except Exception:
+        conn.close()
+        raise
+    conn.close()
+    return None
+
+
+def start_job(is_id):
+    """İşi arka plan thread'inde başlatır; zaten çalışıyorsa False döner.
+
+    Aynı iş başka bir süreçte çalışıyorsa MySQL kilidi alınamaz ve iş
+    başlatılmaz.
+    """
+    with _jobs_lock:
+        state = _jobs.get(is_id)
+        if state and state.data.get('durum') == 'Calisiyor':
+            return False
+
+    conn = _claim(is_id)
+    if conn is None:
+        return False
+    with _jobs_lock:
+        state = _JobState(is_id)
+        state.data['durum'] = 'Calisiyor'
+        _jobs[is_id] = state
+
+    thread = threading.Thread(target=_run_job, args=(state, conn), name=f'bordro-is-{is_id}', daemon=True)
+    thread.start()
+    return True
+
+
+def _run_job(state, conn):
+    is_id = state.is_id
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT * FROM Bordro_Is WHERE is_id = %s", (is_id,))
+        job = cursor.fetchone()
+        if not job:
+            state.update(durum='Hata', hata='İş bulunamadı')
+            return
+        if job['durum'] == 'Tamamlandi':
+            # Kilit alınana kadar başka bir worker işi bitirmiş olabilir
+            state.update(durum='Tamamlandi', eta_saniye=0)
+            return
+
+        donemler = list(_period_range(job['baslangic_yil'], job['baslangic_ay'], job['bitis_yil'], job['bitis_ay']))
+        if job['son_yil']:
+            # Kaldığı yerden devam: commit edilmiş aylar atlanır
+            donemler = [d for d in donemler if d > (job['son_yil'], job['son_ay'])]
+
+        cursor.execute("UPDATE Bordro_Is SET durum = 'Calisiyor', hata = NULL WHERE is_id = %s", (is_id,))
+        conn.commit()
+
+        started = time.monotonic()
+        islenen = int(job['islenen_personel'] or 0)
+        bu_calismada = 0
+        kalan_ay = len(donemler)
+        state.update(durum='Calisiyor', toplam_ay=kalan_ay, tamamlanan_ay=0, islenen_personel=islenen)
+
+        for index, (yil, ay) in enumerate(donemler):
+            def on_progress(done, total):
+                elapsed = time.monotonic() - started
+                isler = bu_calismada + done
+                tahmini_toplam = total * kalan_ay
+                eta = None
+                if isler > 0:
+                    eta = round(elapsed / isler * max(tahmini_toplam - isler, 0), 1)
+                state.update(
+                    donem={'yil': yil, 'ay': ay},
+                    donem_personel=done,
+                    donem_toplam=total,
+                    islenen_personel=islenen + done,
+                    eta_saniye=eta,
+                )
+
+            sonuc = generate_period(
+                cursor, yil, ay,
+                departman_id=job['departman_id'],
+                incremental=bool(job['incremental']),
+                on_progress=on_progress,
+            )
+            ay_islenen = len(sonuc['created']) + len(sonuc['updated']) + len(sonuc['unchanged'])
+            islenen += ay_islenen
+            # Kontrol noktası ay verisiyle aynı transaction'da yazılır
+            cursor.execute("""
+                UPDATE Bordro_Is SET son_yil = %s, son_ay = %s, islenen_personel = %s
+                WHERE is_id = %s
+            """, (yil, ay, islenen, is_id))
+            conn.commit()
+            employee_profile.invalidate()
+            bu_calismada += sonuc['toplam']
+            state.update(tamamlanan_ay=index + 1, islenen_personel=islenen, son_donem={'yil': yil, 'ay': ay})
+
+        cursor.execute("UPDATE Bordro_Is SET durum = 'Tamamlandi' WHERE is_id = %s", (is_id,))
+        conn.commit()
+        state.update(durum='Tamamlandi', eta_saniye=0)
+        events.publish('bordro', {'is_id': is_id, 'durum': 'Tamamlandi'}, roller=('admin',))
+    except Exception as e:
+        conn.rollback()
+        print(f'Toplu bordro hatası (iş {is_id}): {e}')
+        try:
+            cursor.execute("UPDATE Bordro_Is SET durum = 'Hata', hata = %s WHERE is_id = %s", (str(e), is_id))
+            conn.commit()
+        except Exception:
+            pass
+        state.update(durum='Hata', hata=str(e))
+    finally:
+        try:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (f'bordro-is-{is_id}',))
+        except Exception:
+            pass
+        conn.close()
+
+
+def sse_message(data, event='progress'):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def stream_job_events(is_id, load_job, keepalive=15):
+    """Bordro işinin ilerlemesini Server-Sent Events olarak üretir.
+
+    İş bu süreçte çalışıyorsa bellek içi durum dinlenir; başka bir süreçte
+    çalışıyorsa ya da süreç yeniden başlatıldıysa `load_job()` ile tablodan
+    periyodik olarak okunur.
+    """
+    state = job_state(is_id)
+    if state is None:
+        last = None
+        while True:
+            job = load_job()
+            if job is None:
+                yield sse_message({'error': 'İş bulunamadı'}, event='error')
+                return
+            if job != last:
+                yield sse_message(job)
+                last = job
+            if job['durum'] in ('Tamamlandi', 'Hata'):
+                yield sse_message(job, event='done')
+                return
+            time.sleep(2)
+
+    seq, data = state.snapshot()
+    yield sse_message(data)
+    while data.get('durum') == 'Calisiyor':
+        new_seq, data = state.wait(seq, keepalive)
+        if new_seq == seq:
+            yield ": keepalive\n\n"
+            continue
+        seq = new_seq
+        yield sse_message(data)
+    yield sse_message(data, event='done')
@@ -8,6 +8,22 @@ from reportlab.pdfbase.ttfonts import TTFont
 from io import BytesIO
 import os
 import datetime
+from functools import wraps
+
+from utils import metrics
+
+
+def _tracked(report):
+    # Süren PDF üretimleri ve süreleri rapor türüne göre metriklere yazılır
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            with metrics.track_inflight('hr_pdf_render', 'PDF üretimi', report=report):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
 class PDFGenerator:
 
     def __init__(self):
@@ -85,6 +101,7 @@ class PDFGenerator:
 
         canvas.restoreState()
 
+    @_tracked('personel_listesi')
     def personel_listesi_pdf(self, personeller):
         doc = SimpleDocTemplate(
             self.buffer,
@@ -146,6 +163,7 @@ class PDFGenerator:
         self.buffer.seek(0)
         return self.buffer
 
+    @_tracked('personel_detay')
     def personel_detay_pdf(self, personel, izinler, devam_ozet, maaslar):
         doc = SimpleDocTemplate(
             self.buffer,
@@ -262,6 +280,7 @@ class PDFGenerator:
         self.buffer.seek(0)
         return self.buffer
 
+    @_tracked('devam_raporu')
     def devam_raporu_pdf(self, devam_kayitlari, tarih_baslangic, tarih_bitis):
         doc = SimpleDocTemplate(
             self.buffer,
@@ -311,6 +330,7 @@ class PDFGenerator:
         self.buffer.seek(0)
         return self.buffer
 
+    @_tracked('izin_raporu')
     def izin_raporu_pdf(self, izinler, filtre=None):
         doc = SimpleDocTemplate(
             self.buffer,
@@ -357,6 +377,7 @@ class PDFGenerator:
         self.buffer.seek(0)
         return self.buffer
 
+    @_tracked('payrolls')
     def payrolls_pdf(self, maaslar, yil=None, ay=None):
         doc = SimpleDocTemplate(
             self.buffer,
@@ -0,0 +1,202 @@
+"""İsteğe bağlı profil çıkarma.
+
+1. Tek istek profili: admin token'ı ile `X-Profile: 1` başlığı (ya da `?_profile=1`)
+   gönderilirse istek cProfile altında çalışır ve yanıt yerine pstats özeti döner.
+   `X-Profile: store` verilirse yanıt değişmez; .prof dosyası PROFILE_DIR altına
+   yazılır ve adı `X-Profile-File` başlığında döner.
+2. Örnekleme: PROFILE_SAMPLE_RATE > 0 ise isteklerin bu oranı seçilir ve tek bir
+   arka plan thread'i yalnızca seçilen isteklerin thread'lerinden periyodik yığın
+   örneği alır. Örnekler flamegraph.pl / speedscope ile açılabilen
+   "collapsed stack" dosyasında birikir. Seçilmeyen istekler için maliyet tek bir
+   random() çağrısıdır.
+"""
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import Response, g, request
+
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'profiles'))
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', 5))
+PROFILE_FLUSH_SECONDS = float(os.getenv('PROFILE_FLUSH_SECONDS', 30))
+STATS_LIMIT = 60
+
+
+def _profile_mode():
+    mode = request.headers.get('X-Profile') or request.args.get('_profile')
+    if mode in ('1', 'true', 'text'):
+        return 'text'
+    if mode == 'store':
+        return 'store'
+    return None
+
+
+def _is_admin():
+    from api.auth import decode_token
+
+    auth_header = request.headers.get('Authorization', '')
+    if not auth_header.startswith('Bearer '):
+        return False
+    payload = decode_token(auth_header.split(' ')[1])
+    return bool(payload) and payload.get('role') == 'admin'
+
+
+class StackSampler:
+    """Kayıtlı thread'lerden yığın örneği toplayıp collapsed-stack sayaçlarına yazar."""
+
+    def __init__(self, path, interval, flush_seconds):
+        self.path = path
+        self.interval = interval
+        self.flush_seconds = flush_seconds
+        self.targets = {}  # thread ident -> endpoint
+        self.counts = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def add(self, ident, endpoint):
+        with self.lock:
+            self.targets[ident] = endpoint
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='profil-ornekleyici', daemon=True)
+                self.thread.start()
+
+    def remove(self, ident):
+        with self.lock:
+            self.targets.pop(ident, None)
+
+    def _sample(self):
+        with self.lock:
+            targets = dict(self.targets)
+        if not targets:
+            return
+        frames = sys._current_frames()
+        for ident, endpoint in targets.items():
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            stack.append(endpoint)
+            key = ';'.join(reversed(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def flush(self):
+        if not self.counts:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Dosya birikimli tutulur: önceki sayımlar okunup yenileriyle toplanır
+        merged = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    if stack and count.isdigit():
+                        merged[stack] = int(count)
+        for stack, count in self.counts.items():
+            merged[stack] = merged.get(stack, 0) + count
+        self.counts = {}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for stack, count in merged.items():
+                f.write(f'{stack} {count}\n')
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            time.sleep(self.interval)
+            try:
+                self._sample()
+                if time.monotonic() - last_flush >= self.flush_seconds:
+                    self.flush()
+                    last_flush = time.monotonic()
+            except Exception as e:
+                print(f'Profil örnekleme hatası: {e}')
+
+
+_sampler = None
+
+
+def init_profiling(app):
+    global _sampler
+    if PROFILE_SAMPLE_RATE > 0:
+        _sampler = StackSampler(
+            os.path.join(PROFILE_DIR, 'stacks.collapsed'),
+            PROFILE_SAMPLE_INTERVAL_MS / 1000,
+            PROFILE_FLUSH_SECONDS,
+        )
+
+    @app.before_request
+    def _profile_start():
+        mode = _profile_mode()
+        if mode and _is_admin():
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Başka bir profil aracı aktif (Python 3.12+ süreç başına tek profiler)
+                g._profile_busy = True
+                return
+            g._profiler = profiler
+            g._profile_mode = mode
+            return
+
+        if _sampler is not None and random.random() < PROFILE_SAMPLE_RATE:
+            g._sampled_thread = threading.get_ident()
+            _sampler.add(g._sampled_thread, request.endpoint or 'unmatched')
+
+    @app.after_request
+    def _profile_finish(response):
+        if g.get('_profile_busy'):
+            response.headers['X-Profile'] = 'busy'
+            return response
+
+        profiler = g.get('_profiler')
+        if profiler is None:
+            return response
+
+        if g._profile_mode == 'store':
+            # Dosya teardown'da yazılır; burada yalnızca adı başlığa eklenir
+            name = f"{request.endpoint or 'unmatched'}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.prof"
+            g._profile_file = name
+            response.headers['X-Profile-File'] = name
+            return response
+
+        g.pop('_profiler')
+        profiler.disable()
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats('cumulative').print_stats(STATS_LIMIT)
+        profiled = Response(out.getvalue(), mimetype='text/plain')
+        profiled.headers['X-Profile-Status'] = str(response.status_code)
+        return profiled
+
+    @app.teardown_request
+    def _profile_teardown(exc):
+        # after_request zinciri hata verse bile profiler bu thread'de açık kalmaz
+        profiler = g.pop('_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            name = g.pop('_profile_file', None)
+            if name:
+                try:
+                    os.makedirs(PROFILE_DIR, exist_ok=True)
+                    profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+                except OSError as e:
+                    print(f'Profil yazma hatası: {e}')
+
+        ident = g.pop('_sampled_thread', None)
+        if ident is not None:
+            _sampler.remove(ident)
+
+    return app